@@ -0,0 +1,85 @@
+"""Benchmark venv discovery against a synthetic project tree.
+
+Builds a tree of roughly ``--files`` files shaped like a monorepo (source
+packages, a node_modules forest, a .git object store and an in-project
+.venv) and times the original recursive rglob search against
+``script_runner.discovery.find_venv`` for a script nested inside it.
+
+    python benchmarks/bench_discovery.py --files 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from script_runner.discovery import find_venv
+from script_runner.utils import path_distance
+
+def legacy_get_venv(script: Path, max_depth: int = 5, depth: int = 1) -> Optional[Path]:
+    """The rglob based search find_venv replaced"""
+    if depth > max_depth and max_depth > 0:
+        return None
+
+    matches = list(script.parent.rglob("pyvenv.cfg"))
+    if not matches:
+        return legacy_get_venv(script.parent, max_depth, depth + 1)
+
+    return min(matches, key=lambda venv: path_distance(venv, script)).parent
+
+def build_tree(root: Path, files: int) -> Path:
+    """Create a synthetic tree with about `files` files and return the script"""
+    venv = root / ".venv"
+    (venv / "bin").mkdir(parents=True)
+    (venv / "pyvenv.cfg").write_text("home = /usr/bin\n")
+
+    buckets = {
+        "node_modules": files // 2,
+        ".git/objects": files // 4,
+        "src": files - files // 2 - files // 4,
+    }
+    for top, count in buckets.items():
+        per_dir = 50
+        for i in range(count):
+            directory = root / top / f"d{i // (per_dir * per_dir)}" / f"d{(i // per_dir) % per_dir}"
+            if i % per_dir == 0:
+                directory.mkdir(parents=True, exist_ok=True)
+            (directory / f"f{i}.txt").touch()
+
+    script = root / "src" / "app" / "jobs" / "nightly" / "script.py"
+    script.parent.mkdir(parents=True, exist_ok=True)
+    script.touch()
+    return script
+
+def timed(func: Callable[[], Optional[Path]], repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "project"
+        start = time.perf_counter()
+        script = build_tree(root, args.files)
+        print(f"built {args.files} files in {time.perf_counter() - start:.2f}s")
+
+        legacy_time, legacy_venv = timed(lambda: legacy_get_venv(script), args.repeat)
+        new_time, new_venv = timed(lambda: find_venv(script), args.repeat)
+
+        assert os.path.samefile(legacy_venv, new_venv), (legacy_venv, new_venv)
+        print(f"legacy rglob: {legacy_time * 1000:10.2f} ms")
+        print(f"find_venv:    {new_time * 1000:10.2f} ms")
+        print(f"speedup:      {legacy_time / new_time:10.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark registry load and lookup as the number of aliases grows.
+
+For each size and backend a registry is populated with synthetic entries,
+then the time to open it and look up a single alias (what ``sr run``
+pays) is measured on a fresh Registry every iteration.
+
+    python benchmarks/bench_registry.py --sizes 10 1000 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from script_runner.config import Registry
+from script_runner.storage import BACKENDS
+
+def populate(config_dir: Path, backend: str, size: int):
+    filename, store_class = BACKENDS[backend]
+    store = store_class(config_dir / filename)
+    for i in range(size):
+        store.put({
+            "path": f"/opt/scripts/job_{i}.py",
+            "alias": f"job_{i}",
+            "interpreter": "/opt/venv/bin/python",
+            "type": "python",
+        })
+    store.commit()
+
+def open_and_lookup(config_dir: Path, backend: str, alias: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Registry(config_dir=config_dir, backend=backend).get_script(alias)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'size':>8} {'open+get (ms)':>14}")
+    for backend in args.backends:
+        for size in args.sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                config_dir = Path(tmp)
+                populate(config_dir, backend, size)
+                elapsed = open_and_lookup(config_dir, backend, f"job_{size - 1}", args.repeat)
+                print(f"{backend:<8} {size:>8} {elapsed * 1000:>14.3f}")
+
+if __name__ == "__main__":
+    main()
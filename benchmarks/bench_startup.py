@@ -0,0 +1,67 @@
+"""Track `sr run` startup cost.
+
+Reports the cumulative import time (from ``python -X importtime``) of the
+fast-path entry point and of the full click CLI, and the wall time of
+``sr run`` through each path compared with invoking the interpreter on the
+script directly. Regressions show up as new imports on the fast path.
+
+    python benchmarks/bench_startup.py --repeat 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from script_runner.config import Registry
+
+FAST = "from script_runner.fastrun import main; main()"
+FULL = "from script_runner.cli import cli; cli()"
+
+def import_time(module: str) -> float:
+    """Cumulative import time of a module in milliseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if name == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"{module} not found in importtime output")
+
+def wall_time(cmd, env, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in ("script_runner.fastrun", "script_runner.cli"):
+        print(f"import {module:<24} {import_time(module):8.2f} ms")
+
+    with tempfile.TemporaryDirectory() as home:
+        script = Path(home) / "noop.py"
+        script.write_text("pass\n")
+        env = {**os.environ, "HOME": home}
+        registry = Registry(config_dir=Path(home) / ".config" / "script_runner")
+        registry.add_script(script, alias="noop", interpreter_path=Path(sys.executable))
+
+        runs = {
+            "direct": [sys.executable, str(script)],
+            "sr run (fast path)": [sys.executable, "-c", FAST, "run", "noop"],
+            "sr run (full cli)": [sys.executable, "-c", FULL, "run", "noop"],
+        }
+        for name, cmd in runs.items():
+            print(f"{name:<31} {wall_time(cmd, env, args.repeat):8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare cold and warm script startup.
+
+Runs a script that imports a few heavy standard library modules through
+``runner.execute``, once as a fresh interpreter per run and once through a
+warm interpreter server with those modules preloaded. The first warm run
+also pays for starting the server, so it is reported separately.
+
+    python benchmarks/bench_warm.py --repeat 20
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from script_runner import warm
+from script_runner.runner import execute
+
+PRELOAD = ["asyncio", "decimal", "email.mime.multipart", "http.client", "json", "unittest"]
+
+def timed(script_info, config_dir: Path) -> float:
+    start = time.perf_counter()
+    execute(script_info, (), config_dir=config_dir)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if not warm.supported():
+        sys.exit("warm servers are not supported on this platform")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = Path(tmp)
+        script = config_dir / "imports.py"
+        script.write_text("".join(f"import {module}\n" for module in PRELOAD))
+        cold = {"path": str(script), "alias": "imports", "interpreter": sys.executable, "type": "python"}
+        warm_entry = {**cold, "warm": True, "preload": PRELOAD}
+
+        try:
+            first = timed(warm_entry, config_dir)
+            results = {
+                "cold": min(timed(cold, config_dir) for _ in range(args.repeat)),
+                "warm (server start)": first,
+                "warm": min(timed(warm_entry, config_dir) for _ in range(args.repeat)),
+            }
+        finally:
+            warm.stop_all(config_dir)
+
+    for name, ms in results.items():
+        print(f"{name:<20} {ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
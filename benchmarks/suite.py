@@ -0,0 +1,230 @@
+"""Run every hot-path benchmark and write the results as JSON.
+
+Covers registry load, save and lookup for each backend from 10 to 100k
+entries, ``get_venv`` on synthetic deep and wide trees, ``get_script_type``
+throughput and the wall time of ``sr run`` against invoking the interpreter
+directly. Each result is the best of ``--repeat`` runs, in seconds.
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --compare before.json
+
+With --compare, results more than --threshold times slower than the
+baseline are listed and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from bench_registry import populate
+from bench_startup import FAST, FULL
+
+from script_runner.config import Registry
+from script_runner.storage import BACKENDS
+from script_runner.utils import get_script_type, get_venv
+
+GROUPS = ("registry", "venv", "script_type", "run")
+
+Result = Dict[str, Any]
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def result(name: str, seconds: float, **params) -> Result:
+    return {"name": name, "params": params, "seconds": seconds}
+
+def bench_registry(sizes: List[int], repeat: int) -> List[Result]:
+    """Opening a registry and listing it, looking up one alias, and saving one more entry"""
+    results = []
+    for backend in BACKENDS:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                config_dir = Path(tmp)
+                populate(config_dir, backend, size)
+                alias = f"job_{size - 1}"
+
+                def save():
+                    registry = Registry(config_dir=config_dir, backend=backend)
+                    registry.store.put({"path": "/opt/scripts/extra.py", "alias": "extra",
+                                        "interpreter": "/opt/venv/bin/python", "type": "python"})
+                    registry.save()
+
+                results += [
+                    result("registry.load", best_of(lambda: Registry(config_dir=config_dir, backend=backend).scripts,
+                                                     repeat), backend=backend, entries=size),
+                    result("registry.lookup", best_of(
+                        lambda: Registry(config_dir=config_dir, backend=backend).get_script(alias), repeat),
+                        backend=backend, entries=size),
+                    result("registry.save", best_of(save, repeat), backend=backend, entries=size),
+                ]
+    return results
+
+def build_deep_tree(root: Path, depth: int) -> Path:
+    """A script `depth` directories below a venv, so the search walks every ancestor"""
+    (root / ".venv" / "bin").mkdir(parents=True)
+    (root / ".venv" / "pyvenv.cfg").touch()
+    script = root.joinpath(*(f"level{i}" for i in range(depth))) / "script.py"
+    script.parent.mkdir(parents=True)
+    script.touch()
+    return script
+
+def build_wide_tree(root: Path, width: int) -> Path:
+    """A script whose ancestors each hold `width` sibling directories, with the venv among the last"""
+    script_dir = root / "a" / "b" / "c"
+    for directory in (root, root / "a", root / "a" / "b"):
+        for i in range(width):
+            (directory / f"sibling{i}" / "src").mkdir(parents=True)
+    venv = root / f"sibling{width - 1}" / "env"
+    (venv / "bin").mkdir(parents=True)
+    (venv / "pyvenv.cfg").touch()
+    script_dir.mkdir(parents=True, exist_ok=True)
+    script = script_dir / "script.py"
+    script.touch()
+    return script
+
+def bench_venv(depth: int, width: int, repeat: int) -> List[Result]:
+    """get_venv without a memo, as `sr exec` and `sr add` call it"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        deep = build_deep_tree(Path(tmp) / "deep", depth)
+        wide = build_wide_tree(Path(tmp) / "wide", width)
+        results.append(result("venv.deep", best_of(lambda: get_venv(deep, max_depth=0), repeat), depth=depth))
+        results.append(result("venv.deep_bounded", best_of(lambda: get_venv(deep), repeat), depth=depth))
+        results.append(result("venv.wide", best_of(lambda: get_venv(wide), repeat), width=width))
+    return results
+
+SAMPLE_SCRIPTS = {
+    "tool.py": b"print('hi')\n",
+    "tool.sh": b"echo hi\n",
+    "python_tool": b"#!/usr/bin/env python3 -u\nprint('hi')\n",
+    "deno_tool": b"#!/usr/bin/env -S deno run --allow-read\nconsole.log('hi')\n",
+    "blob": b"\x7fELF\x02\x01\x01" + b"\x00" * 4096,
+}
+
+def bench_script_type(files: int, repeat: int) -> List[Result]:
+    """Seconds per get_script_type call over a mix of suffixed, shebang and binary files"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(files):
+            name, content = list(SAMPLE_SCRIPTS.items())[i % len(SAMPLE_SCRIPTS)]
+            path = Path(tmp) / f"{i}_{name}"
+            path.write_bytes(content)
+            paths.append(path)
+
+        elapsed = best_of(lambda: [get_script_type(path) for path in paths], repeat)
+    return [result("script_type.per_file", elapsed / files, files=files)]
+
+def bench_run(repeat: int) -> List[Result]:
+    """Wall time of a no-op script run directly, through the fast path and through the full CLI"""
+    with tempfile.TemporaryDirectory() as home:
+        script = Path(home) / "noop.py"
+        script.write_text("pass\n")
+        env = {**os.environ, "HOME": home}
+        env.pop("XDG_CONFIG_HOME", None)
+        registry = Registry(config_dir=Path(home) / ".config" / "script_runner")
+        registry.add_script(script, alias="noop", interpreter_path=Path(sys.executable))
+
+        runs = {
+            "direct": [sys.executable, str(script)],
+            "fast_path": [sys.executable, "-c", FAST, "run", "noop"],
+            "full_cli": [sys.executable, "-c", FULL, "run", "noop"],
+        }
+        timings = {
+            name: best_of(lambda: subprocess.run(cmd, env=env, check=True), repeat)
+            for name, cmd in runs.items()
+        }
+
+    results = [result(f"run.{name}", seconds) for name, seconds in timings.items()]
+    results += [
+        result(f"run.{name}_overhead", timings[name] - timings["direct"])
+        for name in ("fast_path", "full_cli")
+    ]
+    return results
+
+def metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def key(entry: Result) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(entry["params"].items()))
+    return f"{entry['name']}[{params}]" if params else entry["name"]
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the ratio of each result to the baseline; returns the keys that regressed"""
+    before = {key(entry): entry["seconds"] for entry in baseline["results"]}
+    regressions = []
+    print(f"{'benchmark':<48} {'before (ms)':>12} {'after (ms)':>12} {'ratio':>7}", file=sys.stderr)
+    for entry in current["results"]:
+        name = key(entry)
+        if name not in before:
+            continue
+        # Overheads are differences and can be zero or negative
+        ratio = entry["seconds"] / before[name] if before[name] > 0 else float("nan")
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  slower"
+        print(f"{name:<48} {before[name] * 1000:>12.3f} {entry['seconds'] * 1000:>12.3f} {ratio:>7.2f}{flag}", file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--depth", type=int, default=40)
+    parser.add_argument("--width", type=int, default=2_000)
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write the results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    results: List[Result] = []
+    for group in args.only:
+        start = time.perf_counter()
+        if group == "registry":
+            results += bench_registry(args.sizes, args.repeat)
+        elif group == "venv":
+            results += bench_venv(args.depth, args.width, args.repeat)
+        elif group == "script_type":
+            results += bench_script_type(args.files, args.repeat)
+        elif group == "run":
+            results += bench_run(args.repeat)
+        print(f"{group}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    report = {"meta": metadata(), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
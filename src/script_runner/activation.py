@@ -0,0 +1,86 @@
+# Virtual environment activation, computed once when a script is added.
+#
+# A registry entry's "activation" field holds the changes activating its
+# venv makes to the environment: "set" (variables to set), "path" (prepended
+# to PATH) and "unset" (variables to remove). Running the script only
+# overlays those on os.environ (fastrun has its own copy of apply).
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+Activation = Dict[str, object]
+
+# Variables the shell itself changes while sourcing a script
+SHELL_NOISE = frozenset({'_', 'PWD', 'OLDPWD', 'SHLVL', 'PS1'})
+
+def venv_for(interpreter: Path) -> Optional[Path]:
+    """The venv an interpreter belongs to; uses the unresolved path, as venv pythons are symlinks"""
+    bin_dir = interpreter.parent
+    if bin_dir.name in ('bin', 'Scripts') and (bin_dir.parent / 'pyvenv.cfg').exists():
+        return bin_dir.parent
+    return None
+
+def compute(interpreter: Path, script_type: str, capture: bool = False) -> Optional[Activation]:
+    """The activation an entry stores; {} for Python outside a venv, None when it does not apply
+
+    By default this is what the activate scripts always do: set VIRTUAL_ENV,
+    prepend the venv's bin directory to PATH and remove PYTHONHOME. With
+    capture, bin/activate is sourced once in bash and every change it makes
+    is recorded instead, which picks up anything a customised activate
+    script exports.
+    """
+    if script_type != 'python':
+        return None
+
+    venv = venv_for(interpreter)
+    if venv is None:
+        return {}
+
+    if capture and (venv / 'bin' / 'activate').exists():
+        return _capture(venv / 'bin' / 'activate')
+
+    return {'set': {'VIRTUAL_ENV': str(venv)}, 'path': str(interpreter.parent), 'unset': ['PYTHONHOME']}
+
+def _capture(activate_script: Path) -> Activation:
+    """Diff the environment before and after sourcing an activate script"""
+    import shutil
+    import subprocess
+
+    bash = shutil.which('bash')
+    if bash is None:
+        raise FileNotFoundError("Capturing a venv activation needs bash")
+
+    # Start from a deactivated environment so everything activate sets shows up
+    before = {k: v for k, v in os.environ.items() if k not in ('VIRTUAL_ENV', 'VIRTUAL_ENV_PROMPT')}
+    result = subprocess.run(
+        [bash, '-c', '. "$1" >/dev/null && env -0', 'activate', str(activate_script)],
+        capture_output=True, check=True, env=before,
+    )
+    after = dict(item.split('=', 1) for item in result.stdout.decode().split('\0') if '=' in item)
+
+    activation: Activation = {
+        'set': {k: v for k, v in after.items() if before.get(k) != v and k not in SHELL_NOISE and k != 'PATH'},
+        # activate only unsets PYTHONHOME when it is set, so always keep it
+        'unset': sorted({'PYTHONHOME'} | {k for k in before if k not in after and k not in SHELL_NOISE}),
+    }
+    old_path, new_path = before.get('PATH', ''), after.get('PATH', '')
+    if new_path != old_path:
+        if old_path and new_path.endswith(os.pathsep + old_path):
+            activation['path'] = new_path[:-len(os.pathsep + old_path)]
+        else:
+            activation['set']['PATH'] = new_path
+    return activation
+
+def apply(activation: Optional[Activation], base: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """Overlay a stored activation on the environment; None means run with it unchanged"""
+    if not activation:
+        return None
+
+    env = dict(os.environ if base is None else base)
+    env.update(activation.get('set', {}))
+    prefix = activation.get('path')
+    if prefix:
+        env['PATH'] = prefix + os.pathsep + env['PATH'] if env.get('PATH') else prefix
+    for name in activation.get('unset', []):
+        env.pop(name, None)
+    return env
@@ -0,0 +1,84 @@
+# Sorted alias index written beside scripts.json.
+#
+# One line per entry, `alias<TAB>type<TAB>path`, sorted by alias, after a
+# header holding the mtime and size of the registry file it was built from.
+# Completion and `sr list` binary search it for a prefix through mmap, so
+# they touch a few pages instead of parsing the registry. Tabs, newlines and
+# backslashes in the fields are backslash escaped; the escaping keeps
+# prefixes, so the escaped prefix is searched for.
+import mmap
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+INDEX_FILE = "aliases.idx"
+
+Row = Tuple[str, str, str]
+
+_ESCAPES = {'\\': '\\\\', '\t': '\\t', '\n': '\\n'}
+_UNESCAPES = {'\\': '\\', 't': '\t', 'n': '\n'}
+
+def _escape(text: str) -> str:
+    return ''.join(_ESCAPES.get(char, char) for char in text)
+
+def _unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+    chars = iter(text)
+    return ''.join(_UNESCAPES.get(next(chars, ''), '') if char == '\\' else char for char in chars)
+
+def stamp(registry_file: Path) -> str:
+    """What the index records about the registry file, to tell whether it is current"""
+    try:
+        stat = os.stat(registry_file)
+    except FileNotFoundError:
+        return "missing"
+    return f"{stat.st_mtime_ns} {stat.st_size}"
+
+def write(index_file: Path, rows: Iterable[Row], registry_stamp: str):
+    # storage imports this module, so its helper is imported on use
+    from .storage import write_atomic
+
+    lines = sorted('\t'.join(map(_escape, row)).encode() for row in rows)
+    write_atomic(index_file, f"# {registry_stamp}\n".encode() + b''.join(line + b'\n' for line in lines))
+
+def search(index_file: Path, prefix: str, registry_stamp: str) -> Optional[Iterator[Row]]:
+    """Rows whose alias starts with prefix, in alias order; None if the index is missing or out of date"""
+    try:
+        f = open(index_file, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        header = f.readline()
+        if header != f"# {registry_stamp}\n".encode():
+            return None
+        size = os.fstat(f.fileno()).st_size
+        if size == len(header):
+            return iter(())
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _rows(data, len(header), prefix)
+
+def _rows(data: mmap.mmap, first: int, prefix: str) -> Iterator[Row]:
+    key = _escape(prefix).encode()
+    try:
+        # Find the first line whose alias is not below key
+        low, high = first, len(data)
+        while low < high:
+            start = data.rfind(b'\n', first - 1, (low + high) // 2) + 1
+            end = data.find(b'\n', start)
+            if data[start:data.find(b'\t', start, end)] < key:
+                low = end + 1
+            else:
+                high = start
+
+        position = low
+        while position < len(data):
+            end = data.find(b'\n', position)
+            line = data[position:end].decode()
+            if not line.startswith(_escape(prefix)):
+                break
+            alias, script_type, path = line.split('\t')
+            yield _unescape(alias), _unescape(script_type), _unescape(path)
+            position = end + 1
+    finally:
+        data.close()
@@ -0,0 +1,55 @@
+import shlex
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .runner import exit_status, forward_signals, interrupted, run_with_retries
+
+Job = Tuple[Dict[str, str], Tuple[str, ...]]
+
+def parse_manifest(text: str) -> List[Tuple[str, Tuple[str, ...]]]:
+    """Parse a batch manifest: one `alias [args...]` per line, # starts a comment"""
+    entries = []
+    for line in text.splitlines():
+        parts = shlex.split(line, comments=True)
+        if parts:
+            entries.append((parts[0], tuple(parts[1:])))
+    return entries
+
+def run_many(jobs: Sequence[Job],
+            max_workers: int = 4,
+            fail_fast: bool = False,
+            output: str = 'prefix',
+            config_dir: Optional[Path] = None) -> List[Optional[int]]:
+    """Run registry entries concurrently and return their exit codes in job order
+
+    With fail_fast, the first failure stops any job that has not started
+    yet; those report None. Jobs already running are allowed to finish.
+    Ctrl-C is passed on to the running jobs and no new ones are started.
+    """
+    stop = threading.Event()
+
+    def run_one(job: Job) -> Optional[int]:
+        script, args = job
+        if stop.is_set() or interrupted():
+            return None
+        try:
+            returncode = run_with_retries(script, args, output, config_dir)
+        except Exception as e:
+            print(f"[{script['alias']}] Error: {e}", file=sys.stderr)
+            returncode = 1
+        if returncode != 0 and fail_fast:
+            stop.set()
+        return returncode
+
+    with forward_signals(), ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(run_one, jobs))
+
+def aggregate_status(returncodes: Sequence[Optional[int]]) -> int:
+    """Exit status for a batch: the first failing job's code, 1 if jobs were skipped, else 0"""
+    for returncode in returncodes:
+        if returncode:
+            return exit_status(returncode)
+    return 1 if None in returncodes else 0
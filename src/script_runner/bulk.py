@@ -0,0 +1,100 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .discovery import IGNORED_DIRS, VENV_MARKER
+from .exceptions import ScriptNotFoundError
+from .utils import SUFFIX_TYPES, get_interpreter_args, get_interpreter_path, probe_script
+
+DEFAULT_WORKERS = 8
+
+# Files picked up when a directory is scanned: every suffix with a known type;
+# extensionless executables count too
+SCRIPT_SUFFIXES = tuple(SUFFIX_TYPES)
+
+def _is_script(path: str) -> bool:
+    _, suffix = os.path.splitext(path)
+    if suffix:
+        return suffix.lower() in SCRIPT_SUFFIXES
+    return os.access(path, os.X_OK)
+
+def _walk(directory: Path, recursive: bool) -> Iterable[Path]:
+    """Scripts in a directory, skipping hidden and ignored directories and virtual environments"""
+    for root, dirs, files in os.walk(directory):
+        if not recursive:
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(
+                d for d in dirs
+                if d not in IGNORED_DIRS and not d.startswith('.')
+                and not os.path.exists(os.path.join(root, d, VENV_MARKER))
+            )
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if _is_script(path):
+                yield Path(path)
+
+def expand_targets(targets: Iterable[str], recursive: bool = False) -> List[Path]:
+    """Turn files, directories and glob patterns into a list of script paths
+
+    Directories contribute the scripts directly inside them, or every
+    script below them with recursive. Patterns are expanded with glob,
+    where `**` matches any number of directories. Each script is listed
+    once, in the order it was first found.
+    """
+    found: Dict[Path, None] = {}
+    for target in targets:
+        if glob.has_magic(target):
+            matches = [Path(p) for p in sorted(glob.glob(target, recursive=True)) if os.path.isfile(p)]
+        elif os.path.isdir(target):
+            matches = list(_walk(Path(target), recursive))
+        elif os.path.exists(target):
+            matches = [Path(target)]
+        else:
+            raise ScriptNotFoundError(value=target)
+
+        for path in matches:
+            found.setdefault(path.resolve(), None)
+    return list(found)
+
+def resolve_all(script_paths: List[Path],
+            interpreter_path: Optional[Path] = None,
+            max_workers: int = DEFAULT_WORKERS) -> List[Tuple[str, Path, List[str]]]:
+    """Detect the type, interpreter and interpreter arguments of many scripts, returned in input order
+
+    Scripts are probed concurrently. A Python script's interpreter depends
+    only on the virtual environment found from its directory, so the venv
+    search runs once per directory and siblings reuse the answer. Those
+    searches share a memo, so common ancestors are only scanned once.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        probes = list(executor.map(probe_script, script_paths))
+        args = [get_interpreter_args(probe.type, probe) for probe in probes]
+
+        if interpreter_path:
+            interpreter = interpreter_path.resolve()
+            return [(probe.type, interpreter, arg) for probe, arg in zip(probes, args)]
+
+        first_python: Dict[Path, Path] = {}
+        for script_path, probe in zip(script_paths, probes):
+            if probe.type == 'python':
+                first_python.setdefault(script_path.parent, script_path)
+        memo: Dict[Path, Optional[Path]] = {}
+        by_directory = {
+            directory: get_interpreter_path(path, 'python', venv_memo=memo)
+            for directory, path in first_python.items()
+        }
+
+        # Other interpreters come from each script's own shebang
+        others = [(path, probe) for path, probe in zip(script_paths, probes) if probe.type != 'python']
+        by_script = dict(zip(
+            (path for path, _ in others),
+            executor.map(lambda other: get_interpreter_path(other[0], other[1].type, probe=other[1]), others),
+        ))
+
+    return [
+        (probe.type, by_directory[path.parent] if probe.type == 'python' else by_script[path], arg)
+        for path, probe, arg in zip(script_paths, probes, args)
+    ]
@@ -1,12 +1,43 @@
+from datetime import datetime
+import fnmatch
+import json
+import re
 from pathlib import Path
 import sys
-from typing import Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
-from script_runner.exceptions import AliasNotFoundError
-from .runner import run_script
-from .config import Registry
+from script_runner.exceptions import (AliasNotFoundError, DependencyCycleError, InvalidScheduleError,
+                                     JobNotFoundError, JobServerError)
+from .runner import CHUNK_SIZE, OUTPUT_MODES, exit_status, forward_signals, run_script, stream_writer
+from .config import Registry, default_config_dir, indexed_aliases
+from .resolve_cache import ResolveCache
+from .result_cache import ResultCache
+from . import bulk, health, interpreters, metrics
+from . import warm as warm_servers
+from . import jobs as job_server
+from . import limits as resource_limits
+from .batch import aggregate_status, parse_manifest, run_many
+from .graph import run_graph
+from .cron import CronExpression
+from .daemon import OVERLAP_POLICIES, run_daemon
 import click
-from .utils import get_script_type, get_interpreter_path
+from click.shell_completion import CompletionItem
+from .utils import get_interpreter_args, get_interpreter_path, probe_script
+
+LIST_FORMATS = ('text', 'json', 'jsonl')
+
+def complete_alias(ctx: click.Context, param: click.Parameter, incomplete: str) -> List[CompletionItem]:
+    """Registered aliases starting with what has been typed, from the alias index"""
+    try:
+        # Runs on every keypress: a current index is searched without loading the registry
+        rows = indexed_aliases(incomplete)
+        if rows is None:
+            rows = Registry().aliases(incomplete)
+        return [CompletionItem(alias, help=script_type) for alias, script_type, _ in rows]
+    except Exception:
+        # A broken registry should not break the shell
+        return []
 
 @click.group()
 def cli():
@@ -14,41 +45,143 @@ def cli():
     pass
 
 @cli.command()
-@click.argument('script_path', type=click.Path(exists=True, path_type=Path))
+@click.argument('targets', nargs=-1, required=True)
 @click.option('--alias', '-a', type=str, help='Alias for the script.')
 @click.option('--interpreter', '-i', type=click.Path(exists=True, path_type=Path),
             help='Specific interpreter to use (auto-detected if not specified)')
-def add(script_path: Path, alias: Optional[str], interpreter: Optional[Path]):
-    """Register a Python or shell script with an alias"""
+@click.option('--depends-on', '-d', multiple=True,
+            help='Alias that must succeed before this script runs in run-graph (repeatable)')
+@click.option('--input', 'inputs', multiple=True, type=click.Path(path_type=Path),
+            help='File or directory the script reads, part of the run --cache key (repeatable)')
+@click.option('--warm', is_flag=True,
+            help='Run through a warm interpreter server instead of starting a new interpreter')
+@click.option('--preload', multiple=True,
+            help='Module the warm server imports before forking for this script (repeatable)')
+@click.option('--timeout', type=float, help='Seconds before a run of the script is stopped')
+@click.option('--retries', type=int, default=0, help='Times to retry a failed or timed out run')
+@click.option('--backoff', type=float, help='Seconds before the first retry, doubling after each (default 1)')
+@click.option('--capture-env', is_flag=True,
+            help="Record every change the venv's bin/activate makes, instead of the standard activation")
+@click.option('--recursive', '-r', is_flag=True, help='Add scripts in subdirectories of directory targets too')
+@click.option('--skip-existing', is_flag=True, help='When adding several scripts, leave out aliases already registered')
+@click.option('--jobs', '-j', type=int, default=bulk.DEFAULT_WORKERS, show_default=True,
+            help='Number of scripts to inspect at once when adding several')
+def add(targets: Tuple[str, ...], alias: Optional[str], interpreter: Optional[Path], depends_on: Tuple[str, ...],
+        inputs: Tuple[Path, ...], warm: bool, preload: Tuple[str, ...], timeout: Optional[float], retries: int,
+        backoff: Optional[float], capture_env: bool, recursive: bool, skip_existing: bool, jobs: int):
+    """Register Python or shell scripts: a file, directories or glob patterns"""
     try:
         registry = Registry()
-        registry.add_script(script_path, alias, interpreter)
-        click.echo(f"Added script '{alias or script_path.stem}' -> {script_path}")
+        script_path = Path(targets[0])
+        if len(targets) == 1 and script_path.is_file() and not recursive:
+            registry.add_script(script_path, alias, interpreter, list(depends_on), list(inputs), warm, list(preload),
+                                capture_env, timeout, retries, backoff)
+            click.echo(f"Added script '{alias or script_path.stem}' -> {script_path}")
+            return
+
+        if alias or depends_on or inputs or timeout or retries or backoff:
+            raise click.UsageError(
+                "--alias, --depends-on, --input, --timeout, --retries and --backoff only apply when adding a single script")
+        script_paths = bulk.expand_targets(targets, recursive)
+        if not script_paths:
+            click.echo("No scripts found")
+            return
+        added = registry.add_scripts(script_paths, interpreter, skip_existing, warm, list(preload), jobs, capture_env)
+        click.echo(f"Added {len(added)} script(s)")
+        if len(added) < len(script_paths):
+            click.echo(f"Skipped {len(script_paths) - len(added)} already registered alias(es)")
+    except click.UsageError:
+        raise
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
-@cli.command()
-def list():
-    """List registered scripts"""
+@cli.command('list')
+@click.option('--filter', 'pattern', help='Only aliases matching this glob pattern, e.g. "deploy-*"')
+@click.option('--type', 'script_type', help='Only scripts of this type (python, shell, node, ruby, perl, r, deno)')
+@click.option('--format', 'output_format', type=click.Choice(LIST_FORMATS), default='text', show_default=True,
+            help='text: one "alias (type): path" line per script; json and jsonl: full entries')
+@click.option('--by-interpreter', is_flag=True,
+            help='Group scripts under their interpreter, with its version and virtual environment')
+def list_command(pattern: Optional[str], script_type: Optional[str], output_format: str, by_interpreter: bool):
+    """List registered scripts, sorted by alias in text format"""
     registry = Registry()
-    if not registry.scripts:
-        click.echo("No scripts registered")
+
+    def matches(alias: str, entry_type: str) -> bool:
+        return (pattern is None or fnmatch.fnmatchcase(alias, pattern)) and script_type in (None, entry_type)
+
+    if output_format == 'text' and not by_interpreter:
+        # Only the part of the pattern before its first wildcard narrows the index search
+        prefix = re.split(r'[*?\[]', pattern, 1)[0] if pattern else ''
+        found = False
+        for alias, entry_type, path in registry.aliases(prefix):
+            if matches(alias, entry_type):
+                click.echo(f"{alias} ({entry_type}): {path}")
+                found = True
+        if not found:
+            click.echo("No matching scripts" if pattern or script_type else "No scripts registered")
+        return
+
+    # Entries are decoded one at a time as the registry is read
+    entries = (entry for entry in registry.store if matches(entry['alias'], entry.get('type', 'python')))
+    if output_format == 'jsonl':
+        for entry in entries:
+            click.echo(json.dumps(entry))
+        return
+    if output_format == 'json':
+        click.echo("[", nl=False)
+        for i, entry in enumerate(entries):
+            click.echo(("," if i else "") + "\n  " + json.dumps(entry), nl=False)
+        click.echo("\n]")
         return
 
-    for script in registry.scripts:
-        script_type = script.get('type', 'python')
-        click.echo(f"{script['alias']} ({script_type}): {script['path']}")
+    scripts = list(entries)
+    if not scripts:
+        click.echo("No matching scripts" if pattern or script_type else "No scripts registered")
+        return
+    records = registry.interpreters(scripts)
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    for script in scripts:
+        groups.setdefault(script['interpreter'], []).append(script)
+    for interpreter, members in groups.items():
+        click.echo(f"{interpreter} ({interpreters.describe(records[interpreter])})")
+        for script in members:
+            click.echo(f"  {script['alias']} ({script.get('type', 'python')}): {script['path']}")
 
 @cli.command()
-def prune():
+@click.option('--jobs', '-j', type=int, default=health.DEFAULT_WORKERS, show_default=True,
+            help='Number of filesystem checks to run at once')
+@click.option('--timeout', type=float, default=health.DEFAULT_TIMEOUT, show_default=True,
+            help='Seconds to wait for a single path before leaving its entry alone')
+def prune(jobs: int, timeout: float):
     """Remove all non-existent scripts and directories"""
     registry = Registry()
-    for pruned in registry.prune():
+    for pruned in registry.prune(jobs, timeout):
         click.echo(f"Removed Alias: {pruned}")
 
 @cli.command()
-@click.argument('alias', type=str)
+@click.option('--jobs', '-j', type=int, default=health.DEFAULT_WORKERS, show_default=True,
+            help='Number of filesystem checks to run at once')
+@click.option('--timeout', type=float, default=health.DEFAULT_TIMEOUT, show_default=True,
+            help='Seconds to wait for a single path before reporting it as unknown')
+def check(jobs: int, timeout: float):
+    """Report entries whose script, interpreter or virtual environment is missing or broken"""
+    registry = Registry()
+    failed = False
+    for result in registry.check(jobs, timeout):
+        for note in result["notes"]:
+            click.echo(f"{result['alias']}: {note}")
+        for problem in result["problems"]:
+            click.echo(f"{result['alias']}: {problem}")
+            failed = True
+        for path in result["unknown"]:
+            click.echo(f"{result['alias']}: could not check {path} within {timeout}s", err=True)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+@cli.command()
+@click.argument('alias', type=str, shell_complete=complete_alias)
 def remove(alias: str):
     """Delete a registered alias"""
     try:
@@ -59,11 +192,21 @@ def remove(alias: str):
     except:
         click.echo('Failed to Delete Item')
 
-@cli.command(context_settings={"ignore_unknown_options": True, "allow_extra_args": True})
-@click.argument('alias', type=str)
+@cli.command(context_settings={"ignore_unknown_options": True, "allow_extra_args": True,
+                               "allow_interspersed_args": False})
+@click.argument('alias', type=str, shell_complete=complete_alias)
 @click.argument('script_args', nargs=-1, type=click.UNPROCESSED)
 @click.option('--verbose', '-v', is_flag=True, help='Show script output')
-def run(alias: str, script_args: Tuple[str, ...], verbose: bool = False):
+@click.option('--output', type=click.Choice(OUTPUT_MODES),
+            help='Where script output goes (default: inherit with --verbose, else discard)')
+@click.option('--cache', 'use_cache', is_flag=True,
+            help='Replay the stored result if the script, interpreter, args and inputs are unchanged')
+@click.option('--timeout', type=float, help="Seconds before the script is stopped (overrides the alias's setting)")
+@click.option('--retries', type=int, help="Times to retry a failed run (overrides the alias's setting)")
+@click.option('--backoff', type=float, help="Seconds before the first retry, doubling after each (overrides the alias's setting)")
+def run(alias: str, script_args: Tuple[str, ...], verbose: bool = False, output: Optional[str] = None,
+        use_cache: bool = False, timeout: Optional[float] = None, retries: Optional[int] = None,
+        backoff: Optional[float] = None):
     """Run a registered script"""
     try:
         registry = Registry()
@@ -73,32 +216,341 @@ def run(alias: str, script_args: Tuple[str, ...], verbose: bool = False):
             click.echo(f"Error: Alias '{alias}' not found", err=True)
             sys.exit(1)
 
-        run_script(script, script_args, verbose)
+        if use_cache:
+            output = output or ('inherit' if verbose else 'discard')
+            with forward_signals():
+                returncode, _ = ResultCache(registry.config_dir).run(script, script_args, output, registry.config_dir,
+                                                                     timeout, retries, backoff)
+            if returncode != 0:
+                sys.exit(exit_status(returncode))
+            return
+
+        run_script(script, script_args, verbose, output, registry.config_dir, timeout, retries, backoff)
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
-@cli.command(context_settings={"ignore_unknown_options": True, "allow_extra_args": True})
+@cli.command('run-many')
+@click.argument('aliases', nargs=-1, shell_complete=complete_alias)
+@click.option('--manifest', '-m', type=click.File('r'),
+            help='File with one "alias [args...]" per line (- for stdin)')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+            help='Number of scripts to run at once')
+@click.option('--fail-fast/--keep-going', default=False,
+            help='Stop starting new scripts after the first failure')
+@click.option('--quiet', '-q', is_flag=True, help='Discard script output')
+@click.option('--output', type=click.Choice(OUTPUT_MODES),
+            help='Where script output goes (default: prefix, or discard with --quiet)')
+def run_many_command(aliases: Tuple[str, ...], manifest, jobs: int, fail_fast: bool, quiet: bool,
+                    output: Optional[str] = None):
+    """Run several registered scripts concurrently"""
+    entries = [(alias, ()) for alias in aliases]
+    if manifest:
+        entries += parse_manifest(manifest.read())
+    if not entries:
+        click.echo("Error: No aliases given", err=True)
+        sys.exit(1)
+
+    registry = Registry()
+    try:
+        batch = [(registry.get_script(alias), args) for alias, args in entries]
+    except AliasNotFoundError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    returncodes = run_many(batch, jobs, fail_fast, output or ('discard' if quiet else 'prefix'), registry.config_dir)
+
+    failed = sum(1 for returncode in returncodes if returncode)
+    skipped = returncodes.count(None)
+    click.echo(f"{len(returncodes) - failed - skipped} succeeded, {failed} failed, {skipped} skipped", err=True)
+    sys.exit(aggregate_status(returncodes))
+
+@cli.command('run-graph')
+@click.argument('target', type=str, shell_complete=complete_alias)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+            help='Number of scripts to run at once')
+@click.option('--quiet', '-q', is_flag=True, help='Discard script output')
+@click.option('--output', type=click.Choice(OUTPUT_MODES),
+            help='Where script output goes (default: prefix, or discard with --quiet)')
+def run_graph_command(target: str, jobs: int, quiet: bool, output: Optional[str] = None):
+    """Run a registered script after everything it depends on"""
+    registry = Registry()
+    output = output or ('discard' if quiet else 'prefix')
+    try:
+        results = run_graph(target, registry.store.get, jobs, output, registry.config_dir)
+    except (AliasNotFoundError, DependencyCycleError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    for alias, returncode in results.items():
+        status = "skipped" if returncode is None else "ok" if returncode == 0 else f"failed ({returncode})"
+        click.echo(f"{alias}: {status}", err=True)
+    sys.exit(aggregate_status(list(results.values())))
+
+@cli.command(context_settings={"ignore_unknown_options": True, "allow_extra_args": True,
+                               "allow_interspersed_args": False})
 @click.argument('script_path', type=click.Path(exists=True, path_type=Path))
 @click.argument('script_args', nargs=-1, type=click.UNPROCESSED)
 @click.option('--interpreter', '-i', type=click.Path(exists=True, path_type=Path),
             help='Specific interpreter to use (auto-detected if not specified)')
 @click.option('--verbose', '-v', is_flag=True, help='Show script output')
-def exec(script_path: Path, script_args: Tuple[str, ...], interpreter: Optional[Path], verbose: bool):
+@click.option('--output', type=click.Choice(OUTPUT_MODES),
+            help='Where script output goes (default: inherit with --verbose, else discard)')
+def exec(script_path: Path, script_args: Tuple[str, ...], interpreter: Optional[Path], verbose: bool,
+        output: Optional[str] = None):
     """Run a script file directly without registering it"""
     try:
-        script_type = get_script_type(script_path)
-        script_path = script_path.resolve()
-        interpreter_path = get_interpreter_path(script_path, script_type, interpreter)
+        if interpreter:
+            probe = probe_script(script_path)
+            script_type = probe.type
+            script_path = script_path.resolve()
+            interpreter_path = get_interpreter_path(script_path, script_type, interpreter, probe=probe)
+            interpreter_args = get_interpreter_args(script_type, probe)
+        else:
+            script_path = script_path.resolve()
+            resolved = ResolveCache(default_config_dir()).resolve(script_path)
+            script_type = resolved["type"]
+            interpreter_path = resolved["interpreter"]
+            interpreter_args = resolved["interpreter_args"]
         script_info = {
             "path": str(script_path),
             "alias": "ad-hoc",
             "interpreter": str(interpreter_path),
-            "type": script_type
+            "type": script_type,
+            "interpreter_args": interpreter_args,
         }
 
-        run_script(script_info, script_args, verbose)
+        run_script(script_info, script_args, verbose, output, default_config_dir())
 
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
+
+@cli.group()
+def cache():
+    """Inspect or clear cached interpreter resolutions and run results"""
+    pass
+
+@cache.command('clear')
+@click.option('--resolutions/--no-resolutions', default=True, help='Clear cached interpreter resolutions')
+@click.option('--results/--no-results', default=True, help='Clear cached run results')
+def cache_clear(resolutions: bool, results: bool):
+    """Drop cached resolutions and results"""
+    if resolutions:
+        removed = ResolveCache(default_config_dir()).clear()
+        click.echo(f"Cleared {removed} cached resolution(s)")
+    if results:
+        removed = ResultCache(default_config_dir()).clear()
+        click.echo(f"Cleared {removed} cached result(s)")
+
+@cache.command('stats')
+def cache_stats():
+    """Show resolution and result cache usage"""
+    stats = ResolveCache(default_config_dir()).stats()
+    click.echo(f"Resolutions: {stats['file']}")
+    click.echo(f"  Entries: {stats['entries']}/{stats['max_entries']} ({stats['valid']} valid, {stats['stale']} stale)")
+    click.echo(f"  Size: {stats['size']} bytes")
+
+    stats = ResultCache(default_config_dir()).stats()
+    click.echo(f"Results: {stats['dir']}")
+    click.echo(f"  Entries: {stats['entries']} ({stats['hits']} hits)")
+    click.echo(f"  Size: {stats['size']}/{stats['max_bytes']} bytes")
+
+@cache.command('list')
+@click.argument('alias', required=False, shell_complete=complete_alias)
+def cache_list(alias: Optional[str]):
+    """List cached run results, most recently used first"""
+    for entry in ResultCache(default_config_dir()).entries():
+        if alias and entry["alias"] != alias:
+            continue
+        used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["last_used"]))
+        args = " ".join(entry["args"])
+        click.echo(f"{entry['key'][:12]}  {entry['alias']}  {entry['size']:>10} bytes  {entry['hits']:>4} hits  {used}  {args}")
+
+@cli.group()
+def warm():
+    """Manage warm interpreter servers for entries added with --warm"""
+    pass
+
+@warm.command('stop')
+def warm_stop():
+    """Stop every warm server once its running scripts finish"""
+    stopped = warm_servers.stop_all(default_config_dir())
+    click.echo(f"Stopped {stopped} warm server(s)")
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+@cli.command()
+@click.argument('alias', required=False, shell_complete=complete_alias)
+def stats(alias: Optional[str]):
+    """Show run durations, CPU time and memory per alias"""
+    summary = metrics.summarize(metrics.load(default_config_dir(), alias))
+    if not summary:
+        click.echo("No runs recorded")
+        return
+
+    click.echo(f"{'alias':<24} {'runs':>5} {'fail':>5} {'p50':>8} {'p95':>8} {'cpu':>8} {'max rss':>9} {'trend':>7}  last run")
+    for name, row in summary.items():
+        trend = f"{row['trend']:+.0f}%" if row['trend'] is not None else "-"
+        click.echo(
+            f"{name:<24} {row['runs']:>5} {row['failures']:>5} {_format_seconds(row['p50']):>8} "
+            f"{_format_seconds(row['p95']):>8} {_format_seconds(row['cpu']):>8} "
+            f"{row['max_rss'] / 1024 / 1024:>7.1f}MB {trend:>7}  {row['last']}"
+        )
+
+@cli.command()
+@click.argument('alias', shell_complete=complete_alias)
+@click.argument('expression', required=False)
+@click.option('--overlap', type=click.Choice(OVERLAP_POLICIES), default='skip', show_default=True,
+            help='What to do when a run is due while the previous one is still going')
+@click.option('--clear', is_flag=True, help='Remove the schedule')
+def schedule(alias: str, expression: Optional[str], overlap: str, clear: bool):
+    """Run ALIAS on a cron EXPRESSION (e.g. "*/5 * * * *") under sr daemon; without one, show its schedule"""
+    try:
+        registry = Registry()
+        if clear or expression:
+            registry.set_schedule(alias, None if clear else expression, overlap)
+        entry = registry.get_script(alias)
+    except (AliasNotFoundError, InvalidScheduleError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if 'schedule' not in entry:
+        click.echo(f"{alias}: not scheduled")
+        return
+    next_run = CronExpression(entry['schedule']).next_after(datetime.now())
+    click.echo(f"{alias}: {entry['schedule']} (overlap: {entry.get('overlap', 'skip')}), next run {next_run:%Y-%m-%d %H:%M}")
+
+def _size(ctx, param, value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return resource_limits.parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+@cli.command()
+@click.argument('alias', shell_complete=complete_alias)
+@click.option('--max-memory', callback=_size, help='Address space the script may use, e.g. 512M or 2G')
+@click.option('--max-cpu', 'max_cpu_seconds', type=click.IntRange(min=1), help='CPU seconds before the script is killed')
+@click.option('--max-open-files', type=click.IntRange(min=1), help='File descriptors the script may have open')
+@click.option('--nice', type=click.IntRange(-20, 19), help='Niceness added to the script (negative needs root)')
+@click.option('--clear', is_flag=True, help='Remove all limits')
+def limits(alias: str, max_memory: Optional[int], max_cpu_seconds: Optional[int], max_open_files: Optional[int],
+        nice: Optional[int], clear: bool):
+    """Set resource limits ALIAS runs under; without options, show them"""
+    changes = {'max_memory': max_memory, 'max_cpu_seconds': max_cpu_seconds,
+               'max_open_files': max_open_files, 'nice': nice}
+    try:
+        registry = Registry()
+        if clear:
+            registry.set_limits(alias, None)
+        elif any(value is not None for value in changes.values()):
+            registry.set_limits(alias, changes)
+        entry = registry.get_script(alias)
+    except (AliasNotFoundError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if 'limits' not in entry:
+        click.echo(f"{alias}: no limits")
+        return
+    click.echo(f"{alias}: {resource_limits.describe(entry['limits'])}")
+
+@cli.command()
+@click.option('--jobs', '-j', type=int, default=8, show_default=True, help='Number of scripts to run at once')
+@click.option('--output', type=click.Choice(OUTPUT_MODES), default='log', show_default=True,
+            help='Where scheduled script output goes')
+def daemon(jobs: int, output: str):
+    """Run scheduled scripts until interrupted"""
+    run_daemon(Registry(), jobs, output)
+
+@cli.command()
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=job_server.DEFAULT_WORKERS, show_default=True,
+            help='Number of jobs to run at once')
+@click.option('--max-queued', type=click.IntRange(min=1), default=job_server.DEFAULT_MAX_QUEUED, show_default=True,
+            help='Jobs that may wait for a worker before submissions are refused')
+@click.option('--keep-days', type=click.FloatRange(min=0), default=job_server.DEFAULT_KEEP_DAYS, show_default=True,
+            help='Days finished jobs and their output are kept')
+def serve(jobs: int, max_queued: int, keep_days: float):
+    """Run jobs submitted with sr submit until interrupted"""
+    try:
+        job_server.run_server(Registry(), jobs, max_queued, keep_days)
+    except JobServerError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+@cli.command(context_settings={"ignore_unknown_options": True, "allow_extra_args": True,
+                               "allow_interspersed_args": False})
+@click.argument('alias', type=str, shell_complete=complete_alias)
+@click.argument('script_args', nargs=-1, type=click.UNPROCESSED)
+def submit(alias: str, script_args: Tuple[str, ...]):
+    """Queue ALIAS on the job server (sr serve) and print the job id"""
+    try:
+        click.echo(job_server.submit(default_config_dir(), alias, script_args))
+    except JobServerError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+def _format_job(job: Dict) -> str:
+    submitted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job['submitted']))
+    returncode = job['returncode'] if job['returncode'] is not None else "-"
+    line = f"{job['id']:>6}  {job['state']:<11} {returncode:>4}  {submitted}  {' '.join([job['alias'], *job['args']])}"
+    return f"{line}  ({job['error']})" if job['error'] else line
+
+@cli.command()
+@click.argument('job_ids', nargs=-1, type=int)
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=20, show_default=True,
+            help='Number of recent jobs shown without JOB_IDS')
+@click.option('--json', 'as_json', is_flag=True, help='Print one JSON object per job')
+def status(job_ids: Tuple[int, ...], limit: int, as_json: bool):
+    """Show submitted jobs, the most recent ones without JOB_IDS"""
+    store = job_server.JobStore(default_config_dir())
+    try:
+        found = [store.get(job_id) for job_id in job_ids] if job_ids else store.recent(limit)
+    except JobNotFoundError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if not found:
+        click.echo("No jobs submitted")
+    for job in found:
+        click.echo(json.dumps(job) if as_json else _format_job(job))
+
+@cli.command()
+@click.argument('job_id', type=int)
+@click.option('--timeout', type=float, help='Seconds to wait before giving up')
+def wait(job_id: int, timeout: Optional[float]):
+    """Wait for a job to finish and exit with its exit code"""
+    try:
+        job = job_server.wait(default_config_dir(), job_id, timeout)
+    except (JobNotFoundError, JobServerError, TimeoutError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    click.echo(_format_job(job))
+    if job['state'] != 'succeeded':
+        # Signal deaths exit with 128+N like the shell; interrupted jobs have no code
+        sys.exit(aggregate_status([job['returncode']]) or 1)
+
+@cli.command()
+@click.argument('job_id', type=int)
+@click.option('--stderr', 'stream', flag_value='stderr', default='stdout', help="Show the job's stderr instead")
+def logs(job_id: int, stream: str):
+    """Print the captured output of a job (of its last attempt when retried)"""
+    store = job_server.JobStore(default_config_dir())
+    try:
+        store.get(job_id)
+    except JobNotFoundError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    try:
+        with open(store.output_dir(job_id) / stream, 'rb') as f:
+            write = stream_writer(sys.stdout)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                write(chunk)
+    except FileNotFoundError:
+        # Not started yet
+        pass
@@ -1,96 +1,383 @@
-import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
 import sys
-from typing import Any, Dict, Generator, List, Optional
-from .utils import get_venv, get_script_type, get_interpreter_path
-from .exceptions import AliasNotFoundError, DuplicateAliasError, ScriptNotFoundError
+import time
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
+from .utils import get_venv, get_script_type, get_interpreter_path, get_interpreter_args, probe_script
+from .exceptions import AliasNotFoundError, DependencyCycleError, DuplicateAliasError, ScriptNotFoundError
+from .cron import CronExpression
+from .graph import find_cycle
+from . import activation, bulk, health
+from . import limits as resource_limits
+from .interpreters import InterpreterIndex
+from .storage import BACKENDS, SCHEMA_VERSION, JsonStore
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks, writes are still atomic renames
+    fcntl = None
+
+LOCK_FILE = "registry.lock"
+
+def default_config_dir() -> Path:
+    return Path.home() / ".config" / "script_runner"
+
+def indexed_aliases(prefix: str = "", config_dir: Optional[Path] = None) -> Optional[Iterator[Tuple[str, str, str]]]:
+    """Registry.aliases without opening the registry, for shell completion
+
+    Only the JSON backend's alias index is searched, and only while it is
+    current; otherwise None, and Registry.aliases has to bring it up to date.
+    """
+    filename, store_class = BACKENDS[os.environ.get("SCRIPT_RUNNER_BACKEND", "json")]
+    if store_class is not JsonStore:
+        return None
+    return JsonStore((config_dir or default_config_dir()) / filename).indexed(prefix)
 
 class Registry:
-    def __init__(self, config_dir: Optional[Path] = None):
-        self.config_dir = config_dir or Path.home() / ".config" / "script_runner"
+    def __init__(self, config_dir: Optional[Path] = None, backend: Optional[str] = None):
+        self.config_dir = config_dir or default_config_dir()
         self.config_dir.mkdir(parents=True, exist_ok=True)
+        self.backend = backend or os.environ.get("SCRIPT_RUNNER_BACKEND", "json")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown registry backend: {self.backend}")
         self.scripts_file = self.config_dir / "scripts.json"
+        self._in_transaction = False
         self._load()
 
     def _load(self):
-        self.scripts = self._load_json(self.scripts_file)
+        filename, store_class = BACKENDS[self.backend]
+        store_file = self.config_dir / filename
+        needs_import = store_file != self.scripts_file and not store_file.exists() and self.scripts_file.exists()
+
+        self.store = store_class(store_file)
+        if needs_import or self._outdated():
+            with self.transaction():
+                # Another process may have done this while we waited for the lock
+                if needs_import and self.store.version is None:
+                    # First use of another backend: carry over the existing JSON registry
+                    for script in self._load_json(self.scripts_file):
+                        self.store.put(script)
+                    self.store.version = SCHEMA_VERSION
+                elif self._outdated():
+                    self._upgrade()
+
+    def _outdated(self) -> bool:
+        return self.store.version is not None and self.store.version < SCHEMA_VERSION
+
+    def _upgrade(self):
+        """Migrate every entry once and stamp the current schema version"""
+        for script in list(self.store):
+            self._migrate(script)
+            self.store.put(script)
+        self.store.version = SCHEMA_VERSION
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Hold the registry lock around a read-modify-write of the store
+
+        The store is reloaded once the lock is held, so changes are made to
+        the latest entries, and committed when the block exits without an
+        error. On an error the changes are discarded. Nested transactions
+        join the outer one.
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        with self._lock():
+            self._in_transaction = True
+            try:
+                self.store.reload()
+                yield
+                self.store.commit()
+            except BaseException:
+                self.store.reload()
+                raise
+            finally:
+                self._in_transaction = False
+
+    def aliases(self, prefix: str = "") -> Iterator[Tuple[str, str, str]]:
+        """(alias, type, path) of entries whose alias starts with prefix, sorted, without loading the registry"""
+        return self.store.index(prefix)
+
+    @property
+    def scripts(self) -> List[Dict[str, str]]:
+        # iter() so list() does not ask the store for len(), which parses everything
+        return list(iter(self.store))
 
     def _load_json(self, path: Path) -> List[Dict[str, str]]:
         if path.exists():
-            scripts = json.loads(path.read_text())
-            # Migrate old format to new format for backward compatibility
+            scripts = list(JsonStore(path))
             for script in scripts:
-                if "python" in script and "interpreter" not in script:
-                    # Old format - migrate to new format
-                    script["interpreter"] = script.pop("python")
-                    script["type"] = "python"
-                elif "interpreter" not in script:
-                    # Handle edge case of malformed data
-                    script["interpreter"] = sys.executable
-                    script["type"] = "python"
-                elif "type" not in script:
-                    # Missing type field - detect it
-                    script_path = Path(script["path"])
-                    script["type"] = get_script_type(script_path) if script_path.exists() else "python"
+                self._migrate(script)
             return scripts
         return []
 
+    def _migrate(self, script: Dict[str, str]):
+        # Migrate old format to new format for backward compatibility
+        if "python" in script and "interpreter" not in script:
+            # Old format - migrate to new format
+            script["interpreter"] = script.pop("python")
+            script["type"] = "python"
+        elif "interpreter" not in script:
+            # Handle edge case of malformed data
+            script["interpreter"] = sys.executable
+            script["type"] = "python"
+        elif "type" not in script:
+            # Missing type field - detect it
+            script_path = Path(script["path"])
+            script["type"] = get_script_type(script_path) if script_path.exists() else "python"
+
     def save(self):
-        self.scripts_file.write_text(json.dumps(self.scripts, indent=2))
+        """Commit changes made to the store directly; inside a transaction, it commits on exit"""
+        if self._in_transaction:
+            return
+        with self._lock():
+            self.store.commit()
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        """Exclusive lock shared by every process using this config dir; closing the file releases it"""
+        with open(self.config_dir / LOCK_FILE, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
 
     def add_script(self,
                 script_path: Path,
                 alias: Optional[str]=None,
-                interpreter_path: Optional[Path]=None):
+                interpreter_path: Optional[Path]=None,
+                depends_on: Optional[List[str]]=None,
+                inputs: Optional[List[Path]]=None,
+                warm: bool=False,
+                preload: Optional[List[str]]=None,
+                capture_env: bool=False,
+                timeout: Optional[float]=None,
+                retries: int=0,
+                backoff: Optional[float]=None):
         script_path = script_path.resolve()
         if not script_path.exists():
             raise ScriptNotFoundError(value=script_path)
 
         alias = alias or script_path.stem
-
-        if alias in [s["alias"] for s in self.scripts]:
-            raise DuplicateAliasError(value=alias)
+        # Fail early, before anything slow; checked again under the lock below
+        self._check_new(alias, depends_on)
 
         # Detect script type
-        script_type = get_script_type(script_path)
+        probe = probe_script(script_path)
+        script_type = probe.type
 
         # Get appropriate interpreter
-        interpreter = get_interpreter_path(script_path, script_type, interpreter_path)
+        interpreter = get_interpreter_path(script_path, script_type, interpreter_path, probe=probe)
+        interpreter_args = get_interpreter_args(script_type, probe)
 
         if not interpreter.exists():
             raise FileNotFoundError(f"Interpreter not found: {interpreter}")
 
-        self.scripts.append({
+        entry = {
             "path": str(script_path),
             "alias": alias,
             "interpreter": str(interpreter),
             "type": script_type
-        })
+        }
+        if interpreter_args:
+            entry["interpreter_args"] = interpreter_args
+        env = activation.compute(interpreter, script_type, capture_env)
+        if env is not None:
+            entry["activation"] = env
+        if depends_on:
+            entry["depends_on"] = list(depends_on)
+        if inputs:
+            entry["inputs"] = [str(Path(p).absolute()) for p in inputs]
+        if warm:
+            entry["warm"] = True
+        if preload:
+            entry["preload"] = list(preload)
+        if timeout:
+            entry["timeout"] = timeout
+        if retries:
+            entry["retries"] = retries
+        if backoff is not None:
+            entry["backoff"] = backoff
+
+        # Resolution ran without the lock, so other writers are not held up by it
+        with self.transaction():
+            self._check_new(alias, depends_on)
+            self.store.put(entry)
 
-        self.save()
+    def add_scripts(self,
+                script_paths: List[Path],
+                interpreter_path: Optional[Path]=None,
+                skip_existing: bool=False,
+                warm: bool=False,
+                preload: Optional[List[str]]=None,
+                max_workers: int=bulk.DEFAULT_WORKERS,
+                capture_env: bool=False) -> List[Dict[str, str]]:
+        """Register many scripts under their file names and save once
+
+        Aliases are checked before anything is resolved: two scripts with the
+        same name always fail, and aliases already registered fail unless
+        skip_existing, which leaves them out. Nothing is added on failure.
+        """
+        script_paths = [path.resolve() for path in script_paths]
+        missing = [path for path in script_paths if not path.exists()]
+        if missing:
+            raise ScriptNotFoundError(value=", ".join(map(str, missing)))
+
+        by_alias: Dict[str, List[Path]] = {}
+        for path in script_paths:
+            by_alias.setdefault(path.stem, []).append(path)
+        clashes = [f"{alias} ({', '.join(map(str, paths))})" for alias, paths in by_alias.items() if len(paths) > 1]
+        if clashes:
+            raise DuplicateAliasError(value="; ".join(clashes))
+
+        existing = self._existing(by_alias, skip_existing)
+        script_paths = [path for path in script_paths if path.stem not in existing]
+
+        entries = []
+        activations: Dict[Any, Any] = {}
+        for path, (script_type, interpreter, interpreter_args) in zip(
+                script_paths, bulk.resolve_all(script_paths, interpreter_path, max_workers)):
+            if not interpreter.exists():
+                raise FileNotFoundError(f"Interpreter not found: {interpreter}")
+            entry = {
+                "path": str(path),
+                "alias": path.stem,
+                "interpreter": str(interpreter),
+                "type": script_type
+            }
+            if interpreter_args:
+                entry["interpreter_args"] = interpreter_args
+            key = (interpreter, script_type)
+            if key not in activations:
+                activations[key] = activation.compute(interpreter, script_type, capture_env)
+            if activations[key] is not None:
+                entry["activation"] = activations[key]
+            if warm:
+                entry["warm"] = True
+            if preload:
+                entry["preload"] = list(preload)
+            entries.append(entry)
+
+        # Resolution ran without the lock; check again against the latest registry
+        with self.transaction():
+            existing = self._existing(by_alias, skip_existing)
+            entries = [entry for entry in entries if entry["alias"] not in existing]
+            for entry in entries:
+                self.store.put(entry)
+        return entries
+
+    def _check_new(self, alias: str, depends_on: Optional[List[str]]):
+        if alias in self.store:
+            raise DuplicateAliasError(value=alias)
+
+        cycle = find_cycle(alias, depends_on or [], self.store.get)
+        if cycle:
+            raise DependencyCycleError(value=" -> ".join(cycle))
+
+    def _existing(self, aliases: List[str], skip_existing: bool) -> List[str]:
+        existing = [alias for alias in aliases if alias in self.store]
+        if existing and not skip_existing:
+            raise DuplicateAliasError(value=", ".join(existing))
+        return existing
+
+    def set_schedule(self, alias: str, schedule: Optional[str], overlap: str = "skip"):
+        """Set or, with schedule None, clear the cron schedule sr daemon runs an entry on"""
+        if schedule is not None:
+            CronExpression(schedule)
+
+        with self.transaction():
+            entry = self.get_script(alias)
+            entry.pop("schedule", None)
+            entry.pop("overlap", None)
+            if schedule is not None:
+                entry["schedule"] = schedule
+                if overlap != "skip":
+                    entry["overlap"] = overlap
+            self.store.put(entry)
+
+    def set_limits(self, alias: str, limits: Optional[Dict[str, Optional[int]]]):
+        """Set or, with limits None, clear the resource limits an entry runs under; unset keys are kept"""
+        with self.transaction():
+            entry = self.get_script(alias)
+            if limits is None:
+                entry.pop("limits", None)
+            else:
+                changes = {key: value for key, value in limits.items() if value is not None}
+                entry["limits"] = resource_limits.validate({**entry.get("limits", {}), **changes})
+                if not entry["limits"]:
+                    del entry["limits"]
+            self.store.put(entry)
 
     def get_script(self, alias: str) -> Dict[str, str]:
-        match = next(script for script in self.scripts if script["alias"] == alias)
+        match = self.store.get(alias)
 
         if not match:
             raise AliasNotFoundError(value=alias)
 
         return match
 
-    def prune(self) -> Generator[Any, None, str|None]:
-        for i in range(len(self.scripts) - 1, -1, -1):
-            script = self.scripts[i]
-            path = Path(script["path"])
-            if not path.exists():
-                alias = script["alias"]
-                del self.scripts[i]
-                yield alias
-        self.save()
+    def interpreters(self,
+                scripts: Optional[List[Dict[str, Any]]] = None,
+                max_workers: int = health.DEFAULT_WORKERS,
+                timeout: float = health.DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """The interpreter index records of the interpreters scripts use, see InterpreterIndex.refresh
+
+        scripts defaults to every entry, and only then are records of
+        interpreters no longer in use dropped.
+        """
+        prune = scripts is None
+        if scripts is None:
+            scripts = self.scripts
+        index = InterpreterIndex(self.config_dir)
+        records = index.refresh(
+            {script["interpreter"]: script.get("type", "python") == "python" for script in scripts},
+            max_workers, timeout, prune,
+        )
+        index.save()
+        return records
+
+    def check(self,
+                max_workers: int = health.DEFAULT_WORKERS,
+                timeout: float = health.DEFAULT_TIMEOUT) -> List[Dict[str, Any]]:
+        """Check every entry's paths concurrently, see health.check, and that its interpreter runs
+
+        Each result also has `notes`: interpreters found upgraded or venvs
+        found rebuilt with a different Python since the previous check.
+        """
+        scripts = self.scripts
+        results = health.check(scripts, max_workers, timeout)
+        started = time.time()
+        records = self.interpreters(None, max_workers, timeout)
+
+        for script, result in zip(scripts, results):
+            result["notes"] = []
+            record = records[script["interpreter"]]
+            # Missing interpreters and ones that could not be checked are already reported
+            if record is health.UNKNOWN or record["fingerprint"] is None:
+                continue
+            if "error" in record:
+                result["problems"].append(f"interpreter does not run: {record['error']}")
+            if record.get("changed", 0) >= started:
+                previous = record["previous"]
+                result["notes"].append(
+                    f"interpreter changed from {previous['implementation']} {previous['version']} "
+                    f"to {record['implementation']} {record['version']}: {script['interpreter']}")
+        return results
+
+    def prune(self,
+                max_workers: int = health.DEFAULT_WORKERS,
+                timeout: float = health.DEFAULT_TIMEOUT) -> Generator[Any, None, str|None]:
+        """Remove entries whose script is gone; paths that could not be checked in time are kept"""
+        missing = [result["alias"] for result in health.check(self.store, max_workers, timeout) if result["missing"]]
+        with self.transaction():
+            for alias in reversed(missing):
+                if self.store.delete(alias):
+                    yield alias
 
     def remove_alias(self, alias: str):
-        for i, script in enumerate(self.scripts):
-            if script["alias"] == alias:
-                del self.scripts[i]
-                self.save()
-                return
-        raise AliasNotFoundError(value=alias)
+        with self.transaction():
+            if not self.store.delete(alias):
+                raise AliasNotFoundError(value=alias)
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import List, Set, Tuple
+
+from .exceptions import InvalidScheduleError
+
+ALIASES = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+DAYS = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+
+# (low, high, names) for minute, hour, day of month, month, day of week
+FIELDS: List[Tuple[int, int, List[str]]] = [
+    (0, 59, []),
+    (0, 23, []),
+    (1, 31, []),
+    (1, 12, MONTHS),
+    (0, 7, DAYS),
+]
+
+# Give up on expressions that never match, like 30 February
+MAX_YEARS = 5
+
+def _value(text: str, low: int, names: List[str]) -> int:
+    if text.lower() in names:
+        return names.index(text.lower()) + low
+    return int(text)
+
+def _parse_field(text: str, low: int, high: int, names: List[str]) -> Set[int]:
+    values: Set[int] = set()
+    for part in text.split(','):
+        spec, _, step_text = part.partition('/')
+        step = int(step_text) if step_text else 1
+        if spec == '*':
+            start, end = low, high
+        elif '-' in spec:
+            start_text, end_text = spec.split('-', 1)
+            start, end = _value(start_text, low, names), _value(end_text, low, names)
+        else:
+            start = _value(spec, low, names)
+            end = high if step_text else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(part)
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronExpression:
+    """A standard five-field cron expression: minute hour day-of-month month day-of-week
+
+    Fields take `*`, numbers, ranges (`1-5`), steps (`*/15`, `0-30/10`),
+    comma-separated lists and month or weekday names, plus the @hourly,
+    @daily, @weekly, @monthly and @yearly shorthands. As in cron, a time
+    matches when both day fields are `*`, or when either restricted one does.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise InvalidScheduleError(value=expression)
+        try:
+            parsed = [_parse_field(text, *spec) for text, spec in zip(fields, FIELDS)]
+        except ValueError:
+            raise InvalidScheduleError(value=expression) from None
+
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Sunday is both 0 and 7
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate.year + MAX_YEARS
+
+        # Skip whole months, days and hours that cannot match
+        while candidate.year <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise InvalidScheduleError(f"Schedule never matches within {MAX_YEARS} years", self.expression)
+
+    def __str__(self) -> str:
+        return self.expression
@@ -0,0 +1,181 @@
+import heapq
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .config import Registry
+from .cron import CronExpression
+from . import servers
+from .runner import GRACE_PERIOD, run_with_retries
+
+OVERLAP_POLICIES = ('skip', 'queue', 'kill')
+
+# Longest the daemon sleeps before checking the registry file for changes
+POLL_INTERVAL = 1.0
+
+class Daemon:
+    """Runs registry entries on their cron schedules from one long-lived process
+
+    Due times are kept in a heap, so each wake-up only looks at the runs
+    that are due. The registry is loaded once and reloaded only when its
+    file changes. Runs execute concurrently on a thread pool; when a run is
+    due while the previous one is still going, the entry's overlap policy
+    decides: `skip` drops the new run, `queue` starts it once the previous
+    one finishes (at most one waits), and `kill` terminates the previous run
+    and then starts the new one.
+    """
+
+    def __init__(self,
+                registry: Registry,
+                max_workers: int = 8,
+                output: str = 'log',
+                clock: Callable[[], float] = time.time,
+                log: Callable[[str], None] = servers.log):
+        self.registry = registry
+        self.output = output
+        self.clock = clock
+        self.log = log
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self.stopping = threading.Event()
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.schedules: Dict[str, CronExpression] = {}
+        # Heap of (due time, alias); entries whose time no longer matches next_due are stale
+        self.queue: List[Tuple[float, str]] = []
+        self.next_due: Dict[str, float] = {}
+
+        self.lock = threading.Lock()
+        # Alias -> its running process, None until it has started
+        self.running: Dict[str, Any] = {}
+        self.pending: Set[str] = set()
+        self.killing: Set[str] = set()
+        self.registry_mtime: Optional[int] = None
+
+    def refresh(self, now: float) -> bool:
+        """Reload scheduled entries if the registry file changed; returns whether it did"""
+        try:
+            mtime = os.stat(self.registry.store.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.registry_mtime:
+            return False
+        self.registry_mtime = mtime
+
+        self.registry.store.reload()
+        entries = {entry['alias']: entry for entry in self.registry.store if entry.get('schedule')}
+        for alias in list(self.schedules):
+            if alias not in entries:
+                del self.schedules[alias]
+                self.next_due.pop(alias, None)
+
+        for alias, entry in entries.items():
+            current = self.schedules.get(alias)
+            if current is None or current.expression != entry['schedule']:
+                try:
+                    self.schedules[alias] = CronExpression(entry['schedule'])
+                except ValueError as e:
+                    self.log(f"{alias}: {e}")
+                    self.schedules.pop(alias, None)
+                    self.next_due.pop(alias, None)
+                    continue
+                self._push(alias, now)
+
+        with self.lock:
+            self.entries = entries
+        return True
+
+    def _push(self, alias: str, after: float):
+        due = self.schedules[alias].next_after(datetime.fromtimestamp(after)).timestamp()
+        self.next_due[alias] = due
+        heapq.heappush(self.queue, (due, alias))
+
+    def tick(self, now: float) -> float:
+        """Start every run that is due; returns the seconds until the next one"""
+        while self.queue and self.queue[0][0] <= now:
+            due, alias = heapq.heappop(self.queue)
+            if self.next_due.get(alias) != due:
+                continue
+            self._fire(alias)
+            # Runs missed while the daemon was not running or asleep are not repeated
+            self._push(alias, max(due, now))
+
+        return self.queue[0][0] - now if self.queue else float('inf')
+
+    def _fire(self, alias: str):
+        with self.lock:
+            if alias not in self.running:
+                self._start(alias)
+                return
+
+            policy = self.entries[alias].get('overlap', 'skip')
+            if policy == 'skip':
+                self.log(f"{alias}: previous run still going, skipped")
+            elif policy == 'queue':
+                self.pending.add(alias)
+            elif policy == 'kill':
+                self.pending.add(alias)
+                self.killing.add(alias)
+                if self.running[alias] is not None:
+                    self.log(f"{alias}: stopping previous run")
+                    self._terminate(self.running[alias])
+
+    def _terminate(self, script):
+        """SIGTERM a run, then SIGKILL it once GRACE_PERIOD has passed, so one ignoring SIGTERM still ends"""
+        script.send_signal(signal.SIGTERM)
+        kill = threading.Timer(GRACE_PERIOD, script.kill)
+        kill.daemon = True
+        kill.start()
+
+    def _start(self, alias: str):
+        """Submit a run; the caller holds the lock"""
+        self.running[alias] = None
+        self.executor.submit(self._run, alias, self.entries[alias])
+
+    def _run(self, alias: str, entry: Dict[str, Any]):
+        def on_start(process):
+            with self.lock:
+                self.running[alias] = process
+                if alias in self.killing:
+                    self._terminate(process)
+
+        self.log(f"{alias}: started")
+        try:
+            returncode = run_with_retries(entry, (), self.output, self.registry.config_dir, on_start=on_start,
+                                          detached=True)
+            self.log(f"{alias}: exited with {returncode}")
+        except Exception as e:
+            self.log(f"{alias}: Error: {e}")
+
+        with self.lock:
+            del self.running[alias]
+            self.killing.discard(alias)
+            if alias in self.pending and alias in self.entries and not self.stopping.is_set():
+                self.pending.discard(alias)
+                self._start(alias)
+
+    def serve_forever(self):
+        """Run until stop() is called, then wait for running scripts to finish"""
+        self.log(f"daemon started, watching {self.registry.store.path}")
+        try:
+            while not self.stopping.is_set():
+                now = self.clock()
+                self.refresh(now)
+                wait = self.tick(now)
+                self.stopping.wait(min(max(wait, 0), POLL_INTERVAL))
+        finally:
+            self.executor.shutdown(wait=True)
+            self.log("daemon stopped")
+
+    def stop(self, *_):
+        self.stopping.set()
+
+def run_daemon(registry: Registry, max_workers: int = 8, output: str = 'log'):
+    """Serve schedules in the foreground; SIGINT or SIGTERM stops the daemon after running scripts finish"""
+    daemon = Daemon(registry, max_workers, output)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.serve_forever()
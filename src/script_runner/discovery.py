@@ -0,0 +1,116 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+VENV_MARKER = 'pyvenv.cfg'
+
+# In-project venv directory names, probed before anything is listed. uv, Poetry
+# (virtualenvs.in-project) and pipenv (PIPENV_VENV_IN_PROJECT) all use .venv.
+KNOWN_VENV_NAMES = ('.venv', 'venv', 'env')
+
+# Directories that never hold a project venv and are often huge
+IGNORED_DIRS = frozenset({
+    '.git', '.hg', '.svn', '.bzr',
+    'node_modules', 'bower_components',
+    '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache',
+    '.idea', '.vscode',
+    'site-packages',
+})
+
+# How many directory levels below each ancestor are searched for a venv
+DEFAULT_SCAN_DEPTH = 3
+
+def find_venv(script: Path,
+            max_depth: int = 5,
+            scan_depth: int = DEFAULT_SCAN_DEPTH,
+            memo: Optional[Dict[Path, Optional[Path]]] = None) -> Optional[Path]:
+    """Find the virtual environment closest to a script
+
+    Walks up from the script's directory for at most ``max_depth`` levels
+    (unbounded when ``max_depth`` is 0). At each ancestor the known venv
+    locations are probed first, then a breadth-first scan of at most
+    ``scan_depth`` levels looks for ``pyvenv.cfg``, skipping ignored
+    directories and the branch already searched on the level below.
+
+    Breadth-first order matches the ``path_distance`` ordering used by the
+    original recursive search: below a given ancestor, the shallowest
+    ``pyvenv.cfg`` is always the closest one to the script.
+
+    Searches for many scripts can share a ``memo`` dict, which records the
+    answer found at each ancestor so shared ancestors are only searched once.
+    Skipping the branch already searched never changes that answer (it held
+    no venv within reach), so memoized ancestors are searched in full.
+    """
+    directory = script.absolute().parent
+    searched: Optional[str] = None
+    level = 1
+
+    while max_depth <= 0 or level <= max_depth:
+        if memo is None:
+            venv = _probe_known(directory, searched) or _scan(directory, searched, scan_depth)
+        elif directory in memo:
+            venv = memo[directory]
+        else:
+            venv = memo[directory] = _probe_known(directory, None) or _scan(directory, None, scan_depth)
+        if venv:
+            return venv
+
+        if directory.parent == directory:
+            return None
+
+        searched = directory.name
+        directory = directory.parent
+        level += 1
+
+    return None
+
+def _probe_known(directory: Path, skip: Optional[str]) -> Optional[Path]:
+    """Check the directory itself and the usual in-project venv names"""
+    if (directory / VENV_MARKER).is_file():
+        return directory
+
+    for name in KNOWN_VENV_NAMES:
+        if name != skip and (directory / name / VENV_MARKER).is_file():
+            return directory / name
+
+    return None
+
+def _scan(root: Path, skip: Optional[str], scan_depth: int) -> Optional[Path]:
+    """Breadth-first search below root for a directory containing pyvenv.cfg"""
+    frontier: List[str] = [str(root)]
+
+    for depth in range(scan_depth + 1):
+        children: List[str] = []
+        for directory in frontier:
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            # The root was already probed, only its subdirectories are new
+            if depth > 0 and any(e.name == VENV_MARKER and e.is_file() for e in entries):
+                return Path(directory)
+
+            if depth == scan_depth:
+                continue
+
+            for entry in entries:
+                if entry.name in IGNORED_DIRS or (depth == 0 and entry.name == skip):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        children.append(entry.path)
+                except OSError:
+                    continue
+
+        if not children:
+            return None
+        frontier = sorted(children, key=_scan_order)
+
+    return None
+
+def _scan_order(path: str):
+    """Visit the usual venv names first, then everything else alphabetically"""
+    name = os.path.basename(path)
+    return (name not in KNOWN_VENV_NAMES, name)
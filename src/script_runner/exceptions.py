@@ -27,3 +27,39 @@ class ScriptNotFoundError(FileNotFoundError):
         self.message = message
         self.value = value
         super().__init__(self.message)
+
+class DependencyCycleError(Exception):
+    def __init__(self, message: str="Dependency cycle detected", value: Optional[str]=None):
+        if value:
+            message = f"{message}: {value}"
+
+        self.message = message
+        self.value = value
+        super().__init__(self.message)
+
+class InvalidScheduleError(ValueError):
+    def __init__(self, message: str="Invalid cron schedule", value: Optional[str]=None):
+        if value:
+            message = f"{message}: {value}"
+
+        self.message = message
+        self.value = value
+        super().__init__(self.message)
+
+class JobNotFoundError(Exception):
+    def __init__(self, message: str="Job not found", value: Optional[str]=None):
+        if value:
+            message = f"{message}: {value}"
+
+        self.message = message
+        self.value = value
+        super().__init__(self.message)
+
+class JobServerError(Exception):
+    def __init__(self, message: str="Job server is not running", value: Optional[str]=None):
+        if value:
+            message = f"{message}: {value}"
+
+        self.message = message
+        self.value = value
+        super().__init__(self.message)
@@ -0,0 +1,267 @@
+# Entry point for the sr / script_runner console scripts.
+#
+# `sr run ALIAS ...` is handled here without importing click or the rest of
+# the package: argv is parsed by hand, only the requested registry entry is
+# decoded, and the process replaces itself with the target interpreter via
+# os.execve. While run metrics are enabled the script is spawned as a child
+# instead, so its resource usage can be recorded. Anything this path does not
+# handle (other commands, options before ALIAS other than -v, missing aliases
+# or files, RUNNER_KEYS entries, registries that still need migrating) falls
+# back to the full click CLI, which also reports errors.
+#
+# `sr submit ALIAS ...` is likewise sent straight to the job server's socket
+# (see jobs.py) and only falls back when the server is not running.
+import json
+import os
+import sys
+
+# Must match storage.SCHEMA_VERSION; older registries take the full path
+SCHEMA_VERSION = 2
+
+SHELL_SUFFIXES = ('.sh', '.bash', '.zsh', '.fish')
+
+# Must match metrics.METRICS_MAX_BYTES
+METRICS_MAX_BYTES = 20 * 1024 * 1024
+
+# Entry settings that need the full runner: warm servers, timeouts and retries
+RUNNER_KEYS = ('warm', 'timeout', 'retries', 'limits')
+
+def main():
+    argv = sys.argv[1:]
+    if argv and argv[0] == 'run':
+        try:
+            _fast_run(argv[1:])
+        except Exception:
+            pass
+    elif argv and argv[0] == 'submit':
+        _fast_submit(argv[1:])
+
+    from .cli import cli
+    cli()
+
+def _parse_run_args(args):
+    """Split `run` arguments into (alias, script_args, verbose), or None to defer to click
+
+    As in the click command, options only come before ALIAS; everything
+    after it belongs to the script, even arguments that look like sr options.
+    """
+    verbose = False
+    for i, arg in enumerate(args):
+        if arg in ('-v', '--verbose'):
+            verbose = True
+        elif arg.startswith('-'):
+            # --help, the runner options, combined short flags and `--` are left to click
+            return None
+        else:
+            return arg, args[i + 1:], verbose
+    return None
+
+def _config_dir():
+    return os.path.join(os.path.expanduser('~'), '.config', 'script_runner')
+
+def _find_entry(config_dir, alias):
+    """Read a single registry entry without loading the rest of the registry"""
+    backend = os.environ.get('SCRIPT_RUNNER_BACKEND', 'json')
+
+    if backend == 'sqlite':
+        import sqlite3
+        database = os.path.join(config_dir, 'scripts.db')
+        if not os.path.exists(database):
+            return None
+        connection = sqlite3.connect(database)
+        try:
+            if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                return None
+            row = connection.execute('SELECT data FROM scripts WHERE alias = ?', (alias,)).fetchone()
+        finally:
+            connection.close()
+        return json.loads(row[0]) if row else None
+
+    if backend != 'json':
+        return None
+
+    # See storage.JsonStore: one entry per line, each starting with its alias
+    with open(os.path.join(config_dir, 'scripts.json'), encoding='utf-8') as f:
+        text = f.read()
+    if not text.startswith('{"version":%d,"scripts":[\n' % SCHEMA_VERSION):
+        return None
+
+    start = text.find('\n{"alias":' + json.dumps(alias) + ',')
+    if start == -1:
+        return None
+    end = text.find('\n', start + 1)
+    entry = json.loads(text[start + 1:end if end != -1 else None].rstrip(','))
+    return entry if entry.get('alias') == alias else None
+
+def _fast_submit(args):
+    """Queue a job over the job server's socket; returns only if the full CLI is needed"""
+    import socket
+    if not args or args[0].startswith('-') or not hasattr(socket, 'AF_UNIX'):
+        return
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(os.path.join(_config_dir(), 'jobs', 'server.sock'))
+    except OSError:
+        conn.close()
+        return
+
+    # Once the request is sent, falling back could submit the job twice
+    try:
+        with conn:
+            conn.sendall((json.dumps({'command': 'submit', 'alias': args[0], 'args': args[1:]}) + '\n').encode())
+            reply = conn.makefile('rb').readline()
+        reply = json.loads(reply) if reply else {'error': 'The job server stopped before replying'}
+    except (OSError, ValueError) as e:
+        reply = {'error': str(e)}
+    if 'id' not in reply:
+        sys.stderr.write(f"Error: {reply['error']}\n")
+        sys.exit(1)
+    sys.stdout.write(f"{reply['id']}\n")
+    sys.exit(0)
+
+def _activated_env(interpreter, script_type):
+    """Same environment runner.get_activated_env builds, using os.path only"""
+    if script_type != 'python':
+        return None
+
+    bin_dir = os.path.dirname(interpreter)
+    if os.path.basename(bin_dir) not in ('bin', 'Scripts'):
+        return None
+    venv = os.path.dirname(bin_dir)
+    if not os.path.exists(os.path.join(venv, 'pyvenv.cfg')):
+        return None
+
+    env = os.environ.copy()
+    env['VIRTUAL_ENV'] = venv
+    env['PATH'] = bin_dir + os.pathsep + env['PATH'] if 'PATH' in env else bin_dir
+    env.pop('PYTHONHOME', None)
+    return env
+
+def _apply_activation(activation):
+    """Same overlay as activation.apply"""
+    if not activation:
+        return None
+
+    env = os.environ.copy()
+    env.update(activation.get('set', {}))
+    prefix = activation.get('path')
+    if prefix:
+        env['PATH'] = prefix + os.pathsep + env['PATH'] if env.get('PATH') else prefix
+    for name in activation.get('unset', []):
+        env.pop(name, None)
+    return env
+
+def _metrics_enabled():
+    return os.environ.get('SCRIPT_RUNNER_METRICS', '1') != '0'
+
+def _spawn_and_record(entry, interpreter, cmd, env, verbose, config_dir):
+    """Run the script as a child so its resource usage can be appended to the metrics file"""
+    import signal
+    import time
+
+    file_actions = []
+    if not verbose:
+        file_actions = [
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_DUP2, 1, 2),
+        ]
+
+    started = time.time()
+    clock = time.perf_counter()
+    pid = os.posix_spawn(interpreter, cmd, env, file_actions=file_actions)
+
+    # Ctrl-C reaches the script through the terminal; other signals are passed on
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for signum in (signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, lambda signum, frame: os.kill(pid, signum))
+
+    while True:
+        try:
+            _, status, usage = os.wait4(pid, 0)
+            break
+        except InterruptedError:
+            continue
+    wall = time.perf_counter() - clock
+    returncode = os.waitstatus_to_exitcode(status)
+
+    # Same fields as metrics.run_record
+    record = {
+        'alias': entry['alias'],
+        'started': round(started, 3),
+        'wall': round(wall, 6),
+        'returncode': returncode,
+        'interpreter': entry['interpreter'],
+        'venv': env.get('VIRTUAL_ENV') if env is not os.environ else None,
+        'user': round(usage.ru_utime, 6),
+        'sys': round(usage.ru_stime, 6),
+        'max_rss': usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024),
+    }
+    # Same rotation and single append as metrics.record
+    metrics_file = os.path.join(config_dir, 'metrics.jsonl')
+    try:
+        if os.stat(metrics_file).st_size > METRICS_MAX_BYTES:
+            os.replace(metrics_file, metrics_file + '.1')
+    except OSError:
+        pass
+    try:
+        fd = os.open(metrics_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(record, separators=(',', ':')) + '\n').encode())
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+    os._exit(returncode if returncode >= 0 else 128 - returncode)
+
+def _fast_run(args):
+    """Exec the aliased script directly; returns only if the full CLI is needed"""
+    parsed = _parse_run_args(args)
+    if parsed is None:
+        return
+    alias, script_args, verbose = parsed
+
+    config_dir = _config_dir()
+    entry = _find_entry(config_dir, alias)
+    if entry is None or any(key in entry for key in RUNNER_KEYS):
+        return
+
+    script_path = os.path.realpath(entry['path'])
+    interpreter = entry['interpreter']
+    script_type = entry.get('type', 'python')
+    if not os.path.exists(script_path) or not os.path.exists(os.path.realpath(interpreter)):
+        return
+
+    if script_type == 'shell':
+        _, suffix = os.path.splitext(script_path)
+        if suffix in SHELL_SUFFIXES or not suffix:
+            try:
+                os.chmod(script_path, os.stat(script_path).st_mode | 0o755)
+            except OSError:
+                pass
+
+    if 'activation' in entry:
+        env = _apply_activation(entry['activation'])
+    else:
+        env = _activated_env(interpreter, script_type)
+    cmd = [interpreter, *entry.get('interpreter_args', []), script_path, *script_args]
+
+    env = env if env is not None else os.environ
+    if _metrics_enabled() and hasattr(os, 'posix_spawn'):
+        _spawn_and_record(entry, interpreter, cmd, env, verbose, config_dir)
+
+    if verbose:
+        os.execve(interpreter, cmd, env)
+
+    # run_script discards output when not verbose
+    saved = os.dup(1), os.dup(2)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    try:
+        os.execve(interpreter, cmd, env)
+    finally:
+        # Only reached if the exec failed; let the full CLI report it
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
@@ -0,0 +1,112 @@
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .exceptions import AliasNotFoundError, DependencyCycleError
+from .runner import forward_signals, interrupted, run_with_retries
+
+Lookup = Callable[[str], Optional[Dict]]
+
+def find_cycle(alias: str, depends_on: Sequence[str], lookup: Lookup) -> Optional[List[str]]:
+    """Return the cycle `alias` would close by depending on `depends_on`, if any
+
+    Only entries reachable from the new dependencies are visited. Aliases
+    that are not registered yet are treated as having no dependencies.
+    """
+    visited = set()
+
+    def visit(node: str, path: List[str]) -> Optional[List[str]]:
+        if node == alias:
+            return path + [node]
+        if node in visited:
+            return None
+        visited.add(node)
+        entry = lookup(node)
+        for dependency in (entry or {}).get("depends_on", []):
+            cycle = visit(dependency, path + [node])
+            if cycle:
+                return cycle
+        return None
+
+    for dependency in depends_on:
+        cycle = visit(dependency, [alias])
+        if cycle:
+            return cycle
+    return None
+
+def dependency_graph(target: str, lookup: Lookup) -> Dict[str, Dict]:
+    """Collect the target and everything it depends on, keyed by alias"""
+    graph: Dict[str, Dict] = {}
+    pending = [target]
+    while pending:
+        alias = pending.pop()
+        if alias in graph:
+            continue
+        entry = lookup(alias)
+        if entry is None:
+            raise AliasNotFoundError(value=alias)
+        graph[alias] = entry
+        pending.extend(entry.get("depends_on", []))
+
+    for alias, entry in graph.items():
+        cycle = find_cycle(alias, entry.get("depends_on", []), graph.get)
+        if cycle:
+            raise DependencyCycleError(value=" -> ".join(cycle))
+
+    return graph
+
+def run_graph(target: str,
+            lookup: Lookup,
+            max_workers: int = 4,
+            output: str = 'prefix',
+            config_dir: Optional[Path] = None) -> Dict[str, Optional[int]]:
+    """Run a target after its dependencies, independent branches in parallel
+
+    Returns each script's exit code in the order they finished; scripts
+    skipped because a dependency failed report None.
+    """
+    graph = dependency_graph(target, lookup)
+    remaining = {alias: set(entry.get("depends_on", [])) for alias, entry in graph.items()}
+    dependents: Dict[str, List[str]] = {alias: [] for alias in graph}
+    for alias, dependencies in remaining.items():
+        for dependency in dependencies:
+            dependents[dependency].append(alias)
+
+    results: Dict[str, Optional[int]] = {}
+
+    def run_one(alias: str) -> Optional[int]:
+        if interrupted():
+            return None
+        try:
+            return run_with_retries(graph[alias], (), output, config_dir)
+        except Exception as e:
+            print(f"[{alias}] Error: {e}", file=sys.stderr)
+            return 1
+
+    def skip_dependents(alias: str):
+        for dependent in dependents[alias]:
+            if dependent not in results:
+                results[dependent] = None
+                remaining.pop(dependent, None)
+                skip_dependents(dependent)
+
+    with forward_signals(), ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+        while remaining or running:
+            for alias in [alias for alias, dependencies in remaining.items() if not dependencies]:
+                del remaining[alias]
+                running[executor.submit(run_one, alias)] = alias
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                alias = running.pop(future)
+                results[alias] = future.result()
+                if results[alias] == 0:
+                    for dependent in dependents[alias]:
+                        if dependent in remaining:
+                            remaining[dependent].discard(alias)
+                else:
+                    skip_dependents(alias)
+
+    return results
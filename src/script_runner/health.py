@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+from .discovery import KNOWN_VENV_NAMES, VENV_MARKER
+
+DEFAULT_WORKERS = 16
+DEFAULT_TIMEOUT = 5.0
+
+# Result of a filesystem call that failed or did not return within the timeout
+UNKNOWN = object()
+
+def _listing(directory: str) -> Optional[Set[str]]:
+    """Names in a directory, or None if it does not exist"""
+    try:
+        return set(os.listdir(directory))
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+def gather(calls: Dict[Hashable, Callable[[], Any]],
+            max_workers: int = DEFAULT_WORKERS,
+            timeout: float = DEFAULT_TIMEOUT) -> Dict[Hashable, Any]:
+    """Run filesystem calls concurrently and return their results by key
+
+    A call still running timeout seconds after it started reports UNKNOWN,
+    as does one that raised OSError. The workers are daemon threads and a
+    replacement is started for each timed out call, so a hung mount neither
+    stalls the remaining calls nor keeps the process from exiting.
+    """
+    pending = list(calls.items())
+    results: Dict[Hashable, Any] = {}
+    started: Dict[Hashable, float] = {}
+    condition = threading.Condition()
+
+    def worker():
+        while True:
+            with condition:
+                if not pending:
+                    return
+                key, call = pending.pop()
+                started[key] = time.monotonic()
+            try:
+                value = call()
+            except OSError:
+                value = UNKNOWN
+            with condition:
+                results.setdefault(key, value)
+                condition.notify()
+
+    def start_worker():
+        threading.Thread(target=worker, daemon=True).start()
+
+    for _ in range(min(max(1, max_workers), len(calls))):
+        start_worker()
+
+    with condition:
+        while len(results) < len(calls):
+            condition.wait(min(timeout, 0.1))
+            now = time.monotonic()
+            for key, start in started.items():
+                if key not in results and now - start > timeout:
+                    results[key] = UNKNOWN
+                    if pending:
+                        start_worker()
+
+    return results
+
+def _venv_dir(interpreter: str) -> Optional[str]:
+    """The virtual environment an interpreter belongs to, judged by its path alone
+
+    Only the usual venv directory names count, so interpreters under other
+    bin directories (/usr, pyenv versions) are not mistaken for broken venvs.
+    """
+    bin_dir = os.path.dirname(interpreter)
+    venv = os.path.dirname(bin_dir)
+    if os.path.basename(bin_dir) not in ('bin', 'Scripts') or os.path.basename(venv) not in KNOWN_VENV_NAMES:
+        return None
+    return venv
+
+def check(scripts: Iterable[Dict[str, str]],
+            max_workers: int = DEFAULT_WORKERS,
+            timeout: float = DEFAULT_TIMEOUT) -> List[Dict[str, Any]]:
+    """Check that each entry's script, interpreter and virtual environment still exist
+
+    Script paths and pyvenv.cfg files are looked up by listing each
+    directory once, however many entries live in it. Interpreters are
+    checked once per distinct path, following symlinks. Each result has
+    the entry's alias, whether its script is `missing`, its `problems`, and
+    `unknown`: the paths that could not be checked in time.
+    """
+    scripts = list(scripts)
+    directories: Dict[Hashable, Callable[[], Any]] = {}
+    interpreters: Dict[Hashable, Callable[[], Any]] = {}
+    for script in scripts:
+        script_dir = os.path.dirname(script['path'])
+        directories.setdefault(('dir', script_dir), lambda d=script_dir: _listing(d))
+        interpreter = script['interpreter']
+        interpreters.setdefault(('interpreter', interpreter), lambda i=interpreter: os.path.exists(i))
+        venv = _venv_dir(interpreter)
+        if venv:
+            directories.setdefault(('dir', venv), lambda d=venv: _listing(d))
+
+    found = gather({**directories, **interpreters}, max_workers, timeout)
+
+    results = []
+    for script in scripts:
+        problems: List[str] = []
+        unknown: List[str] = []
+
+        path = script['path']
+        listing = found[('dir', os.path.dirname(path))]
+        missing = listing is not UNKNOWN and (listing is None or os.path.basename(path) not in listing)
+        if listing is UNKNOWN:
+            unknown.append(path)
+        elif missing:
+            problems.append(f"script not found: {path}")
+
+        interpreter = script['interpreter']
+        exists = found[('interpreter', interpreter)]
+        if exists is UNKNOWN:
+            unknown.append(interpreter)
+        elif not exists:
+            problems.append(f"interpreter not found: {interpreter}")
+
+        venv = _venv_dir(interpreter)
+        if venv:
+            listing = found[('dir', venv)]
+            if listing is UNKNOWN:
+                unknown.append(venv)
+            elif listing is None or VENV_MARKER not in listing:
+                problems.append(f"virtual environment has no {VENV_MARKER}: {venv}")
+
+        results.append({
+            "alias": script['alias'],
+            "missing": missing,
+            "problems": problems,
+            "unknown": unknown,
+        })
+
+    return results
@@ -0,0 +1,148 @@
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from . import health
+from .activation import venv_for
+from .storage import write_atomic
+
+INTERPRETERS_FILE = "interpreters.json"
+# Seconds a Python interpreter gets to report its version
+PROBE_TIMEOUT = 10.0
+
+_VERSION_CODE = "import json, platform, sys; print(json.dumps([platform.python_version(), sys.implementation.name]))"
+
+Record = Dict[str, Any]
+
+def fingerprint(interpreter: str) -> Optional[List[Any]]:
+    """Real path, mtime and size of an interpreter and its venv's pyvenv.cfg mtime; None if it is missing
+
+    Upgrading the interpreter changes its mtime; rebuilding a venv rewrites
+    its pyvenv.cfg, even when the python symlink ends up the same.
+    """
+    real = os.path.realpath(interpreter)
+    try:
+        stat = os.stat(real)
+    except FileNotFoundError:
+        return None
+    venv = venv_for(Path(interpreter))
+    try:
+        venv_mtime = os.stat(venv / "pyvenv.cfg").st_mtime_ns if venv else None
+    except FileNotFoundError:
+        venv_mtime = None
+    return [real, stat.st_mtime_ns, stat.st_size, venv_mtime]
+
+def inspect(interpreter: str, python: bool) -> Record:
+    """A fresh record for an interpreter; Python ones are run once to report their version"""
+    record: Record = {"fingerprint": fingerprint(interpreter), "checked": time.time()}
+    venv = venv_for(Path(interpreter))
+    record["venv"] = str(venv) if venv else None
+    if record["fingerprint"] is None or not python:
+        return record
+
+    try:
+        result = subprocess.run([interpreter, "-I", "-c", _VERSION_CODE], capture_output=True, text=True,
+                                timeout=PROBE_TIMEOUT)
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            record["error"] = lines[-1] if lines else f"exited with {result.returncode}"
+        else:
+            record["version"], record["implementation"] = json.loads(result.stdout)
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        record["error"] = str(e) or type(e).__name__
+    return record
+
+class InterpreterIndex:
+    """Version, implementation and venv of every interpreter aliases use, keyed by its path
+
+    Aliases refer to a record through their `interpreter` path, so each
+    interpreter is inspected once however many aliases share it. A record
+    is reused while the interpreter's fingerprint is unchanged, which costs
+    two stat calls; otherwise it is inspected again, and a record replacing
+    one with a different version or implementation keeps that one as
+    `previous`, marking a rebuilt venv or upgraded interpreter.
+    """
+
+    def __init__(self, config_dir: Path):
+        self.path = config_dir / INTERPRETERS_FILE
+        self.records: Dict[str, Record] = self._load()
+        self.dirty = False
+
+    def _load(self) -> Dict[str, Record]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.records, separators=(",", ":")).encode())
+        self.dirty = False
+
+    def refresh(self,
+                interpreters: Dict[str, bool],
+                max_workers: int = health.DEFAULT_WORKERS,
+                timeout: float = health.DEFAULT_TIMEOUT,
+                prune: bool = True) -> Dict[str, Any]:
+        """Bring the records of interpreters (path -> whether it is Python) up to date
+
+        Returns each interpreter's record, or health.UNKNOWN when it could
+        not be checked within timeout (plus PROBE_TIMEOUT for those that
+        had to be run). With prune, interpreters is every one in use and
+        records of the others are dropped.
+        """
+        fingerprints = health.gather(
+            {interpreter: lambda i=interpreter: fingerprint(i) for interpreter in interpreters},
+            max_workers, timeout,
+        )
+        stale: Dict[Hashable, Callable[[], Any]] = {
+            interpreter: lambda i=interpreter: inspect(i, interpreters[i])
+            for interpreter, current in fingerprints.items()
+            if current is not health.UNKNOWN and (
+                interpreter not in self.records or self.records[interpreter].get("fingerprint") != current)
+        }
+        inspected = health.gather(stale, max_workers, timeout + PROBE_TIMEOUT)
+
+        results: Dict[str, Any] = {}
+        for interpreter in interpreters:
+            record = inspected.get(interpreter, self.records.get(interpreter))
+            if fingerprints[interpreter] is health.UNKNOWN or record is health.UNKNOWN:
+                results[interpreter] = health.UNKNOWN
+                continue
+            if interpreter in inspected:
+                old = self.records.get(interpreter)
+                if old and old.get("version") and record.get("version") and \
+                        (old["version"], old["implementation"]) != (record["version"], record["implementation"]):
+                    record["previous"] = {"version": old["version"], "implementation": old.get("implementation")}
+                    record["changed"] = record["checked"]
+                self.records[interpreter] = record
+                self.dirty = True
+            results[interpreter] = record
+
+        for interpreter in set(self.records) - set(interpreters) if prune else ():
+            del self.records[interpreter]
+            self.dirty = True
+        return results
+
+def describe(record: Any) -> str:
+    """One-line summary of a record for listings"""
+    if record is health.UNKNOWN:
+        return "could not be checked"
+    if record.get("fingerprint") is None:
+        return "missing"
+    if "error" in record:
+        return f"broken: {record['error']}"
+    parts = []
+    if record.get("version"):
+        parts.append(f"{record['implementation']} {record['version']}")
+    if record.get("venv"):
+        parts.append(f"venv {record['venv']}")
+    if record.get("previous"):
+        previous = record["previous"]
+        parts.append(f"was {previous['implementation']} {previous['version']}")
+    return ", ".join(parts) if parts else "ok"
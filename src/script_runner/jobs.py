@@ -0,0 +1,337 @@
+# Local job server for short-lived clients.
+#
+# `sr serve` keeps the registry loaded and runs submitted jobs on a fixed
+# pool of worker threads, so `sr submit` costs one request on a Unix socket
+# instead of a registry load and an interpreter start. A request is one JSON
+# line and so is its reply. Jobs live in an SQLite database beside the
+# socket, written by the server and read directly by `sr status`, `sr wait`
+# and `sr logs`; each job's stdout and stderr are captured to files in its
+# own directory. Jobs still queued when the server stops run when it is
+# started again, and those it was running when it died are marked
+# interrupted.
+import json
+import queue
+import shutil
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .config import Registry
+from .exceptions import AliasNotFoundError, JobNotFoundError, JobServerError
+from . import servers
+from .runner import run_with_retries
+from .servers import bind, send_message
+
+JOBS_DIR = "jobs"
+SOCKET_FILE = "server.sock"
+DATABASE_FILE = "jobs.db"
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUED = 1000
+DEFAULT_KEEP_DAYS = 7
+# Longest the server and its workers go without checking whether to stop
+POLL_INTERVAL = 0.5
+# Seconds a client has to send its request
+REQUEST_TIMEOUT = 5.0
+
+FINISHED_STATES = ('succeeded', 'failed', 'interrupted')
+
+Job = Dict[str, Any]
+
+def socket_path(config_dir: Path) -> Path:
+    return config_dir / JOBS_DIR / SOCKET_FILE
+
+class JobStore:
+    """Submitted jobs in an SQLite table, shared by the server's threads
+
+    A job is queued, running, or finished as succeeded, failed or
+    interrupted, and keeps the registry entry it was submitted for, so a
+    queued job runs as it was submitted even after a restart. Clients open
+    their own store to read jobs; WAL mode lets them while the server writes.
+    """
+
+    def __init__(self, config_dir: Path):
+        self.jobs_dir = config_dir / JOBS_DIR
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.jobs_dir / DATABASE_FILE), check_same_thread=False, timeout=10)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, alias TEXT NOT NULL, "
+            "args TEXT NOT NULL, entry TEXT NOT NULL, state TEXT NOT NULL, returncode INTEGER, error TEXT, "
+            "pid INTEGER, submitted REAL NOT NULL, started REAL, finished REAL)"
+        )
+        self.connection.commit()
+
+    def _execute(self, sql: str, parameters: Sequence[Any] = ()) -> List[Any]:
+        with self.lock:
+            rows = self.connection.execute(sql, parameters).fetchall()
+            self.connection.commit()
+        return rows
+
+    _COLUMNS = "id, alias, args, state, returncode, error, pid, submitted, started, finished"
+
+    def _job(self, row: Sequence[Any]) -> Job:
+        job = dict(zip(self._COLUMNS.split(", "), row))
+        job["args"] = json.loads(job["args"])
+        return job
+
+    def add(self, alias: str, args: Sequence[str], entry: Dict[str, Any]) -> int:
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (alias, args, entry, state, submitted) VALUES (?, ?, ?, 'queued', ?)",
+                (alias, json.dumps(list(args)), json.dumps(entry), time.time()),
+            )
+            self.connection.commit()
+        return cursor.lastrowid
+
+    def get(self, job_id: int) -> Job:
+        rows = self._execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            raise JobNotFoundError(value=str(job_id))
+        return self._job(rows[0])
+
+    def entry(self, job_id: int) -> Dict[str, Any]:
+        return json.loads(self._execute("SELECT entry FROM jobs WHERE id = ?", (job_id,))[0][0])
+
+    def recent(self, limit: int) -> List[Job]:
+        rows = self._execute(f"SELECT {self._COLUMNS} FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+        return [self._job(row) for row in reversed(rows)]
+
+    def update(self, job_id: int, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def recover(self) -> List[int]:
+        """Mark jobs left running by a previous server interrupted; returns the queued ones, oldest first"""
+        self._execute(
+            "UPDATE jobs SET state = 'interrupted', finished = ?, error = 'the job server stopped while it ran' "
+            "WHERE state = 'running'", (time.time(),)
+        )
+        return [job_id for (job_id,) in self._execute("SELECT id FROM jobs WHERE state = 'queued' ORDER BY id")]
+
+    def prune(self, before: float) -> int:
+        """Forget jobs that finished before a timestamp, with their output"""
+        finished = self._execute("SELECT id FROM jobs WHERE finished < ?", (before,))
+        for (job_id,) in finished:
+            shutil.rmtree(self.output_dir(job_id), ignore_errors=True)
+        self._execute("DELETE FROM jobs WHERE finished < ?", (before,))
+        return len(finished)
+
+    def output_dir(self, job_id: int) -> Path:
+        """Directory holding the job's stdout and stderr files"""
+        return self.jobs_dir / str(job_id)
+
+class JobServer:
+    """Runs jobs submitted over a Unix socket on max_workers threads
+
+    Submissions are checked against the registry as they arrive, which is
+    reloaded when its file changes, and refused once max_queued jobs are
+    waiting. Requests are handled one at a time on the calling thread; a
+    `wait` request keeps its connection open until the job finishes.
+    """
+
+    def __init__(self,
+                registry: Registry,
+                max_workers: int = DEFAULT_WORKERS,
+                max_queued: int = DEFAULT_MAX_QUEUED,
+                log: Callable[[str], None] = servers.log):
+        self.registry = registry
+        self.config_dir = registry.config_dir
+        self.store = JobStore(self.config_dir)
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max_queued
+        self.log = log
+        self.queue: "queue.Queue[int]" = queue.Queue()
+        self.ready = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        # Job id -> connections of clients waiting for it to finish
+        self.waiters: Dict[int, List[socket.socket]] = {}
+        self.registry_mtime: Optional[int] = None
+
+    def refresh(self):
+        """Reload the registry if its file changed"""
+        try:
+            mtime = self.registry.store.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.registry_mtime:
+            self.registry_mtime = mtime
+            self.registry.store.reload()
+
+    def serve_forever(self):
+        """Serve until stop() is called, then wait for running jobs to finish"""
+        path = socket_path(self.config_dir)
+        server = bind(str(path))
+        if server is None:
+            raise JobServerError("Job server is already running", str(path))
+        server.settimeout(POLL_INTERVAL)
+
+        for job_id in self.store.recover():
+            self.queue.put(job_id)
+        workers = [threading.Thread(target=self._work, daemon=True) for _ in range(self.max_workers)]
+        for worker in workers:
+            worker.start()
+
+        self.log(f"job server started on {path} with {self.max_workers} workers, {self.queue.qsize()} jobs queued")
+        self.ready.set()
+        try:
+            while not self.stopping.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                self._handle(conn)
+        finally:
+            server.close()
+            path.unlink(missing_ok=True)
+            for worker in workers:
+                worker.join()
+            with self.lock:
+                for conns in self.waiters.values():
+                    for conn in conns:
+                        conn.close()
+                self.waiters.clear()
+            self.log("job server stopped")
+
+    def stop(self, *_):
+        self.stopping.set()
+
+    def _handle(self, conn: socket.socket):
+        conn.settimeout(REQUEST_TIMEOUT)
+        try:
+            request = json.loads(conn.makefile("rb").readline())
+        except (OSError, ValueError):
+            conn.close()
+            return
+
+        command = request.get("command")
+        if command == "submit":
+            reply = self._submit(request.get("alias"), request.get("args", []))
+        elif command == "wait":
+            reply = self._wait(conn, request.get("id"))
+            if reply is None:
+                return
+        else:
+            reply = {"error": f"Unknown command: {command}"}
+        send_message(conn, reply)
+        conn.close()
+
+    def _submit(self, alias: Any, args: Any) -> Dict[str, Any]:
+        if not isinstance(alias, str) or not isinstance(args, list):
+            return {"error": "A submission needs an alias and a list of arguments"}
+        if self.queue.qsize() >= self.max_queued:
+            return {"error": f"The queue is full ({self.max_queued} jobs waiting)"}
+        self.refresh()
+        try:
+            entry = self.registry.get_script(alias)
+        except AliasNotFoundError as e:
+            return {"error": str(e)}
+
+        job_id = self.store.add(alias, [str(arg) for arg in args], entry)
+        self.queue.put(job_id)
+        return {"id": job_id}
+
+    def _wait(self, conn: socket.socket, job_id: Any) -> Optional[Dict[str, Any]]:
+        """The reply for a finished job; otherwise keeps conn to answer once it finishes"""
+        with self.lock:
+            try:
+                job = self.store.get(job_id)
+            except JobNotFoundError as e:
+                return {"error": str(e)}
+            if job["state"] in FINISHED_STATES:
+                return {"job": job}
+            conn.settimeout(None)
+            self.waiters.setdefault(job_id, []).append(conn)
+        return None
+
+    def _work(self):
+        while not self.stopping.is_set():
+            try:
+                job_id = self.queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            self._run(job_id)
+
+    def _run(self, job_id: int):
+        job = self.store.get(job_id)
+        label = f"job {job_id} ({job['alias']})"
+        self.store.update(job_id, state="running", started=time.time())
+        self.log(f"{label}: started")
+
+        returncode = None
+        error = None
+        try:
+            returncode = run_with_retries(
+                self.store.entry(job_id), tuple(job["args"]), "discard", self.config_dir,
+                on_start=lambda process: self.store.update(job_id, pid=process.pid),
+                capture_dir=self.store.output_dir(job_id), detached=True,
+            )
+            self.log(f"{label}: exited with {returncode}")
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            self.log(f"{label}: Error: {error}")
+
+        with self.lock:
+            self.store.update(job_id, state="succeeded" if returncode == 0 else "failed",
+                              returncode=returncode, error=error, finished=time.time())
+            job = self.store.get(job_id)
+            for conn in self.waiters.pop(job_id, []):
+                send_message(conn, {"job": job})
+                conn.close()
+
+def run_server(registry: Registry,
+            max_workers: int = DEFAULT_WORKERS,
+            max_queued: int = DEFAULT_MAX_QUEUED,
+            keep_days: float = DEFAULT_KEEP_DAYS):
+    """Serve jobs in the foreground; SIGINT or SIGTERM stops the server after running jobs finish"""
+    server = JobServer(registry, max_workers, max_queued)
+    pruned = server.store.prune(time.time() - keep_days * 86400)
+    if pruned:
+        server.log(f"forgot {pruned} jobs finished more than {keep_days:g} days ago")
+    signal.signal(signal.SIGTERM, server.stop)
+    signal.signal(signal.SIGINT, server.stop)
+    server.serve_forever()
+
+def request(config_dir: Path, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one request to the job server and return its reply
+
+    Raises JobServerError if the server is not running or reports an
+    error, and TimeoutError if it does not reply within timeout seconds.
+    """
+    path = socket_path(config_dir)
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            conn.connect(str(path))
+        except OSError:
+            raise JobServerError(value=str(path))
+        conn.settimeout(timeout)
+        conn.sendall((json.dumps(message) + "\n").encode())
+        reply = conn.makefile("rb").readline()
+    except socket.timeout:
+        raise TimeoutError(f"No reply from the job server within {timeout:g}s")
+    finally:
+        conn.close()
+
+    if not reply:
+        raise JobServerError("The job server stopped before replying")
+    result = json.loads(reply)
+    if "error" in result:
+        raise JobServerError(result["error"])
+    return result
+
+def submit(config_dir: Path, alias: str, args: Sequence[str]) -> int:
+    """Queue a run of alias on the job server; returns the job id"""
+    return request(config_dir, {"command": "submit", "alias": alias, "args": list(args)})["id"]
+
+def wait(config_dir: Path, job_id: int, timeout: Optional[float] = None) -> Job:
+    """The job once it has finished; raises JobNotFoundError, JobServerError or TimeoutError"""
+    job = JobStore(config_dir).get(job_id)
+    if job["state"] in FINISHED_STATES:
+        return job
+    return request(config_dir, {"command": "wait", "id": job_id}, timeout)["job"]
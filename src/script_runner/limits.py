@@ -0,0 +1,123 @@
+# Per-alias resource limits, applied in the child between fork and exec.
+#
+# A registry entry's "limits" field holds any of max_memory (bytes of
+# address space), max_cpu_seconds, max_open_files and nice (the increment
+# added to the script's niceness). They are set with setrlimit, so they
+# bound the script and everything it starts, each process on its own.
+import os
+import re
+import signal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import usage_fields
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; entries with limits cannot run there
+    resource = None
+
+Limits = Dict[str, int]
+
+LIMIT_KEYS = ('max_memory', 'max_cpu_seconds', 'max_open_files', 'nice')
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+def parse_size(text: str) -> int:
+    """Bytes from a size like 512M, 2G or 1048576"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', text, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def format_size(size: int) -> str:
+    for unit in ('T', 'G', 'M', 'K'):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return str(size)
+
+def describe(limits: Limits) -> str:
+    parts = []
+    if 'max_memory' in limits:
+        parts.append(f"memory {format_size(limits['max_memory'])}")
+    if 'max_cpu_seconds' in limits:
+        parts.append(f"cpu {limits['max_cpu_seconds']}s")
+    if 'max_open_files' in limits:
+        parts.append(f"open files {limits['max_open_files']}")
+    if 'nice' in limits:
+        parts.append(f"nice {limits['nice']}")
+    return ", ".join(parts)
+
+def validate(limits: Dict[str, Optional[int]]) -> Limits:
+    """Drop unset limits and check the rest; raises ValueError"""
+    limits = {key: value for key, value in limits.items() if value is not None}
+    unknown = set(limits) - set(LIMIT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown limits: {', '.join(sorted(unknown))}")
+    for key in ('max_memory', 'max_cpu_seconds', 'max_open_files'):
+        if key in limits and limits[key] < 1:
+            raise ValueError(f"{key} must be at least 1")
+    if 'nice' in limits and not -20 <= limits['nice'] <= 19:
+        raise ValueError("nice must be between -20 and 19")
+    return limits
+
+def preexec(limits: Optional[Limits]) -> Optional[Callable[[], None]]:
+    """A preexec_fn applying limits in the child, or None without any
+
+    Everything is worked out here, in the parent, so the child only makes
+    system calls between fork and exec. A limit above the current hard
+    limit is capped to it, as only root may raise a hard limit.
+    """
+    if not limits:
+        return None
+    if resource is None:
+        raise OSError("Resource limits are only supported on Unix")
+
+    rlimits: List[Tuple[int, int, int]] = []
+    if 'max_memory' in limits:
+        rlimits.append(_rlimit(resource.RLIMIT_AS, limits['max_memory']))
+    if 'max_cpu_seconds' in limits:
+        # SIGXCPU at the soft limit, SIGKILL a second later for scripts that handle it
+        rlimits.append(_rlimit(resource.RLIMIT_CPU, limits['max_cpu_seconds'], limits['max_cpu_seconds'] + 1))
+    if 'max_open_files' in limits:
+        rlimits.append(_rlimit(resource.RLIMIT_NOFILE, limits['max_open_files']))
+    increment = limits.get('nice', 0)
+
+    def apply():
+        for which, soft, hard in rlimits:
+            resource.setrlimit(which, (soft, hard))
+        if increment:
+            os.nice(increment)
+
+    return apply
+
+def _rlimit(which: int, soft: int, hard: Optional[int] = None) -> Tuple[int, int, int]:
+    _, current = resource.getrlimit(which)
+    hard = soft if hard is None else hard
+    if current != resource.RLIM_INFINITY:
+        soft, hard = min(soft, current), min(hard, current)
+    return which, soft, hard
+
+def exceeded(limits: Optional[Limits], returncode: int, usage: Any) -> Optional[str]:
+    """Which limit a finished run was killed for exceeding, if that can be told
+
+    The CPU limit ends a script with SIGXCPU, or SIGKILL once it has used a
+    second more. The memory limit makes allocations fail rather than kill,
+    so it is only reported for a run that failed with its peak memory near
+    the limit; failures of a single large allocation show up as the
+    script's own error, such as Python's MemoryError.
+    """
+    if not limits or returncode == 0:
+        return None
+
+    cpu = limits.get('max_cpu_seconds')
+    if cpu and hasattr(signal, 'SIGXCPU'):
+        cpu_time = usage.ru_utime + usage.ru_stime if usage is not None else 0
+        if returncode == -signal.SIGXCPU or (returncode == -signal.SIGKILL and cpu_time >= cpu):
+            return f"CPU time limit of {cpu}s"
+
+    memory = limits.get('max_memory')
+    if memory and usage is not None and usage_fields(usage)['max_rss'] >= memory * 0.9:
+        return f"memory limit of {format_size(memory)}"
+
+    return None
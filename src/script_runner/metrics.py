@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+METRICS_FILE = "metrics.jsonl"
+# The metrics file is moved to metrics.jsonl.1 once it grows past this
+METRICS_MAX_BYTES = 20 * 1024 * 1024
+# Number of most recent runs compared against the ones before them for trends
+TREND_WINDOW = 10
+
+def enabled() -> bool:
+    return os.environ.get("SCRIPT_RUNNER_METRICS", "1") != "0"
+
+def record(config_dir: Path, entry: Dict[str, Any]):
+    """Append one run record to the metrics file"""
+    metrics_file = config_dir / METRICS_FILE
+    try:
+        if metrics_file.stat().st_size > METRICS_MAX_BYTES:
+            metrics_file.replace(metrics_file.with_name(METRICS_FILE + ".1"))
+    except OSError:
+        pass
+
+    # A single O_APPEND write per record keeps concurrent runs from interleaving
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+    fd = os.open(metrics_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+def run_record(script_info: Dict[str, Any],
+            started: float,
+            wall: float,
+            returncode: int,
+            usage=None,
+            venv: Optional[str] = None) -> Dict[str, Any]:
+    """Build a metrics record from a finished run and its resource usage"""
+    entry: Dict[str, Any] = {
+        "alias": script_info["alias"],
+        "started": round(started, 3),
+        "wall": round(wall, 6),
+        "returncode": returncode,
+        "interpreter": script_info["interpreter"],
+        "venv": venv,
+    }
+    if usage is not None:
+        entry.update(usage_fields(usage))
+    return entry
+
+def usage_fields(usage) -> Dict[str, Any]:
+    """CPU seconds and peak memory in bytes from a wait4 resource usage"""
+    # ru_maxrss is in kilobytes on Linux but bytes on macOS
+    max_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {"user": round(usage.ru_utime, 6), "sys": round(usage.ru_stime, 6), "max_rss": max_rss}
+
+def load(config_dir: Path, alias: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield run records, oldest first, including the rotated file"""
+    for name in (METRICS_FILE + ".1", METRICS_FILE):
+        try:
+            with open(config_dir / name, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if alias is None or entry.get("alias") == alias:
+                        yield entry
+        except OSError:
+            continue
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def summarize(records: Iterator[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-alias run counts, duration percentiles, peak memory and trend"""
+    by_alias: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in records:
+        by_alias.setdefault(entry["alias"], []).append(entry)
+
+    summary = {}
+    for alias, runs in sorted(by_alias.items()):
+        walls = [run["wall"] for run in runs]
+        recent, earlier = walls[-TREND_WINDOW:], walls[:-TREND_WINDOW]
+        trend = None
+        if earlier:
+            before = percentile(earlier, 50)
+            trend = (percentile(recent, 50) - before) / before * 100 if before else None
+        summary[alias] = {
+            "runs": len(runs),
+            "failures": sum(1 for run in runs if run["returncode"] != 0),
+            "p50": percentile(walls, 50),
+            "p95": percentile(walls, 95),
+            "cpu": sum(run.get("user", 0) + run.get("sys", 0) for run in runs) / len(runs),
+            "max_rss": max(run.get("max_rss", 0) for run in runs),
+            "trend": trend,
+            "last": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(runs[-1]["started"])),
+        }
+    return summary
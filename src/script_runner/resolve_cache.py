@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .storage import write_atomic
+from .utils import get_interpreter_args, get_interpreter_path, probe_script
+
+CACHE_FILE = "resolve_cache.json"
+DEFAULT_MAX_ENTRIES = 256
+VENV_SEARCH_DEPTH = 5
+# Bump whenever _resolve's result changes, so entries written by older
+# versions are resolved again instead of reused
+FORMAT_VERSION = 2
+
+class ResolveCache:
+    """LRU cache of script type, interpreter and venv resolutions
+
+    Each entry records the mtimes of every path its resolution depended on:
+    the script, the ancestor directories the venv search looked at and the
+    pyvenv.cfg it found. An entry is only reused while all of them are
+    unchanged, so a hit costs a handful of stat calls instead of a venv
+    search and shebang parse.
+    """
+
+    def __init__(self, config_dir: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_file = config_dir / CACHE_FILE
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = self._load()
+
+    def _load(self) -> "OrderedDict[str, Dict[str, Any]]":
+        try:
+            return OrderedDict(json.loads(self.cache_file.read_text()))
+        except (OSError, ValueError):
+            return OrderedDict()
+
+    def save(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.cache_file, json.dumps(self.entries, separators=(",", ":")).encode())
+
+    def resolve(self, script_path: Path) -> Dict[str, Optional[str]]:
+        """Resolve type, interpreter and venv for a script, using the cache when valid"""
+        script_path = script_path.resolve()
+        key = str(script_path)
+
+        entry = self.entries.get(key)
+        if entry is not None and self._is_valid(entry):
+            if next(reversed(self.entries)) != key:
+                self.entries.move_to_end(key)
+                self.save()
+            return entry["result"]
+
+        result, stamps = _resolve(script_path)
+        self.entries[key] = {"result": result, "stamps": stamps, "context": _context()}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.save()
+
+        return result
+
+    def clear(self) -> int:
+        count = len(self.entries)
+        self.entries.clear()
+        self.cache_file.unlink(missing_ok=True)
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        valid = sum(1 for entry in self.entries.values() if self._is_valid(entry))
+        return {
+            "file": str(self.cache_file),
+            "entries": len(self.entries),
+            "valid": valid,
+            "stale": len(self.entries) - valid,
+            "max_entries": self.max_entries,
+            "size": self.cache_file.stat().st_size if self.cache_file.exists() else 0,
+        }
+
+    def _is_valid(self, entry: Dict[str, Any]) -> bool:
+        if entry.get("context") != _context():
+            return False
+
+        return all(_mtime(path) == mtime for path, mtime in entry["stamps"].items())
+
+def _context() -> str:
+    """What the resolution depends on besides the stamps: its format, fallback python and PATH lookups"""
+    return f"{FORMAT_VERSION}{os.pathsep}{sys.executable}{os.pathsep}{os.environ.get('PATH', '')}"
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _resolve(script_path: Path):
+    """Run full discovery and collect the paths whose mtimes validate the result"""
+    probe = probe_script(script_path)
+    script_type = probe.type
+    interpreter = get_interpreter_path(script_path, script_type, probe=probe)
+    venv = None
+
+    watched: List[Path] = [script_path]
+    if script_type == "python":
+        if interpreter.parent.name in ("bin", "Scripts") and (interpreter.parent.parent / "pyvenv.cfg").exists():
+            venv = interpreter.parent.parent
+        # Every ancestor searched up to the one the venv was found under; a
+        # new or removed venv changes one of these directory mtimes.
+        for depth, directory in enumerate(script_path.parents, start=1):
+            watched.append(directory)
+            if depth >= VENV_SEARCH_DEPTH or (venv and directory in venv.parents):
+                break
+        if venv:
+            watched += [venv / "pyvenv.cfg", interpreter]
+
+    result = {
+        "type": script_type,
+        "interpreter": str(interpreter),
+        "venv": str(venv) if venv else None,
+        "interpreter_args": get_interpreter_args(script_type, probe),
+    }
+    stamps = {str(path): _mtime(str(path)) for path in watched}
+
+    return result, stamps
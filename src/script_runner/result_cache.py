@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .runner import CHUNK_SIZE, EventStream, LinePrefixer, emit_event, run_with_retries, stream_writer
+
+RESULTS_DIR = "results"
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+class ResultCache:
+    """Outputs of successful runs, keyed on everything that determines them
+
+    The key hashes the script's contents, the interpreter's identity (real
+    path, size and mtime), the arguments and the contents of the entry's
+    declared input files. A run with a matching key is replayed from the
+    stored stdout and stderr instead of executed. Once the cache exceeds
+    max_bytes, the least recently used results are evicted.
+    """
+
+    def __init__(self, config_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.results_dir = config_dir / RESULTS_DIR
+        self.max_bytes = max_bytes
+
+    def key(self, script_info: Dict[str, Any], args: Tuple[str, ...]) -> str:
+        interpreter = Path(script_info['interpreter']).resolve()
+        stat = interpreter.stat()
+
+        digest = hashlib.sha256()
+        digest.update(_hash_file(Path(script_info['path'])).encode())
+        digest.update(f"\0{interpreter}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+        digest.update(json.dumps(list(args)).encode())
+        for input_path in script_info.get('inputs', []):
+            digest.update(f"\0{input_path}\0{_hash_path(Path(input_path))}".encode())
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_file = self.results_dir / key / "meta.json"
+        try:
+            meta = json.loads(meta_file.read_text())
+        except (OSError, ValueError):
+            return None
+
+        meta["last_used"] = time.time()
+        meta["hits"] = meta.get("hits", 0) + 1
+        meta_file.write_text(json.dumps(meta))
+        return meta
+
+    def run(self,
+            script_info: Dict[str, Any],
+            args: Tuple[str, ...],
+            output: str = 'discard',
+            config_dir: Optional[Path] = None,
+            timeout: Optional[float] = None,
+            retries: Optional[int] = None,
+            backoff: Optional[float] = None) -> Tuple[int, bool]:
+        """Replay a cached result or execute and cache it; returns (exit code, hit)
+
+        timeout, retries and backoff are passed on to run_with_retries;
+        only the output of the attempt that succeeds is cached.
+        """
+        key = self.key(script_info, args)
+
+        if self.get(key) is not None:
+            self.replay(key, script_info['alias'], output)
+            return 0, True
+
+        staging = self.results_dir / f".{key}.{os.getpid()}"
+        try:
+            returncode = run_with_retries(script_info, args, output, config_dir, timeout, retries, backoff,
+                                          capture_dir=staging)
+            if returncode == 0:
+                self._store(key, staging, script_info['alias'], args)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return returncode, False
+
+    def replay(self, key: str, alias: str, output: str):
+        """Write a cached result's output the way the run's output mode would have"""
+        if output not in ('inherit', 'tee', 'prefix', 'jsonl'):
+            return
+
+        if output == 'jsonl':
+            emit_event(alias, 'start', cached=True)
+        for name, target in (('stdout', sys.stdout), ('stderr', sys.stderr)):
+            if output == 'jsonl':
+                writer = EventStream(alias, name)
+            elif output == 'prefix':
+                writer = LinePrefixer(f"[{alias}] ", target)
+            else:
+                writer = None
+            sink = writer.write if writer else stream_writer(target)
+            with open(self.results_dir / key / name, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    sink(chunk)
+            if writer:
+                writer.close()
+        if output == 'jsonl':
+            emit_event(alias, 'exit', returncode=0, wall=0.0, timed_out=False, cached=True)
+
+    def _store(self, key: str, staging: Path, alias: str, args: Tuple[str, ...]):
+        size = sum(f.stat().st_size for f in staging.iterdir())
+        now = time.time()
+        (staging / "meta.json").write_text(json.dumps({
+            "key": key,
+            "alias": alias,
+            "args": list(args),
+            "returncode": 0,
+            "size": size,
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+        }))
+
+        target = self.results_dir / key
+        try:
+            staging.replace(target)
+        except OSError:
+            # Another run stored the same result first
+            return
+        self.evict()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        if self.results_dir.exists():
+            for meta_file in self.results_dir.glob("*/meta.json"):
+                try:
+                    entries.append(json.loads(meta_file.read_text()))
+                except (OSError, ValueError):
+                    continue
+        return sorted(entries, key=lambda entry: entry["last_used"], reverse=True)
+
+    def evict(self) -> int:
+        """Remove least recently used results until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(entry["size"] for entry in entries)
+        removed = 0
+        while entries and total > self.max_bytes:
+            entry = entries.pop()
+            shutil.rmtree(self.results_dir / entry["key"], ignore_errors=True)
+            total -= entry["size"]
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        count = len(self.entries())
+        shutil.rmtree(self.results_dir, ignore_errors=True)
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "dir": str(self.results_dir),
+            "entries": len(entries),
+            "size": sum(entry["size"] for entry in entries),
+            "max_bytes": self.max_bytes,
+            "hits": sum(entry.get("hits", 0) for entry in entries),
+        }
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _hash_path(path: Path) -> str:
+    """Content hash of an input file, or of every file below an input directory"""
+    if path.is_file():
+        return _hash_file(path)
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(f"{child.relative_to(path)}\0{_hash_file(child)}\0".encode())
+        return digest.hexdigest()
+    return "missing"
@@ -1,10 +1,40 @@
+import base64
+import codecs
+import json
+import signal
 import subprocess
 import sys
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Any, Callable, Dict, List, Set, Tuple, Optional
 
 from script_runner.exceptions import ScriptNotFoundError
+from script_runner import activation, limits, metrics, warm
+from script_runner.warm import WarmProcess
+
+OUTPUT_MODES = ('inherit', 'discard', 'log', 'tail', 'tee', 'prefix', 'jsonl')
+
+# Bytes read from a child pipe at a time
+CHUNK_SIZE = 64 * 1024
+# How much of stderr the tail and tee modes keep for error reporting
+TAIL_BYTES = 64 * 1024
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Seconds between SIGTERM and SIGKILL when a script times out
+GRACE_PERIOD = 5.0
+# Exit code of a run that timed out, as with timeout(1)
+TIMEOUT_EXIT = 124
+DEFAULT_BACKOFF = 1.0
+FORWARDED_SIGNALS = tuple(
+    getattr(signal, name) for name in ('SIGINT', 'SIGTERM', 'SIGHUP') if hasattr(signal, name)
+)
+
+# Serialises prefixed lines from concurrently running scripts
+_output_lock = threading.Lock()
 
 def get_activated_env(interpreter_path: Path, script_type: str) -> Optional[Dict[str, str]]:
     """Create environment variables for virtual environment activation"""
@@ -37,7 +67,8 @@ def get_activated_env(interpreter_path: Path, script_type: str) -> Optional[Dict
 
     return None
 
-def run_script(script_info: Dict[str, str], args: Tuple[str, ...], verbose: bool = False):
+def build_command(script_info: Dict[str, str], args: Tuple[str, ...]) -> Tuple[List[str], Optional[Dict[str, str]]]:
+    """Validate a registry entry and build the command and environment to run it"""
     script_path = Path(script_info['path']).resolve()
     interpreter_path_original = Path(script_info['interpreter'])
     interpreter_path = interpreter_path_original.resolve()
@@ -48,19 +79,20 @@ def run_script(script_info: Dict[str, str], args: Tuple[str, ...], verbose: bool
     if not interpreter_path.exists():
         raise FileNotFoundError(f"Interpreter not found: {interpreter_path}")
 
-    # Get activated environment for virtual environments (use original path for detection)
-    env = get_activated_env(interpreter_path_original, script_type)
+    if 'activation' in script_info:
+        # Computed when the script was added, see activation.py
+        env = activation.apply(script_info['activation'])
+    else:
+        # Get activated environment for virtual environments (use original path for detection)
+        env = get_activated_env(interpreter_path_original, script_type)
 
-    # if verbose and env:
-    #     print(f"Activating virtual environment: {env.get('VIRTUAL_ENV')}")
-    #     print(f"Using interpreter: {interpreter_path}")
-    # elif verbose:
-    #     print(f"No virtual environment detected for: {interpreter_path}")
+    # Arguments from the script's shebang, like -u or deno's run, go before the script
+    interpreter_args = script_info.get('interpreter_args', [])
 
     # Build command based on script type
     if script_type == 'python':
         # Use original interpreter path to preserve venv structure
-        cmd = [str(interpreter_path_original), str(script_path), *args]
+        cmd = [str(interpreter_path_original), *interpreter_args, str(script_path), *args]
     elif script_type == 'shell':
         # For shell scripts, make them executable and run directly if possible
         # Otherwise use the interpreter
@@ -70,26 +102,588 @@ def run_script(script_info: Dict[str, str], args: Tuple[str, ...], verbose: bool
                 script_path.chmod(script_path.stat().st_mode | 0o755)
             except (OSError, AttributeError):
                 pass
-        cmd = [str(interpreter_path_original), str(script_path), *args]
+        cmd = [str(interpreter_path_original), *interpreter_args, str(script_path), *args]
     else:
-        # Fallback for unknown types
-        cmd = [str(interpreter_path_original), str(script_path), *args]
-
-    if verbose:
-        # Stream output in real-time when verbose
-        result = subprocess.run(
-            cmd,
-            text=True,
-            env=env
+        # node, ruby, perl, r, deno and unknown types
+        cmd = [str(interpreter_path_original), *interpreter_args, str(script_path), *args]
+
+    return cmd, env
+
+class RotatingLog:
+    """Append-only log file that rolls over to .1, .2, ... once it reaches max_bytes"""
+
+    def __init__(self, path: Path, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'ab')
+
+    def write(self, data: bytes):
+        with self.lock:
+            if self.file.tell() and self.file.tell() + len(data) > self.max_bytes:
+                self.rollover()
+            self.file.write(data)
+
+    def rollover(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{i}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.file = open(self.path, 'ab')
+
+    def close(self):
+        self.file.close()
+
+Sink = Callable[[bytes], None]
+
+def stream_writer(target) -> Sink:
+    """Sink that copies raw chunks to a text stream such as sys.stdout"""
+    buffer = getattr(target, 'buffer', None)
+
+    def write(chunk: bytes):
+        if buffer is not None:
+            buffer.write(chunk)
+            buffer.flush()
+        else:
+            target.write(chunk.decode(errors='replace'))
+            target.flush()
+
+    return write
+
+class LinePrefixer:
+    """Sink that writes complete lines to target, each prefixed with label"""
+
+    def __init__(self, label: str, target):
+        self.label = label
+        self.target = target
+        self.partial = b''
+
+    def write(self, chunk: bytes):
+        *lines, self.partial = (self.partial + chunk).split(b'\n')
+        if len(self.partial) >= CHUNK_SIZE:
+            lines.append(self.partial)
+            self.partial = b''
+        self._emit(lines)
+
+    def close(self):
+        if self.partial:
+            self._emit([self.partial])
+            self.partial = b''
+
+    def _emit(self, lines: List[bytes]):
+        if not lines:
+            return
+        with _output_lock:
+            for line in lines:
+                self.target.write(self.label + line.decode(errors='replace') + '\n')
+            self.target.flush()
+
+def emit_event(alias: str, event: str, **fields):
+    """Write one event of the jsonl output mode to stdout as a single line"""
+    line = json.dumps({"event": event, "alias": alias, "time": round(time.time(), 6), **fields},
+                      separators=(',', ':'))
+    with _output_lock:
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+
+class EventStream:
+    """Sink that emits each chunk of a child pipe as a stdout or stderr event
+
+    Text is decoded incrementally, so a character split between two chunks
+    arrives whole in the second. Chunks that are not valid UTF-8 are sent
+    base64 encoded in data_b64 instead of data.
+    """
+
+    def __init__(self, alias: str, stream: str):
+        self.alias = alias
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def write(self, chunk: bytes):
+        pending = self.decoder.getstate()[0]
+        try:
+            text = self.decoder.decode(chunk)
+        except UnicodeDecodeError:
+            self.decoder.reset()
+            self._emit_bytes(pending + chunk)
+            return
+        if text:
+            emit_event(self.alias, self.stream, data=text)
+
+    def close(self):
+        pending = self.decoder.getstate()[0]
+        self.decoder.reset()
+        if pending:
+            self._emit_bytes(pending)
+
+    def _emit_bytes(self, data: bytes):
+        emit_event(self.alias, self.stream, data_b64=base64.b64encode(data).decode('ascii'))
+
+def _pump(stream, sinks: List[Sink]):
+    """Copy a child pipe to every sink in fixed-size chunks until EOF"""
+    fd = stream.fileno()
+    while True:
+        chunk = os.read(fd, CHUNK_SIZE)
+        if not chunk:
+            break
+        for sink in sinks:
+            sink(chunk)
+    stream.close()
+
+Spawn = Callable[[Any, Any], Any]
+
+class RunningScript:
+    """A started script, signalled as a whole process group where it has its own
+
+    Signals go to the group, so they also reach anything the script started.
+    Once the script has exited nothing more is sent, even though its pid
+    may be reused. Exposes the stdout and stderr of the wrapped process.
+    terminal is the terminal the script's group was made the foreground of,
+    until release_terminal hands it back.
+    """
+
+    def __init__(self, process, own_group: bool, terminal: Optional[int] = None):
+        self.process = process
+        self.pid = process.pid
+        self.stdout = process.stdout
+        self.stderr = process.stderr
+        self.own_group = own_group and hasattr(os, 'killpg')
+        self.terminal = terminal
+        self.lock = threading.Lock()
+        self.exited = False
+
+    def send_signal(self, signum: int):
+        with self.lock:
+            if self.exited:
+                return
+            try:
+                if self.own_group:
+                    os.killpg(self.pid, signum)
+                else:
+                    self.process.send_signal(signum)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def kill(self):
+        self.send_signal(getattr(signal, 'SIGKILL', signal.SIGTERM))
+
+    def release_terminal(self):
+        """Make this process the terminal's foreground again, once the script is done with it"""
+        if self.terminal is not None:
+            _set_foreground(self.terminal, os.getpgrp())
+            self.terminal = None
+
+    def wait4(self) -> Tuple[int, Any]:
+        """Wait for the script; returns its exit code and resource usage where wait4 exists"""
+        if isinstance(self.process, WarmProcess):
+            result = self.process.wait4()
+        elif hasattr(os, 'waitid'):
+            # Stop signalling before the pid is reaped and can be reused
+            os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT)
+            with self.lock:
+                self.exited = True
+            _, status, usage = os.wait4(self.pid, 0)
+            self.process.returncode = os.waitstatus_to_exitcode(status)
+            result = self.process.returncode, usage
+        else:
+            result = self.process.wait(), None
+        with self.lock:
+            self.exited = True
+        return result
+
+# Scripts started by execute in this process, signalled by forward_signals
+_running: Set[RunningScript] = set()
+_running_lock = threading.Lock()
+_interrupts = 0
+
+def _forward(signum: int, frame):
+    """Pass a signal on to every running script; a second Ctrl-C kills them"""
+    global _interrupts
+    if signum == signal.SIGINT:
+        _interrupts += 1
+        if _interrupts > 1:
+            signum = getattr(signal, 'SIGKILL', signal.SIGTERM)
+    with _running_lock:
+        scripts = list(_running)
+    for script in scripts:
+        script.send_signal(signum)
+
+@contextmanager
+def forward_signals():
+    """While active, Ctrl-C, SIGTERM and SIGHUP sent to this process are passed to running scripts
+
+    Scripts run in their own process group, so a Ctrl-C typed at the
+    terminal only reaches them directly while one holds the terminal (see
+    _spawner), and then never reaches this process. Otherwise this delivers
+    the signal to them and lets this process wait for them to exit. Only
+    takes effect in the main thread.
+    """
+    global _interrupts
+    if threading.current_thread() is not threading.main_thread() or signal.getsignal(signal.SIGINT) is _forward:
+        yield
+        return
+
+    _interrupts = 0
+    previous = {signum: signal.signal(signum, _forward) for signum in FORWARDED_SIGNALS}
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+def interrupted() -> bool:
+    """Whether a forwarded Ctrl-C arrived, so callers can stop starting new runs"""
+    return _interrupts > 0
+
+def _wait(process) -> Tuple[int, Any]:
+    """Wait for a child; returns its exit code and resource usage where wait4 exists"""
+    if hasattr(process, 'wait4'):
+        return process.wait4()
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        return process.returncode, usage
+    return process.wait(), None
+
+def _spawner(script_info: Dict[str, str],
+            cmd: List[str],
+            env: Optional[Dict[str, str]],
+            config_dir: Optional[Path],
+            detached: bool = False) -> Spawn:
+    """Start function for a run: a warm server child for opted-in Python entries, else Popen
+
+    Detached scripts never get this process's terminal or stdin.
+    """
+    if script_info.get('warm') and script_info.get('type', 'python') == 'python' \
+            and not script_info.get('interpreter_args') and not script_info.get('limits') \
+            and config_dir is not None and warm.supported():
+        # Python commands are [interpreter, script, *args]; warm children start their own session
+        return lambda stdout, stderr: RunningScript(
+            WarmProcess(config_dir, cmd[0], cmd[1], cmd[2:], env, stdout, stderr, script_info.get('preload', []),
+                        stdin=subprocess.DEVNULL if detached else None),
+            own_group=True,
         )
-    else:
-        # Capture and discard output when not verbose
-        result = subprocess.run(
-            cmd,
-            text=True,
-            capture_output=True,
-            env=env
+
+    apply_limits = limits.preexec(script_info.get('limits'))
+    if os.name != 'posix':
+        return lambda stdout, stderr: RunningScript(
+            subprocess.Popen(cmd, stdout=stdout, stderr=stderr, env=env), own_group=False,
         )
 
-    if result.returncode != 0:
-        sys.exit(result.returncode)
+    def start(stdout, stderr) -> RunningScript:
+        # Every script gets its own process group, so signals and timeouts reach
+        # what it starts too. Run from the foreground of a terminal, the group is
+        # made the terminal's foreground, as a shell does, so the script can
+        # read it and gets Ctrl-C; a script in the background of a terminal
+        # would be stopped on reading it, so it reads nothing instead.
+        terminal = _stdin_terminal()
+        if detached or terminal is None or not _in_foreground(terminal):
+            process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL if detached or terminal is not None else None,
+                                       stdout=stdout, stderr=stderr, env=env, start_new_session=True,
+                                       preexec_fn=apply_limits)
+            return RunningScript(process, own_group=True)
+
+        def take_terminal():
+            os.setpgid(0, 0)
+            _set_foreground(terminal, os.getpid())
+            if apply_limits is not None:
+                apply_limits()
+
+        process = subprocess.Popen(cmd, stdout=stdout, stderr=stderr, env=env, preexec_fn=take_terminal)
+        # Also from this side, whichever of the two runs first (see _set_foreground)
+        try:
+            os.setpgid(process.pid, process.pid)
+        except OSError:
+            # The child has already exec'd
+            pass
+        _set_foreground(terminal, process.pid)
+        return RunningScript(process, own_group=True, terminal=terminal)
+
+    return start
+
+def _stdin_terminal() -> Optional[int]:
+    """This process's stdin if it is a terminal"""
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return fd if os.isatty(fd) else None
+
+def _in_foreground(terminal: int) -> bool:
+    """Whether this process may hand a script the terminal: it holds it and runs one script at a time
+
+    Only the main thread does; scripts started by worker threads
+    (run-many, run-graph, the daemon) run side by side.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    try:
+        return os.tcgetpgrp(terminal) == os.getpgrp()
+    except OSError:
+        return False
+
+def _set_foreground(terminal: int, pgrp: int):
+    """Make pgrp the terminal's foreground process group
+
+    SIGTTOU is blocked meanwhile, so it also works from a background group
+    instead of stopping it.
+    """
+    previous = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTTOU})
+    try:
+        os.tcsetpgrp(terminal, pgrp)
+    except OSError:
+        # The group is already gone
+        pass
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, previous)
+
+def _run_piped(spawn: Spawn,
+            stdout_sinks: List[Sink],
+            stderr_sinks: List[Sink],
+            merge_stderr: bool = False) -> Tuple[int, Any]:
+    """Run a process, streaming each output to its sinks; streams without sinks go to /dev/null"""
+    if merge_stderr:
+        stderr = subprocess.STDOUT
+    else:
+        stderr = subprocess.PIPE if stderr_sinks else subprocess.DEVNULL
+    process = spawn(subprocess.PIPE if stdout_sinks else subprocess.DEVNULL, stderr)
+
+    readers = [
+        threading.Thread(target=_pump, args=(stream, sinks), daemon=True)
+        for stream, sinks in ((process.stdout, stdout_sinks), (process.stderr, stderr_sinks))
+        if stream is not None
+    ]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+
+    return _wait(process)
+
+def execute(script_info: Dict[str, str],
+            args: Tuple[str, ...],
+            output: str = 'discard',
+            config_dir: Optional[Path] = None,
+            capture_dir: Optional[Path] = None,
+            on_start: Optional[Callable[[Any], None]] = None,
+            timeout: Optional[float] = None,
+            detached: bool = False) -> int:
+    """Run a registry entry and return its exit code
+
+    output selects where the child's stdout and stderr go:
+    inherit - straight to this process's terminal
+    discard - /dev/null
+    log     - both streams into a rotating log file under config_dir/logs named after the alias
+    tail    - stdout discarded, the last TAIL_BYTES of stderr kept and printed on failure
+    tee     - both streams to this process's as they are read, with the last
+              TAIL_BYTES of stderr repeated after a failure, where it may have
+              scrolled away
+    prefix  - both streams line by line to this process's, each line prefixed with the alias
+    jsonl   - one JSON object per line on this process's stdout: start, stdout and
+              stderr chunks as they are read, usage and exit (see emit_event)
+    With capture_dir, stdout and stderr are additionally written to files of
+    those names in that directory. Output is never buffered beyond a single
+    chunk (or the tail), so memory use does not depend on how much the
+    script prints.
+
+    With config_dir, wall time, CPU time and peak memory of the run are
+    appended to its metrics file, and entries flagged `warm` run in a child
+    of the interpreter's warm server (see warm.py) instead of a new process.
+    on_start is called with the RunningScript once it runs.
+
+    After timeout seconds (default: the entry's `timeout`) the script's
+    process group gets SIGTERM, then SIGKILL once GRACE_PERIOD has passed,
+    and the run returns TIMEOUT_EXIT. The entry's `limits` are applied to
+    the child with setrlimit (see limits.py), and a run ended by one is
+    reported on stderr, or in the jsonl exit event's `limit`.
+
+    A detached script reads /dev/null and runs in a session of its own even
+    when this process has a terminal, so the terminal's Ctrl-C and hangups
+    never reach it; servers run their scripts this way.
+    """
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {output}")
+
+    cmd, env = build_command(script_info, args)
+    start = _spawner(script_info, cmd, env, config_dir, detached)
+    if timeout is None:
+        timeout = script_info.get('timeout')
+    timers: List[threading.Timer] = []
+    timed_out = threading.Event()
+    running: List[RunningScript] = []
+
+    def expire(script: RunningScript):
+        timed_out.set()
+        script.send_signal(signal.SIGTERM)
+        kill = threading.Timer(GRACE_PERIOD, script.kill)
+        kill.daemon = True
+        timers.append(kill)
+        kill.start()
+
+    def spawn(stdout, stderr) -> RunningScript:
+        script = start(stdout, stderr)
+        running.append(script)
+        with _running_lock:
+            _running.add(script)
+        if timeout:
+            timer = threading.Timer(timeout, expire, (script,))
+            timer.daemon = True
+            timers.append(timer)
+            timer.start()
+        if output == 'jsonl':
+            emit_event(script_info['alias'], 'start', pid=script.pid, command=cmd)
+        if on_start is not None:
+            on_start(script)
+        return script
+
+    stdout_sinks: List[Sink] = []
+    stderr_sinks: List[Sink] = []
+    closers: List[Callable[[], None]] = []
+    tail = bytearray()
+
+    def keep_tail(chunk: bytes):
+        tail.extend(chunk)
+        del tail[:-TAIL_BYTES]
+
+    started = time.time()
+    clock = time.perf_counter()
+    try:
+        if capture_dir is None and output in ('inherit', 'discard'):
+            stream = None if output == 'inherit' else subprocess.DEVNULL
+            returncode, usage = _wait(spawn(stream, stream))
+        else:
+            if output in ('inherit', 'tee'):
+                stdout_sinks.append(stream_writer(sys.stdout))
+                stderr_sinks.append(stream_writer(sys.stderr))
+                if output == 'tee':
+                    stderr_sinks.append(keep_tail)
+            elif output == 'log':
+                if config_dir is None:
+                    raise ValueError("A config directory is required for log output")
+                log = RotatingLog(config_dir / "logs" / f"{script_info['alias']}.log")
+                closers.append(log.close)
+                stdout_sinks.append(log.write)
+                stderr_sinks.append(log.write)
+            elif output == 'tail':
+                stderr_sinks.append(keep_tail)
+            elif output == 'prefix':
+                label = f"[{script_info['alias']}] "
+                for sinks, target in ((stdout_sinks, sys.stdout), (stderr_sinks, sys.stderr)):
+                    prefixer = LinePrefixer(label, target)
+                    closers.append(prefixer.close)
+                    sinks.append(prefixer.write)
+            elif output == 'jsonl':
+                for sinks, name in ((stdout_sinks, 'stdout'), (stderr_sinks, 'stderr')):
+                    events = EventStream(script_info['alias'], name)
+                    closers.append(events.close)
+                    sinks.append(events.write)
+
+            if capture_dir is not None:
+                capture_dir.mkdir(parents=True, exist_ok=True)
+                for sinks, name in ((stdout_sinks, 'stdout'), (stderr_sinks, 'stderr')):
+                    capture = open(capture_dir / name, 'wb')
+                    closers.append(capture.close)
+                    sinks.append(capture.write)
+
+            # A log without capture takes both streams through one pipe, keeping their order
+            merge_stderr = output == 'log' and capture_dir is None
+            returncode, usage = _run_piped(spawn, stdout_sinks, stderr_sinks, merge_stderr)
+    finally:
+        for timer in timers:
+            timer.cancel()
+        with _running_lock:
+            _running.difference_update(running)
+        for script in running:
+            script.release_terminal()
+        for close in closers:
+            close()
+
+    wall = time.perf_counter() - clock
+    if timed_out.is_set():
+        returncode = TIMEOUT_EXIT
+        if output != 'jsonl':
+            print(f"[{script_info['alias']}] timed out after {timeout:g}s", file=sys.stderr, flush=True)
+
+    limit = limits.exceeded(script_info.get('limits'), returncode, usage)
+    if limit and output != 'jsonl':
+        print(f"[{script_info['alias']}] exited with {returncode}: exceeded its {limit}", file=sys.stderr, flush=True)
+
+    if output == 'jsonl':
+        if usage is not None:
+            emit_event(script_info['alias'], 'usage', wall=round(wall, 6), **metrics.usage_fields(usage))
+        emit_event(script_info['alias'], 'exit', returncode=returncode, wall=round(wall, 6),
+                   timed_out=timed_out.is_set(), **({'limit': limit} if limit else {}))
+
+    if config_dir is not None and metrics.enabled():
+        venv = env.get('VIRTUAL_ENV') if env else None
+        metrics.record(config_dir, metrics.run_record(script_info, started, wall, returncode, usage, venv))
+
+    if output in ('tail', 'tee') and returncode != 0 and tail:
+        if output == 'tee':
+            print(f"[{script_info['alias']}] exited with {returncode}, end of its stderr:", file=sys.stderr)
+        sys.stderr.write(tail.decode(errors='replace'))
+        sys.stderr.flush()
+    return returncode
+
+def run_with_retries(script_info: Dict[str, str],
+            args: Tuple[str, ...],
+            output: str = 'discard',
+            config_dir: Optional[Path] = None,
+            timeout: Optional[float] = None,
+            retries: Optional[int] = None,
+            backoff: Optional[float] = None,
+            on_start: Optional[Callable[[Any], None]] = None,
+            capture_dir: Optional[Path] = None,
+            detached: bool = False) -> int:
+    """Execute a registry entry, retrying failed attempts with exponential backoff
+
+    retries and backoff default to the entry's settings. Attempts that
+    fail or time out are retried after backoff, 2 * backoff, 4 * backoff
+    ... seconds. Runs stopped by a signal from outside, such as Ctrl-C,
+    are not. With capture_dir, each attempt's output replaces the last
+    one's there (see execute, which also describes detached).
+    """
+    retries = script_info.get('retries', 0) if retries is None else retries
+    backoff = script_info.get('backoff', DEFAULT_BACKOFF) if backoff is None else backoff
+
+    attempt = 0
+    while True:
+        returncode = execute(script_info, args, output, config_dir, capture_dir, on_start, timeout, detached)
+        # A signal from outside (Ctrl-C, the daemon's kill policy) ends the run; timeouts return TIMEOUT_EXIT
+        if returncode == 0 or returncode < 0 or attempt >= retries or interrupted():
+            return returncode
+
+        delay = backoff * 2 ** attempt
+        attempt += 1
+        if output == 'jsonl':
+            emit_event(script_info['alias'], 'retry', attempt=attempt, retries=retries, delay=delay)
+        else:
+            print(f"[{script_info['alias']}] exited with {returncode}, retry {attempt}/{retries} in {delay:g}s",
+                  file=sys.stderr, flush=True)
+        time.sleep(delay)
+
+def exit_status(returncode: int) -> int:
+    """Exit status reporting a run's exit code; a run killed by signal N gives 128+N, as in the shell"""
+    return returncode if returncode >= 0 else 128 - returncode
+
+def run_script(script_info: Dict[str, str],
+            args: Tuple[str, ...],
+            verbose: bool = False,
+            output: Optional[str] = None,
+            config_dir: Optional[Path] = None,
+            timeout: Optional[float] = None,
+            retries: Optional[int] = None,
+            backoff: Optional[float] = None):
+    with forward_signals():
+        returncode = run_with_retries(script_info, args, output or ('inherit' if verbose else 'discard'),
+                                      config_dir, timeout, retries, backoff)
+
+    if returncode != 0:
+        sys.exit(exit_status(returncode))
@@ -0,0 +1,40 @@
+# Helpers shared by the long-running servers: the scheduling daemon and the
+# job server. warm_server.py keeps its own copies of bind and send_message,
+# since it runs as a plain script under other interpreters.
+import errno
+import json
+import os
+import socket
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+def log(message: str):
+    print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {message}", flush=True)
+
+def bind(path: str) -> Optional[socket.socket]:
+    """Bind a listening Unix socket, unless another live server already owns it"""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return None
+        except OSError:
+            # Left behind by a server that died
+            os.unlink(path)
+            server.bind(path)
+        finally:
+            probe.close()
+    server.listen(16)
+    return server
+
+def send_message(conn: socket.socket, message: Dict[str, Any]):
+    """Send one JSON line, ignoring clients that have gone away"""
+    try:
+        conn.sendall((json.dumps(message) + "\n").encode())
+    except OSError:
+        pass
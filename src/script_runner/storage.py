@@ -0,0 +1,234 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from . import alias_index
+
+Entry = Dict[str, Any]
+
+# Version of the entry format; older registries are migrated once on load
+SCHEMA_VERSION = 2
+
+_HEADER = re.compile(r'\{"version":(\d+),"scripts":\[$')
+
+def write_atomic(path: Path, data: bytes):
+    """Replace path with data, writing beside it and renaming so readers never see a partial file"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class JsonStore:
+    """Registry entries kept in a single JSON file
+
+    Entries are written one per line, each starting with its alias, so a
+    single entry can be located and decoded without parsing the rest of the
+    file. Anything that changes the registry loads every entry and rewrites
+    the whole file, through a temporary file renamed over the old one,
+    and rebuilds the sorted alias index beside it (see alias_index.py).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.index_path = path.with_name(alias_index.INDEX_FILE)
+        self._text: Optional[str] = None
+        self._entries: Optional[Dict[str, Entry]] = None
+        self._version: Optional[int] = None
+        self._compact = False
+        self._dirty = False
+
+    def _read(self) -> str:
+        if self._text is None:
+            self._text = self.path.read_text() if self.path.exists() else ""
+            first_line = self._text.split("\n", 1)[0]
+            match = _HEADER.match(first_line)
+            self._compact = match is not None
+            if match:
+                self._version = int(match.group(1))
+            elif first_line.startswith("["):
+                # Plain list of entries, written before the format was versioned
+                self._version = 1
+            elif self._text.strip():
+                self._version = json.loads(self._text).get("version", 1)
+        return self._text
+
+    @property
+    def version(self) -> Optional[int]:
+        """Format version of the file on disk, None when it does not exist yet"""
+        self._read()
+        return self._version
+
+    @version.setter
+    def version(self, version: int):
+        self._read()
+        self._dirty = self._dirty or version != self._version
+        self._version = version
+
+    def _load(self) -> Dict[str, Entry]:
+        if self._entries is None:
+            text = self._read()
+            data = json.loads(text) if text.strip() else []
+            if isinstance(data, dict):
+                data = data["scripts"]
+            self._entries = {entry["alias"]: entry for entry in data}
+        return self._entries
+
+    def _lines(self) -> Iterator[Entry]:
+        for line in self._read().split("\n")[1:]:
+            if line.startswith('{"alias":'):
+                yield json.loads(line.rstrip(","))
+
+    def get(self, alias: str) -> Optional[Entry]:
+        self._read()
+        if self._entries is None and self._compact:
+            needle = '\n{"alias":' + json.dumps(alias) + ","
+            start = self._text.find(needle)
+            if start != -1:
+                end = self._text.find("\n", start + 1)
+                entry = json.loads(self._text[start + 1:end if end != -1 else None].rstrip(","))
+                if entry["alias"] == alias:
+                    return entry
+        return self._load().get(alias)
+
+    def __contains__(self, alias: str) -> bool:
+        return self.get(alias) is not None
+
+    def __iter__(self) -> Iterator[Entry]:
+        self._read()
+        if self._entries is None and self._compact:
+            return self._lines()
+        return iter(list(self._load().values()))
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def reload(self):
+        """Forget what was read or changed, so the next access reads the file again"""
+        self._text = None
+        self._entries = None
+        self._version = None
+        self._compact = False
+        self._dirty = False
+
+    def put(self, entry: Entry):
+        self._load()[entry["alias"]] = entry
+        self._dirty = True
+
+    def delete(self, alias: str) -> bool:
+        deleted = self._load().pop(alias, None) is not None
+        self._dirty = self._dirty or deleted
+        return deleted
+
+    def commit(self):
+        if not self._dirty and self.path.exists():
+            return
+        entries = self._load()
+        version = self._version or SCHEMA_VERSION
+        lines = [json.dumps({"alias": entry["alias"], **entry}, separators=(",", ":"))
+                 for entry in entries.values()]
+        write_atomic(self.path, (f'{{"version":{version},"scripts":[\n' + ",\n".join(lines) + "\n]}\n").encode())
+        self._text = None
+        self._dirty = False
+        self._write_index(entries.values())
+
+    def index(self, prefix: str = "") -> Iterator[alias_index.Row]:
+        """(alias, type, path) of entries whose alias starts with prefix, in alias order
+
+        Served from the alias index, which is rebuilt first if the registry
+        file was changed without it.
+        """
+        rows = self.indexed(prefix)
+        if rows is None:
+            if not self._dirty:
+                self.reload()
+            self._write_index(iter(self))
+            rows = self.indexed(prefix)
+        return rows if rows is not None else iter(())
+
+    def indexed(self, prefix: str = "") -> Optional[Iterator[alias_index.Row]]:
+        """Like index, but None when the alias index is missing or out of date; never reads the registry"""
+        return alias_index.search(self.index_path, prefix, alias_index.stamp(self.path))
+
+    def _write_index(self, entries):
+        # Stamp before reading, so a registry replaced in between leaves the index out of date
+        registry_stamp = alias_index.stamp(self.path)
+        if registry_stamp == "missing":
+            return
+        alias_index.write(self.index_path, (_row(entry) for entry in entries), registry_stamp)
+
+def _row(entry: Entry) -> alias_index.Row:
+    return entry["alias"], entry.get("type", "python"), entry["path"]
+
+class SqliteStore:
+    """Registry entries in an SQLite table keyed by alias
+
+    Lookups go through the primary key index and each change only touches
+    its own row, so neither depends on the number of registered aliases.
+    """
+
+    def __init__(self, path: Path):
+        import sqlite3
+
+        self.path = path
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scripts (alias TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+
+    @property
+    def version(self) -> Optional[int]:
+        return self.connection.execute("PRAGMA user_version").fetchone()[0] or None
+
+    @version.setter
+    def version(self, version: int):
+        self.connection.execute(f"PRAGMA user_version = {int(version)}")
+
+    def get(self, alias: str) -> Optional[Entry]:
+        row = self.connection.execute("SELECT data FROM scripts WHERE alias = ?", (alias,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __contains__(self, alias: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM scripts WHERE alias = ?", (alias,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[Entry]:
+        for (data,) in self.connection.execute("SELECT data FROM scripts ORDER BY rowid"):
+            yield json.loads(data)
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]
+
+    def reload(self):
+        """Discard uncommitted changes; committed ones are always read fresh"""
+        self.connection.rollback()
+
+    def put(self, entry: Entry):
+        self.connection.execute(
+            "INSERT INTO scripts (alias, data) VALUES (?, ?) "
+            "ON CONFLICT(alias) DO UPDATE SET data = excluded.data",
+            (entry["alias"], json.dumps(entry, separators=(",", ":"))),
+        )
+
+    def delete(self, alias: str) -> bool:
+        return self.connection.execute("DELETE FROM scripts WHERE alias = ?", (alias,)).rowcount > 0
+
+    def index(self, prefix: str = "") -> Iterator[alias_index.Row]:
+        """(alias, type, path) of entries whose alias starts with prefix, through the primary key index"""
+        rows = self.connection.execute(
+            "SELECT alias, data FROM scripts WHERE alias >= ? ORDER BY alias", (prefix,)
+        )
+        for alias, data in rows:
+            if not alias.startswith(prefix):
+                break
+            yield _row(json.loads(data))
+
+    def commit(self):
+        # A new database is written in the current format, like a new JsonStore file
+        if self.version is None:
+            self.version = SCHEMA_VERSION
+        self.connection.commit()
+
+BACKENDS = {
+    "json": ("scripts.json", JsonStore),
+    "sqlite": ("scripts.db", SqliteStore),
+}
@@ -1,32 +1,59 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, NamedTuple, Optional
 import os
-import sys
+import shlex
+import shutil
 import sys
 
-def get_venv(script: Path, max_depth: int = 5, depth: int = 1) -> Optional[Path]:
+from .discovery import find_venv
+
+# Bytes read from the start of a script to detect its type; Linux reads at most 256 for a shebang
+PROBE_BYTES = 512
+
+SUFFIX_TYPES = {
+    '.py': 'python',
+    '.sh': 'shell', '.bash': 'shell', '.zsh': 'shell', '.fish': 'shell',
+    '.js': 'node', '.mjs': 'node', '.cjs': 'node',
+    '.rb': 'ruby',
+    '.pl': 'perl',
+    '.r': 'r',
+    '.ts': 'deno',
+}
+
+# Shebang interpreter names, without version suffixes, and the type they run
+INTERPRETER_TYPES = {
+    'sh': 'shell', 'bash': 'shell', 'zsh': 'shell', 'fish': 'shell', 'dash': 'shell', 'ksh': 'shell',
+    'node': 'node', 'nodejs': 'node',
+    'ruby': 'ruby',
+    'perl': 'perl',
+    'Rscript': 'r',
+    'deno': 'deno',
+}
+
+# Interpreter and arguments for scripts whose shebang does not name one
+DEFAULT_INTERPRETERS = {
+    'node': ('node', []),
+    'ruby': ('ruby', []),
+    'perl': ('perl', []),
+    'r': ('Rscript', []),
+    'deno': ('deno', ['run']),
+}
+
+class ScriptProbe(NamedTuple):
+    type: str
+    # Interpreter and arguments from the shebang, [] without one
+    shebang: List[str]
+    # Type the shebang's interpreter runs, None when unrecognised
+    shebang_type: Optional[str]
+
+def get_venv(script: Path, max_depth: int = 5, depth: int = 1, memo: Optional[Dict] = None) -> Optional[Path]:
     """Get path to nearest virtual environment"""
-    if depth > max_depth and max_depth > 0:
-        return None
-
-    if not script.parent:
-        return None
-
-    venv_path_matches = list(script.parent.rglob("pyvenv.cfg"))
-
-    if not any(venv_path_matches):
-        return get_venv(script=script.parent, max_depth=max_depth, depth=depth + 1)
+    if max_depth > 0:
+        max_depth = max_depth - depth + 1
+        if max_depth <= 0:
+            return None
 
-    closest_venv: Path = venv_path_matches[0]
-    closest_distance: int = -1
-
-    for venv in venv_path_matches:
-        distance = path_distance(venv, script)
-        if distance < closest_distance or closest_distance == -1:
-            closest_venv = venv
-            closest_distance = distance
-
-    return closest_venv.parent
+    return find_venv(script, max_depth=max_depth, memo=memo)
 
 def path_distance(path1: Path, path2: Path):
     """Calculate the distance between two file paths."""
@@ -49,41 +76,92 @@ def path_distance(path1: Path, path2: Path):
 
     return distance
 
-def get_script_type(script_path: Path) -> str:
-    """Determine the type of script (python or shell)"""
+def probe_script(script_path: Path) -> ScriptProbe:
+    """Detect a script's type from its extension and shebang, reading at most PROBE_BYTES once"""
+    try:
+        with open(script_path, 'rb') as f:
+            head = f.read(PROBE_BYTES)
+    except OSError:
+        head = b''
+
+    shebang = parse_shebang(head)
+    shebang_type = interpreter_type(shebang[0]) if shebang else None
+
     # Check file extension first
-    if script_path.suffix.lower() == '.py':
+    script_type = SUFFIX_TYPES.get(script_path.suffix.lower())
+    if script_type is None:
+        script_type = shebang_type
+    if script_type is None:
+        # Default to shell for executable files without clear indication, else python
+        script_type = 'shell' if os.access(script_path, os.X_OK) else 'python'
+
+    return ScriptProbe(script_type, shebang, shebang_type)
+
+def parse_shebang(head: bytes) -> List[str]:
+    """Split a shebang into the interpreter and its arguments; [] without one
+
+    `#!/usr/bin/env NAME` gives the bare NAME, which is looked up on PATH.
+    With `env -S` the rest is split like a shell would, quotes included.
+    Everything after the interpreter is split on whitespace, so
+    `#!/usr/bin/python3 -u -X utf8` keeps both options. Variable
+    assignments given to env are not kept.
+    """
+    if not head.startswith(b'#!'):
+        return []
+    # A shebang without a newline in the probe is cut off there, as the kernel does
+    line = head[2:].split(b'\n', 1)[0].rstrip(b'\r').decode('utf-8', 'replace')
+    parts = line.split()
+    if not parts or os.path.basename(parts[0]) != 'env':
+        return parts
+
+    parts = parts[1:]
+    while parts and parts[0].startswith('-'):
+        option = parts.pop(0)
+        if option.startswith('-S') or option == '--split-string':
+            rest = ' '.join([option[2:] if option.startswith('-S') else '', *parts])
+            try:
+                parts = shlex.split(rest)
+            except ValueError:
+                parts = rest.split()
+        elif option in ('-u', '--unset', '-C', '--chdir') and parts:
+            parts.pop(0)
+    while parts and '=' in parts[0]:
+        parts.pop(0)
+    return parts
+
+def interpreter_type(interpreter: str) -> Optional[str]:
+    """The script type an interpreter runs, ignoring its directory and version suffix"""
+    name = os.path.basename(interpreter).rstrip('0123456789.-')
+    if name.startswith('python'):
         return 'python'
-    elif script_path.suffix.lower() in ['.sh', '.bash', '.zsh', '.fish']:
-        return 'shell'
+    return INTERPRETER_TYPES.get(name)
 
-    # Check shebang line for extensionless files
-    try:
-        with open(script_path, 'r', encoding='utf-8') as f:
-            first_line = f.readline().strip()
-            if first_line.startswith('#!'):
-                if 'python' in first_line.lower():
-                    return 'python'
-                elif any(shell in first_line for shell in ['sh', 'bash', 'zsh', 'fish']):
-                    return 'shell'
-    except (UnicodeDecodeError, PermissionError, FileNotFoundError):
-        pass
-
-    # Default to shell for executable files without clear indication
-    if os.access(script_path, os.X_OK):
-        return 'shell'
-
-    # Default fallback
-    return 'python'
-
-def get_interpreter_path(script_path: Path, script_type: str, custom_interpreter: Optional[Path] = None) -> Path:
-    """Get the appropriate interpreter path for the script"""
+def get_script_type(script_path: Path) -> str:
+    """Determine the type of script (python, shell, node, ruby, perl, r or deno)"""
+    return probe_script(script_path).type
+
+def get_interpreter_args(script_type: str, probe: ScriptProbe) -> List[str]:
+    """Arguments placed between the interpreter and the script, taken from the shebang when it is used"""
+    if probe.shebang and (probe.shebang_type == script_type or (script_type == 'shell' and probe.shebang_type is None)):
+        return probe.shebang[1:]
+    return list(DEFAULT_INTERPRETERS.get(script_type, ('', []))[1])
+
+def get_interpreter_path(script_path: Path,
+                        script_type: str,
+                        custom_interpreter: Optional[Path] = None,
+                        venv_memo: Optional[Dict] = None,
+                        probe: Optional[ScriptProbe] = None) -> Path:
+    """Get the appropriate interpreter path for the script
+
+    See find_venv for venv_memo. Pass the script's probe when it was
+    already taken so the file is not read again.
+    """
     if custom_interpreter:
         return custom_interpreter.resolve()
 
     if script_type == 'python':
         # Use existing venv detection logic
-        venv = get_venv(script_path)
+        venv = get_venv(script_path, memo=venv_memo)
         if venv:
             python_path = venv / ('Scripts' if os.name == 'nt' else 'bin') / 'python'
             if python_path.exists():
@@ -91,32 +169,32 @@ def get_interpreter_path(script_path: Path, script_type: str, custom_interpreter
         # Fallback to system python
         return Path(sys.executable)
 
-    elif script_type == 'shell':
-        # For shell scripts, use the default shell or try to detect from shebang
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                first_line = f.readline().strip()
-                if first_line.startswith('#!'):
-                    # Extract interpreter from shebang
-                    shebang_parts = first_line[2:].strip().split()
-                    if shebang_parts:
-                        interpreter = shebang_parts[0]
-                        # Handle common cases like #!/usr/bin/env bash
-                        if interpreter == '/usr/bin/env' and len(shebang_parts) > 1:
-                            interpreter = shebang_parts[1]
-                            # Try to find the interpreter in PATH
-                            import shutil
-                            full_path = shutil.which(interpreter)
-                            if full_path:
-                                return Path(full_path)
-                        elif Path(interpreter).exists():
-                            return Path(interpreter)
-        except (UnicodeDecodeError, PermissionError, FileNotFoundError):
-            pass
+    if probe is None:
+        probe = probe_script(script_path)
+    shebang = probe.shebang
+
+    if script_type == 'shell':
+        # For shell scripts, use the interpreter from the shebang or the default shell
+        if shebang and probe.shebang_type in ('shell', None):
+            found = _find_interpreter(shebang[0])
+            if found:
+                return found
 
         # Default to system shell
         shell = os.environ.get('SHELL', '/bin/bash')
         return Path(shell)
 
+    if script_type in DEFAULT_INTERPRETERS:
+        name = shebang[0] if shebang and probe.shebang_type == script_type else DEFAULT_INTERPRETERS[script_type][0]
+        # A missing interpreter is reported when the script is added
+        return _find_interpreter(name) or Path(name)
+
     # Fallback
     return Path(sys.executable)
+
+def _find_interpreter(name: str) -> Optional[Path]:
+    """A shebang interpreter: absolute paths as given, bare names from PATH"""
+    if os.sep in name:
+        return Path(name) if Path(name).exists() else None
+    found = shutil.which(name)
+    return Path(found) if found else None
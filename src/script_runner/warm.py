@@ -0,0 +1,177 @@
+import array
+import hashlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+WARM_DIR = "warm"
+IDLE_TIMEOUT = 600
+# How long to wait for a freshly started server to accept connections
+START_TIMEOUT = 10
+SERVER_SCRIPT = Path(__file__).with_name("warm_server.py")
+
+def socket_path(config_dir: Path, interpreter: str, preload: Sequence[str] = ()) -> Path:
+    """One server per interpreter and set of preloaded modules, so each venv gets its own
+
+    Modules are only preloaded when a server starts, so entries preloading
+    different ones cannot share it.
+    """
+    key = "\n".join([interpreter, *sorted(set(preload))])
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return config_dir / WARM_DIR / f"{digest}.sock"
+
+def _connect(path: Path) -> Optional[socket.socket]:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(path))
+        return conn
+    except OSError:
+        conn.close()
+        return None
+
+def connect(config_dir: Path, interpreter: str, preload: Sequence[str] = ()) -> socket.socket:
+    """Connect to the interpreter's warm server, starting it if it is not running"""
+    path = socket_path(config_dir, interpreter, preload)
+    conn = _connect(path)
+    if conn:
+        return conn
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".log"), "ab") as log:
+        subprocess.Popen(
+            [interpreter, str(SERVER_SCRIPT), "--socket", str(path),
+             "--idle-timeout", str(IDLE_TIMEOUT), "--preload", ",".join(preload)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        conn = _connect(path)
+        if conn:
+            return conn
+        time.sleep(0.01)
+    raise RuntimeError(f"Warm interpreter server did not start for {interpreter}")
+
+def _send(conn: socket.socket, message: Dict[str, Any], fds: List[int] = ()):
+    """Send a request: a length header carrying fds over SCM_RIGHTS, then the JSON payload"""
+    payload = json.dumps(message).encode()
+    header = len(payload).to_bytes(4, "big")
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))] if fds else []
+    conn.sendmsg([header], ancillary)
+    conn.sendall(payload)
+
+class WarmProcess:
+    """A script run by a forked child of a warm interpreter server
+
+    Mirrors the parts of subprocess.Popen that runner.execute uses: stdout
+    and stderr accept None, DEVNULL, PIPE or STDOUT, stdin None or DEVNULL,
+    and piped streams are exposed as readable file objects.
+    """
+
+    def __init__(self,
+                config_dir: Path,
+                interpreter: str,
+                script: str,
+                args: Sequence[str],
+                env: Optional[Dict[str, str]],
+                stdout=None,
+                stderr=None,
+                preload: Sequence[str] = (),
+                stdin=None):
+        self.stdout = self.stderr = None
+        self.returncode: Optional[int] = None
+
+        local: List[int] = []
+        fds = [0, 1, 2]
+        if stdin == subprocess.DEVNULL:
+            fds[0] = os.open(os.devnull, os.O_RDONLY)
+            local.append(fds[0])
+        for target, spec in ((1, stdout), (2, stderr)):
+            if spec == subprocess.DEVNULL:
+                fds[target] = os.open(os.devnull, os.O_WRONLY)
+                local.append(fds[target])
+            elif spec == subprocess.PIPE:
+                read_end, fds[target] = os.pipe()
+                local.append(fds[target])
+                setattr(self, "stdout" if target == 1 else "stderr", os.fdopen(read_end, "rb"))
+            elif spec == subprocess.STDOUT:
+                fds[target] = fds[1]
+
+        request = {
+            "script": script,
+            "args": list(args),
+            "env": dict(env if env is not None else os.environ),
+            "cwd": os.getcwd(),
+        }
+        try:
+            # A server that just hit its idle timeout may drop the first attempt
+            for attempt in range(2):
+                conn = connect(config_dir, interpreter, preload)
+                try:
+                    _send(conn, request, fds)
+                    self._reader = conn.makefile("rb")
+                    reply = self._reader.readline()
+                except OSError:
+                    reply = b""
+                if reply:
+                    self._conn = conn
+                    self.pid = json.loads(reply)["pid"]
+                    break
+                conn.close()
+            else:
+                raise RuntimeError(f"Warm interpreter server for {interpreter} did not accept the script")
+        finally:
+            # The child holds its own copies now
+            for fd in local:
+                os.close(fd)
+
+    def wait4(self) -> Tuple[int, Any]:
+        """Wait for the script; returns its exit code and resource usage like os.wait4"""
+        while True:
+            try:
+                reply = self._reader.readline()
+                break
+            except KeyboardInterrupt:
+                # The child is not in our process group, so pass Ctrl-C on
+                os.kill(self.pid, signal.SIGINT)
+        self._conn.close()
+
+        if not reply:
+            raise RuntimeError("Lost connection to the warm interpreter server")
+        result = json.loads(reply)
+        self.returncode = result["returncode"]
+        usage = SimpleNamespace(ru_utime=result["user"], ru_stime=result["sys"], ru_maxrss=result["max_rss"])
+        return self.returncode, usage
+
+    def send_signal(self, signum: int):
+        os.kill(self.pid, signum)
+
+def stop_all(config_dir: Path) -> int:
+    """Ask every running warm server to exit once its current scripts finish"""
+    stopped = 0
+    for path in sorted((config_dir / WARM_DIR).glob("*.sock")):
+        conn = _connect(path)
+        if conn is None:
+            continue
+        try:
+            _send(conn, {"command": "stop"})
+            if conn.makefile("rb").readline():
+                stopped += 1
+        except OSError:
+            pass
+        finally:
+            conn.close()
+    return stopped
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork") and sys.platform != "win32"
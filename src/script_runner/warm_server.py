@@ -0,0 +1,226 @@
+# Warm interpreter server for script_runner.
+#
+# Started by runner.py under a virtual environment's python and run as a
+# plain script, so it must only use the standard library. It imports the
+# requested modules once, then serves requests on a Unix socket: each
+# request carries the client's stdin/stdout/stderr file descriptors and a
+# JSON payload (script, argv, env, cwd). A forked child adopts them and runs
+# the script with runpy, starting from the already imported modules. The
+# server reports the child's pid, then its exit code and resource usage, and
+# exits after idle_timeout seconds with no requests or running children.
+import argparse
+import array
+import errno
+import importlib
+import json
+import os
+import runpy
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+
+HEADER = struct.Struct("!I")
+MAX_FDS = 3
+# Upper bound on idle checks; finished children wake the loop via SIGCHLD
+POLL_INTERVAL = 1.0
+
+def recv_request(conn):
+    """Read one request: a length header with file descriptors, then a JSON payload"""
+    fds = array.array("i")
+    data, ancdata, _, _ = conn.recvmsg(HEADER.size, socket.CMSG_LEN(MAX_FDS * fds.itemsize))
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+    if len(data) < HEADER.size:
+        raise ConnectionError("incomplete request header")
+
+    (length,) = HEADER.unpack(data)
+    payload = b""
+    while len(payload) < length:
+        chunk = conn.recv(length - len(payload))
+        if not chunk:
+            raise ConnectionError("incomplete request payload")
+        payload += chunk
+
+    return json.loads(payload), list(fds)
+
+def send_message(conn, message):
+    try:
+        conn.sendall((json.dumps(message) + "\n").encode())
+    except OSError:
+        pass
+
+def run_child(request, fds):
+    """In the forked child: adopt the client's stdio and run the script as __main__"""
+    # Own process group, so the client can signal everything the script starts
+    os.setsid()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, closefd=False)
+    sys.stdout = open(1, "w", closefd=False)
+    sys.stderr = open(2, "w", closefd=False)
+
+    code = 0
+    try:
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [request["script"], *request["args"]]
+        sys.path.insert(0, os.path.dirname(request["script"]))
+        runpy.run_path(request["script"], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+    os._exit(code & 0xFF)
+
+# Mirrored by servers.bind and servers.send_message for the job server
+def bind(path):
+    """Bind the server socket, unless another live server already owns it"""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return None
+        except OSError:
+            os.unlink(path)
+            server.bind(path)
+        finally:
+            probe.close()
+    server.listen(16)
+    return server
+
+def serve(path, idle_timeout):
+    server = bind(path)
+    if server is None:
+        return
+
+    # SIGCHLD writes to this pipe, so finished scripts are reported at once
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_read, False)
+    os.set_blocking(wakeup_write, False)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.set_wakeup_fd(wakeup_write)
+
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    selector.register(wakeup_read, selectors.EVENT_READ)
+    children = {}
+    last_active = time.monotonic()
+    stopping = False
+
+    try:
+        while True:
+            for key, _ in selector.select(POLL_INTERVAL):
+                if key.fileobj == wakeup_read:
+                    try:
+                        os.read(wakeup_read, 512)
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                conn, _ = server.accept()
+                last_active = time.monotonic()
+                try:
+                    request, fds = recv_request(conn)
+                except (OSError, ValueError, ConnectionError):
+                    conn.close()
+                    continue
+
+                if request.get("command") == "stop":
+                    # Take no new requests, but let running scripts finish
+                    selector.unregister(server)
+                    server.close()
+                    os.unlink(path)
+                    send_message(conn, {"stopped": os.getpid()})
+                    conn.close()
+                    stopping = True
+                    break
+
+                pid = os.fork()
+                if pid == 0:
+                    signal.set_wakeup_fd(-1)
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    os.close(wakeup_read)
+                    os.close(wakeup_write)
+                    server.close()
+                    conn.close()
+                    for other in children.values():
+                        other.close()
+                    run_child(request, fds)
+                for fd in fds:
+                    os.close(fd)
+                children[pid] = conn
+                send_message(conn, {"pid": pid})
+
+            while children:
+                pid, status, usage = os.wait4(-1, os.WNOHANG)
+                if pid == 0:
+                    break
+                conn = children.pop(pid, None)
+                if conn is None:
+                    continue
+                last_active = time.monotonic()
+                send_message(conn, {
+                    "returncode": os.waitstatus_to_exitcode(status),
+                    "user": usage.ru_utime,
+                    "sys": usage.ru_stime,
+                    "max_rss": usage.ru_maxrss,
+                })
+                conn.close()
+
+            if not children and (stopping or time.monotonic() - last_active > idle_timeout):
+                return
+    finally:
+        if not stopping:
+            server.close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+def main():
+    parser = argparse.ArgumentParser(description="script_runner warm interpreter server")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--idle-timeout", type=float, default=600)
+    parser.add_argument("--preload", default="")
+    args = parser.parse_args()
+
+    # Keep the server's own directory (the script_runner package) from
+    # shadowing modules the scripts import
+    own_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != own_dir]
+
+    for module in filter(None, args.preload.split(",")):
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"warm server: could not preload {module}: {e}", file=sys.stderr)
+
+    serve(args.socket, args.idle_timeout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+from typing import Optional
+import pytest
+from script_runner.config import Registry
+
+@pytest.fixture
+def make_script(tmp_path: Path):
+    """Build a registry entry for a Python script with the given source; extra keywords become entry fields"""
+    def _make_script(source: str, alias: str = "job", **fields):
+        script_path = tmp_path / f"{alias}.py"
+        script_path.write_text(source)
+        return {
+            "path": str(script_path),
+            "alias": alias,
+            "interpreter": sys.executable,
+            "type": "python",
+            **fields,
+        }
+
+    return _make_script
+
+@pytest.fixture
+def backend() -> str:
+    """Storage backend of the registry fixture; override to parametrize"""
+    return "json"
+
+@pytest.fixture
+def registry(tmp_path: Path, monkeypatch, backend: str):
+    """A registry in the default location under a temporary HOME, so the CLI uses it too"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("SCRIPT_RUNNER_BACKEND", backend)
+    return Registry()
+
+@pytest.fixture
+def add_script(registry: Registry, tmp_path: Path):
+    """Write a script and register it under alias, passing options on to Registry.add_script
+
+    Python scripts run with this interpreter unless told otherwise.
+    """
+    def _add_script(alias: str, source: str = "pass\n", suffix: str = ".py",
+                    interpreter: Optional[Path] = None, **options) -> Path:
+        script_path = tmp_path / f"{alias}{suffix}"
+        script_path.write_text(source)
+        if interpreter is None and suffix == ".py":
+            interpreter = Path(sys.executable)
+        registry.add_script(script_path, alias=alias, interpreter_path=interpreter, **options)
+        return script_path
+
+    return _add_script
@@ -0,0 +1,64 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+import pytest
+from script_runner import activation
+from script_runner.config import Registry
+from script_runner.runner import build_command
+
+@pytest.fixture
+def venv_path(tmp_path: Path):
+    venv_path = tmp_path / "project" / ".venv"
+    (venv_path / "bin").mkdir(parents=True)
+    (venv_path / "pyvenv.cfg").touch()
+    (venv_path / "bin" / "python").symlink_to(sys.executable)
+    return venv_path
+
+def test_compute_standard_activation(venv_path: Path, tmp_path: Path):
+    assert activation.compute(venv_path / "bin" / "python", "python") == {
+        "set": {"VIRTUAL_ENV": str(venv_path)},
+        "path": str(venv_path / "bin"),
+        "unset": ["PYTHONHOME"],
+    }
+    assert activation.compute(Path(sys.executable), "shell") is None
+    assert activation.compute(tmp_path / "python", "python") == {}
+
+def test_apply_overlays_the_environment():
+    stored = {"set": {"VIRTUAL_ENV": "/v"}, "path": "/v/bin", "unset": ["PYTHONHOME"]}
+
+    env = activation.apply(stored, {"PATH": "/usr/bin", "PYTHONHOME": "/x", "KEEP": "1"})
+
+    assert env == {"PATH": "/v/bin" + os.pathsep + "/usr/bin", "VIRTUAL_ENV": "/v", "KEEP": "1"}
+    assert activation.apply({}) is None
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="capture sources bin/activate with bash")
+def test_capture_records_activate_side_effects(venv_path: Path, monkeypatch):
+    monkeypatch.setenv("DROPPED", "1")
+    (venv_path / "bin" / "activate").write_text(
+        f'export VIRTUAL_ENV="{venv_path}"\n'
+        'export PATH="$VIRTUAL_ENV/bin:$PATH"\n'
+        'export TOOL_HOME="$VIRTUAL_ENV/tool"\n'
+        'unset DROPPED\n'
+    )
+
+    captured = activation.compute(venv_path / "bin" / "python", "python", capture=True)
+
+    assert captured["set"] == {"VIRTUAL_ENV": str(venv_path), "TOOL_HOME": str(venv_path / "tool")}
+    assert captured["path"] == str(venv_path / "bin")
+    assert captured["unset"] == ["DROPPED", "PYTHONHOME"]
+
+def test_added_entries_run_with_the_stored_activation(venv_path: Path, tmp_path: Path):
+    script_path = venv_path.parent / "script.py"
+    script_path.touch()
+    registry = Registry(config_dir=tmp_path / "config")
+    registry.add_script(script_path)
+
+    entry = registry.get_script("script")
+    assert entry["activation"]["set"] == {"VIRTUAL_ENV": str(venv_path)}
+
+    # The stored overlay is used as is, without probing the venv again
+    entry["activation"]["set"]["MARKER"] = "stored"
+    _, env = build_command(entry, ())
+    assert env["MARKER"] == "stored"
+    assert env["PATH"].startswith(str(venv_path / "bin") + os.pathsep)
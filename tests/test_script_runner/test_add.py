@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 import pytest
 from script_runner.config import Registry
@@ -112,3 +113,41 @@ def test_can_add_script_with_custom_interpreter(test_registry: Registry, tmp_pat
     entry = test_registry.scripts[0]
     assert entry["interpreter"] == str(custom_interpreter)
     assert entry["type"] == "python"
+
+def test_cli_add_registers_script(tmp_path: Path, monkeypatch):
+    import sys
+    from click.testing import CliRunner
+    from script_runner.cli import cli
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    script_path = tmp_path / "job.py"
+    script_path.touch()
+
+    result = CliRunner().invoke(cli, ["add", str(script_path), "-i", sys.executable, "-d", "other"])
+    assert result.exit_code == 0
+    assert result.output == f"Added script 'job' -> {script_path}\n"
+    assert CliRunner().invoke(cli, ["list"]).output == f"job (python): {script_path}\n"
+
+@pytest.mark.skipif(os.name != "posix", reason="the registry lock needs flock")
+def test_resolution_runs_without_the_registry_lock(test_registry: Registry, tmp_path: Path, monkeypatch):
+    import fcntl
+    from script_runner import config
+
+    lock_free = []
+
+    def compute(*args):
+        with open(test_registry.config_dir / config.LOCK_FILE, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                lock_free.append(True)
+            except BlockingIOError:
+                lock_free.append(False)
+        return None
+
+    monkeypatch.setattr(config.activation, "compute", compute)
+    script_path = tmp_path / "script.sh"
+    script_path.write_text("#!/bin/sh\n")
+    test_registry.add_script(script_path)
+
+    assert lock_free == [True]
+    assert test_registry.get_script("script")["type"] == "shell"
@@ -0,0 +1,106 @@
+import json
+import os
+from pathlib import Path
+import pytest
+from click.testing import CliRunner
+from script_runner import alias_index
+from script_runner.cli import cli, complete_alias
+from script_runner.config import Registry
+from script_runner.storage import JsonStore
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request) -> str:
+    return request.param
+
+def test_search_finds_prefix_in_order(tmp_path: Path):
+    index_file = tmp_path / alias_index.INDEX_FILE
+    rows = [(f"job-{i:03}", "python", f"/scripts/{i}.py") for i in range(200)]
+    rows += [("with\ttab", "shell", "/new\nline"), ("a\\b", "shell", "/a")]
+    alias_index.write(index_file, reversed(rows), "1 2")
+
+    assert [row[0] for row in alias_index.search(index_file, "job-15", "1 2")] == [f"job-15{i}" for i in range(10)]
+    assert list(alias_index.search(index_file, "with\t", "1 2")) == [("with\ttab", "shell", "/new\nline")]
+    assert list(alias_index.search(index_file, "a\\", "1 2")) == [("a\\b", "shell", "/a")]
+    assert len(list(alias_index.search(index_file, "", "1 2"))) == 202
+    assert list(alias_index.search(index_file, "zzz", "1 2")) == []
+    # Out of date or missing indexes are not used
+    assert alias_index.search(index_file, "", "3 4") is None
+    assert alias_index.search(tmp_path / "missing.idx", "", "1 2") is None
+
+def test_search_empty_index(tmp_path: Path):
+    index_file = tmp_path / alias_index.INDEX_FILE
+    alias_index.write(index_file, [], "1 2")
+    assert list(alias_index.search(index_file, "", "1 2")) == []
+
+def test_aliases_follow_registry_changes(registry: Registry, tmp_path: Path, add_script):
+    add_script("deploy-web")
+    add_script("deploy-db", "#!/bin/sh\n", ".sh")
+    add_script("backup")
+
+    assert list(Registry().aliases("deploy")) == [
+        ("deploy-db", "shell", str(tmp_path / "deploy-db.sh")),
+        ("deploy-web", "python", str(tmp_path / "deploy-web.py")),
+    ]
+
+    registry.remove_alias("deploy-db")
+    assert [row[0] for row in Registry().aliases()] == ["backup", "deploy-web"]
+
+@pytest.mark.parametrize("backend", ["json"])
+def test_index_is_rebuilt_after_hand_edits(registry: Registry, add_script):
+    add_script("one")
+    registry_file = registry.config_dir / "scripts.json"
+    assert (registry.config_dir / alias_index.INDEX_FILE).exists()
+
+    data = json.loads(registry_file.read_text())
+    entry = dict(data["scripts"][0], alias="two")
+    data["scripts"].append(entry)
+    registry_file.write_text(json.dumps(data))
+    # Make the edit visible to mtime comparisons on coarse clocks
+    stamp = os.stat(registry_file).st_mtime_ns + 10 ** 9
+    os.utime(registry_file, ns=(stamp, stamp))
+
+    assert [row[0] for row in Registry().aliases()] == ["one", "two"]
+
+def test_complete_alias(add_script):
+    add_script("deploy")
+    add_script("dump", "#!/bin/sh\n", ".sh")
+    add_script("other")
+
+    items = complete_alias(None, None, "d")
+
+    assert [(item.value, item.help) for item in items] == [("deploy", "python"), ("dump", "shell")]
+
+@pytest.mark.parametrize("backend", ["json"])
+def test_complete_alias_does_not_read_the_registry(registry: Registry, add_script, monkeypatch):
+    add_script("deploy")
+    add_script("other")
+
+    def fail(self):
+        raise AssertionError("completion should only read the alias index")
+
+    monkeypatch.setattr(JsonStore, "_read", fail)
+
+    assert [item.value for item in complete_alias(None, None, "de")] == ["deploy"]
+
+def test_list_filters_and_formats(tmp_path: Path, add_script):
+    add_script("zeta")
+    add_script("deploy-web")
+    add_script("deploy-db", "#!/bin/sh\n", ".sh")
+    runner = CliRunner()
+
+    assert runner.invoke(cli, ["list"]).output.splitlines() == [
+        f"deploy-db (shell): {tmp_path / 'deploy-db.sh'}",
+        f"deploy-web (python): {tmp_path / 'deploy-web.py'}",
+        f"zeta (python): {tmp_path / 'zeta.py'}",
+    ]
+    assert runner.invoke(cli, ["list", "--filter", "deploy-*", "--type", "python"]).output == (
+        f"deploy-web (python): {tmp_path / 'deploy-web.py'}\n"
+    )
+    assert runner.invoke(cli, ["list", "--filter", "*a"]).output == f"zeta (python): {tmp_path / 'zeta.py'}\n"
+    assert runner.invoke(cli, ["list", "--filter", "nothing*"]).output == "No matching scripts\n"
+
+    lines = runner.invoke(cli, ["list", "--format", "jsonl", "--type", "shell"]).output.splitlines()
+    assert [json.loads(line)["alias"] for line in lines] == ["deploy-db"]
+    entries = json.loads(runner.invoke(cli, ["list", "--format", "json"]).output)
+    assert sorted(entry["alias"] for entry in entries) == ["deploy-db", "deploy-web", "zeta"]
+    assert json.loads(runner.invoke(cli, ["list", "--format", "json", "--filter", "x*"]).output) == []
@@ -0,0 +1,45 @@
+from pathlib import Path
+import pytest
+from script_runner.batch import aggregate_status, parse_manifest, run_many
+
+def test_parse_manifest():
+    manifest = """
+    # nightly jobs
+    extract --since 'last week'
+    load
+    """
+    assert parse_manifest(manifest) == [("extract", ("--since", "last week")), ("load", ())]
+
+def test_runs_concurrently_with_prefixed_output(make_script, tmp_path: Path, capfd):
+    # Each script waits for the other, so this only finishes if both run at once
+    barrier = "import os, sys, time\nopen(sys.argv[1], 'w').close()\n" \
+              "while not os.path.exists(sys.argv[2]): time.sleep(0.01)\nprint('done', sys.argv[1][-1])\n"
+    first = make_script(barrier, "first")
+    second = make_script(barrier, "second")
+    a, b = str(tmp_path / "a"), str(tmp_path / "b")
+
+    returncodes = run_many([(first, (a, b)), (second, (b, a))], max_workers=2)
+
+    assert returncodes == [0, 0]
+    out = capfd.readouterr().out.splitlines()
+    assert sorted(out) == ["[first] done a", "[second] done b"]
+
+def test_keep_going_runs_everything(make_script):
+    fail = make_script("raise SystemExit(3)\n", "fail")
+    ok = make_script("pass\n", "ok")
+
+    returncodes = run_many([(fail, ()), (ok, ()), (ok, ())], max_workers=1, output="discard")
+    assert returncodes == [3, 0, 0]
+    assert aggregate_status(returncodes) == 3
+
+def test_fail_fast_skips_pending_jobs(make_script):
+    fail = make_script("raise SystemExit(3)\n", "fail")
+    ok = make_script("pass\n", "ok")
+
+    returncodes = run_many([(fail, ()), (ok, ()), (ok, ())], max_workers=1, fail_fast=True, output="discard")
+    assert returncodes == [3, None, None]
+
+def test_aggregate_status():
+    assert aggregate_status([0, 0]) == 0
+    assert aggregate_status([0, None]) == 1
+    assert aggregate_status([0, -9, 2]) == 137
@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+import pytest
+from script_runner import bulk, utils
+from script_runner.bulk import expand_targets
+from script_runner.config import Registry
+from script_runner.exceptions import DuplicateAliasError
+
+@pytest.fixture
+def tree(tmp_path: Path):
+    root = tmp_path / "tools"
+    for relative in ("a.py", "b.sh", "notes.txt", "sub/c.py", "sub/deeper/d.py",
+                     ".hidden/e.py", "node_modules/f.py", ".venv/bin/g.py"):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("pass\n")
+    (root / ".venv" / "pyvenv.cfg").touch()
+    (root / ".venv" / "bin" / "python").touch()
+    return root
+
+@pytest.fixture
+def test_registry(tmp_path: Path):
+    return Registry(config_dir=tmp_path / "config")
+
+def test_expand_directory(tree: Path):
+    assert [p.name for p in expand_targets([str(tree)])] == ["a.py", "b.sh"]
+    assert [p.name for p in expand_targets([str(tree)], recursive=True)] == ["a.py", "b.sh", "c.py", "d.py"]
+
+def test_expand_directory_picks_up_every_known_suffix(tmp_path: Path):
+    for name in ("a.js", "b.mjs", "c.rb", "d.pl", "e.R", "f.ts", "notes.txt"):
+        (tmp_path / name).touch()
+
+    assert [p.name for p in expand_targets([str(tmp_path)])] == ["a.js", "b.mjs", "c.rb", "d.pl", "e.R", "f.ts"]
+
+def test_expand_glob_and_files_without_duplicates(tree: Path):
+    paths = expand_targets([str(tree / "sub" / "c.py"), str(tree / "sub" / "**" / "*.py")])
+
+    assert [p.name for p in paths] == ["c.py", "d.py"]
+
+def test_add_scripts_resolves_each_directory_once(test_registry: Registry, tree: Path, monkeypatch):
+    searched = []
+    get_venv = utils.get_venv
+    monkeypatch.setattr(utils, "get_venv",
+                        lambda script, **kwargs: searched.append(script.parent) or get_venv(script, **kwargs))
+    (tree / "sub" / "e.py").write_text("pass\n")
+
+    added = test_registry.add_scripts(expand_targets([str(tree)], recursive=True))
+
+    assert sorted(searched) == sorted({tree, tree / "sub", tree / "sub" / "deeper"})
+    assert [entry["alias"] for entry in added] == ["a", "b", "c", "e", "d"]
+    assert {entry["interpreter"] for entry in added if entry["type"] == "python"} == {
+        str(tree / ".venv" / "bin" / "python")
+    }
+    assert Registry(config_dir=test_registry.config_dir).get_script("b")["type"] == "shell"
+
+def test_collisions_are_reported_before_anything_is_added(test_registry: Registry, tree: Path):
+    (tree / "sub" / "a.py").write_text("pass\n")
+
+    with pytest.raises(DuplicateAliasError, match="a "):
+        test_registry.add_scripts(expand_targets([str(tree)], recursive=True))
+    assert test_registry.scripts == []
+
+def test_existing_aliases_fail_unless_skipped(test_registry: Registry, tree: Path):
+    test_registry.add_script(tree / "a.py", interpreter_path=Path(sys.executable))
+
+    with pytest.raises(DuplicateAliasError, match="a"):
+        test_registry.add_scripts([tree / "a.py", tree / "b.sh"])
+
+    added = test_registry.add_scripts([tree / "a.py", tree / "b.sh"], skip_existing=True)
+    assert [entry["alias"] for entry in added] == ["b"]
+    assert len(test_registry.scripts) == 2
@@ -0,0 +1,30 @@
+from datetime import datetime
+import pytest
+from script_runner.cron import CronExpression
+from script_runner.exceptions import InvalidScheduleError
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("*/5 * * * *", "2026-03-01 10:02", "2026-03-01 10:05"),
+    ("*/5 * * * *", "2026-03-01 10:05", "2026-03-01 10:10"),
+    ("30 2 * * *", "2026-03-01 10:00", "2026-03-02 02:30"),
+    ("0 9 * * mon-fri", "2026-10-17 12:00", "2026-10-19 09:00"),
+    ("0 0 1 jan *", "2026-06-15 00:00", "2027-01-01 00:00"),
+    ("0 12 13 * 5", "2026-10-01 00:00", "2026-10-02 12:00"),
+    ("0 0 29 2 *", "2026-03-01 00:00", "2028-02-29 00:00"),
+    ("15,45 8-10/2 * * *", "2026-03-01 08:45", "2026-03-01 10:15"),
+    ("@hourly", "2026-12-31 23:59", "2027-01-01 00:00"),
+    ("0 0 * * 7", "2026-10-18 00:00", "2026-10-25 00:00"),
+])
+def test_next_after(expression: str, after: str, expected: str):
+    moment = datetime.strptime(after, "%Y-%m-%d %H:%M")
+
+    assert CronExpression(expression).next_after(moment) == datetime.strptime(expected, "%Y-%m-%d %H:%M")
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* * * foo *", "*/0 * * * *", "5-1 * * * *"])
+def test_rejects_invalid_expressions(expression: str):
+    with pytest.raises(InvalidScheduleError):
+        CronExpression(expression)
+
+def test_never_matching_expression_fails():
+    with pytest.raises(InvalidScheduleError):
+        CronExpression("0 0 30 2 *").next_after(datetime(2026, 1, 1))
@@ -0,0 +1,118 @@
+import time
+from datetime import datetime
+from pathlib import Path
+import pytest
+from script_runner.config import Registry
+from script_runner.daemon import Daemon
+
+START = datetime(2026, 3, 1, 10, 0, 30).timestamp()
+
+@pytest.fixture
+def add(registry: Registry, add_script):
+    """Register a script on a cron schedule"""
+    def _add(alias: str, source: str, schedule: str = "* * * * *", overlap="skip"):
+        add_script(alias, source)
+        registry.set_schedule(alias, schedule, overlap)
+
+    return _add
+
+def wait_until(condition, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+@pytest.fixture
+def make_daemon(registry: Registry):
+    daemons = []
+
+    def _make_daemon():
+        messages = []
+        daemon = Daemon(registry, output="discard", log=messages.append)
+        daemon.messages = messages
+        daemons.append(daemon)
+        return daemon
+
+    yield _make_daemon
+    for daemon in daemons:
+        daemon.stop()
+        for process in list(daemon.running.values()):
+            if process is not None:
+                process.kill()
+        daemon.executor.shutdown(wait=True)
+
+def test_runs_entries_when_due(tmp_path: Path, make_daemon, add):
+    marker = tmp_path / "ran"
+    add("every-minute", f"open({str(marker)!r}, 'a').write('x')\n")
+    add("hourly", "pass\n", schedule="0 * * * *")
+    daemon = make_daemon()
+
+    assert daemon.refresh(START)
+    assert daemon.tick(START) == pytest.approx(30)
+    assert not daemon.running
+
+    daemon.tick(START + 30)
+    wait_until(lambda: not daemon.running)
+    assert marker.read_text() == "x"
+    assert daemon.messages == ["every-minute: started", "every-minute: exited with 0"]
+    assert sorted(daemon.next_due.values()) == [START + 90, START + 3570]
+
+def test_picks_up_registry_changes(registry: Registry, make_daemon, add):
+    add("job", "pass\n")
+    daemon = make_daemon()
+    daemon.refresh(START)
+    assert not daemon.refresh(START)
+
+    registry.set_schedule("job", "0 0 * * *")
+    assert daemon.refresh(START)
+    assert daemon.next_due == {"job": datetime(2026, 3, 2).timestamp()}
+
+    registry.set_schedule("job", None)
+    assert daemon.refresh(START)
+    assert daemon.tick(START + 86400) == float("inf")
+
+@pytest.mark.parametrize("overlap, expected", [
+    ("skip", ["slow: started", "slow: previous run still going, skipped"]),
+    ("queue", ["slow: started", "slow: started"]),
+    ("kill", ["slow: started", "slow: stopping previous run", "slow: exited with -15", "slow: started"]),
+])
+def test_overlap_policies(make_daemon, add, overlap: str, expected):
+    add("slow", "import time\ntime.sleep(30)\n", overlap=overlap)
+    daemon = make_daemon()
+    daemon.refresh(START)
+
+    daemon.tick(START + 30)
+    wait_until(lambda: daemon.running.get("slow") is not None)
+    daemon.tick(START + 90)
+    if overlap == "queue":
+        daemon.running["slow"].kill()
+    wait_until(lambda: len(daemon.messages) >= len(expected) and "slow" in daemon.running)
+
+    messages = [m for m in daemon.messages if "exited with -9" not in m]
+    assert messages[:len(expected)] == expected
+
+def test_kill_policy_escalates_to_sigkill(tmp_path: Path, make_daemon, add, monkeypatch):
+    monkeypatch.setattr("script_runner.daemon.GRACE_PERIOD", 0.2)
+    ready = tmp_path / "ready"
+    add("stubborn", "import signal, time\nsignal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+        f"open({str(ready)!r}, 'w').close()\ntime.sleep(30)\n", overlap="kill")
+    daemon = make_daemon()
+    daemon.refresh(START)
+
+    daemon.tick(START + 30)
+    wait_until(ready.exists)
+    daemon.tick(START + 90)
+    wait_until(lambda: daemon.messages.count("stubborn: started") == 2)
+
+    assert "stubborn: exited with -9" in daemon.messages
+
+def test_runs_are_detached_from_the_daemon(tmp_path: Path, make_daemon, add):
+    report = tmp_path / "report"
+    add("probe", f"import os\nopen({str(report)!r}, 'w').write(str(os.fstat(0).st_rdev == os.stat(os.devnull).st_rdev))\n")
+    daemon = make_daemon()
+    daemon.refresh(START)
+
+    daemon.tick(START + 30)
+    wait_until(lambda: not daemon.running)
+
+    assert report.read_text() == "True"
@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from script_runner import fastrun, metrics
+from script_runner.config import Registry
+from script_runner.fastrun import _parse_run_args
+from script_runner.metrics import load
+
+SR = "from script_runner.fastrun import main; main()"
+
+@pytest.fixture
+def home(tmp_path: Path):
+    home = tmp_path / "home"
+    home.mkdir()
+    return home
+
+def sr(home: Path, *args: str, extra_code: str = "", metrics: bool = True):
+    return subprocess.run(
+        [sys.executable, "-c", extra_code + SR, *args],
+        env={**os.environ, "HOME": str(home), "SCRIPT_RUNNER_METRICS": "1" if metrics else "0"},
+        capture_output=True,
+        text=True,
+    )
+
+def register(home: Path, name: str, source: str) -> Path:
+    script_path = home / name
+    script_path.write_text(source)
+    registry = Registry(config_dir=home / ".config" / "script_runner")
+    registry.add_script(script_path, alias="job", interpreter_path=Path(sys.executable))
+    return script_path
+
+def test_fast_path_does_not_import_click():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, script_runner.fastrun; print('click' in sys.modules)"],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+def test_runs_alias_with_arguments(home: Path):
+    register(home, "job.py", "import sys\nprint(sys.argv[1:])\nsys.exit(3)\n")
+
+    result = sr(home, "run", "-v", "job", "a", "--flag")
+    assert result.stdout.strip() == "['a', '--flag']"
+    assert result.returncode == 3
+
+    quiet = sr(home, "run", "job", "a")
+    assert quiet.stdout == ""
+    assert quiet.returncode == 3
+
+def test_arguments_after_the_alias_belong_to_the_script(home: Path):
+    script_path = register(home, "job.py", "import sys\nprint(sys.argv[1:])\n")
+    script_args = ["-v", "--output", "out.txt", "--timeout", "30", "--help", "x"]
+    expected = str(script_args)
+
+    # Through the fast path, through click (--output defers to it) and unregistered through exec
+    assert sr(home, "run", "-v", "job", *script_args).stdout.strip() == expected
+    assert sr(home, "run", "--output", "inherit", "job", *script_args).stdout.strip() == expected
+    assert sr(home, "exec", "-v", "-i", sys.executable, str(script_path), *script_args).stdout.strip() == expected
+
+def test_replaces_itself_with_the_script(home: Path):
+    register(home, "job.py", "import os\nprint(os.getpid())\n")
+
+    result = sr(home, "run", "-v", "job", extra_code="import os; print(os.getpid()); ", metrics=False)
+    sr_pid, script_pid = result.stdout.split()
+    assert sr_pid == script_pid
+
+def test_records_metrics_for_spawned_script(home: Path):
+    register(home, "job.py", "raise SystemExit(2)\n")
+
+    assert sr(home, "run", "job").returncode == 2
+    records = list(load(home / ".config" / "script_runner", "job"))
+    assert len(records) == 1
+    assert records[0]["returncode"] == 2
+    assert records[0]["max_rss"] > 0
+
+def test_fast_path_rotates_metrics(home: Path):
+    register(home, "job.py", "pass\n")
+    metrics_file = home / ".config" / "script_runner" / metrics.METRICS_FILE
+    with open(metrics_file, "wb") as f:
+        f.truncate(fastrun.METRICS_MAX_BYTES + 1)
+
+    assert fastrun.METRICS_MAX_BYTES == metrics.METRICS_MAX_BYTES
+    assert sr(home, "run", "job").returncode == 0
+    assert metrics_file.with_name(metrics.METRICS_FILE + ".1").stat().st_size == fastrun.METRICS_MAX_BYTES + 1
+    assert [record["alias"] for record in map(json.loads, metrics_file.read_text().splitlines())] == ["job"]
+
+def test_unknown_alias_falls_back_to_cli(home: Path):
+    register(home, "job.py", "pass\n")
+
+    result = sr(home, "run", "missing")
+    assert result.returncode == 1
+    assert "Alias 'missing' not found" in result.stderr
+
+@pytest.mark.parametrize("args, expected", [
+    (["job"], ("job", [], False)),
+    (["-v", "job", "x"], ("job", ["x"], True)),
+    (["job", "x", "--verbose", "--other"], ("job", ["x", "--verbose", "--other"], False)),
+    (["job", "--timeout", "30", "--help"], ("job", ["--timeout", "30", "--help"], False)),
+    (["--help", "job"], None),
+    (["--timeout", "30", "job"], None),
+    (["-xv", "job"], None),
+    ([], None),
+])
+def test_parse_run_args(args, expected):
+    assert _parse_run_args(args) == expected
+
+def test_applies_stored_activation(home: Path):
+    register(home, "job.py", "import os\nprint(os.environ['MARKER'], 'PYTHONHOME' in os.environ)\n")
+    registry = Registry(config_dir=home / ".config" / "script_runner")
+    with registry.transaction():
+        entry = registry.get_script("job")
+        entry["activation"] = {"set": {"MARKER": "on"}, "unset": ["PYTHONHOME"]}
+        registry.store.put(entry)
+
+    result = sr(home, "run", "-v", "job", extra_code="import os; os.environ['PYTHONHOME'] = '/nowhere'; ")
+    assert result.stdout.split() == ["on", "False"]
@@ -1,6 +1,7 @@
 from pathlib import Path
-from typing import Optional, Protocol
-from script_runner.utils import get_venv
+from typing import List, Optional, Protocol
+from script_runner.discovery import find_venv
+from script_runner.utils import get_venv, path_distance
 import pytest
 
 @pytest.fixture
@@ -45,3 +46,85 @@ def test_can_override_venv_detection_max_depth(venv_path: Path, get_script: Scri
     script_path = get_script("scripts/scripts/of/this/type/are/deeper")
     detected_venv = get_venv(script_path, max_depth=0)
     assert detected_venv == venv_path
+
+def legacy_get_venv(script: Path, max_depth: int = 5, depth: int = 1) -> Optional[Path]:
+    """The original recursive rglob search, kept as a reference"""
+    if depth > max_depth and max_depth > 0:
+        return None
+
+    matches = list(script.parent.rglob("pyvenv.cfg"))
+    if not matches:
+        return legacy_get_venv(script.parent, max_depth, depth + 1)
+
+    return min(matches, key=lambda venv: path_distance(venv, script)).parent
+
+@pytest.mark.parametrize("layout, script", [
+    (["venv"], "script.py"),
+    (["a/b/venv", "c/venv"], "c/d/script.py"),
+    (["deep/er/venv"], "script.py"),
+    (["tools/.venv", "venv"], "tools/bin/script.py"),
+    (["x/venv", "x/y/z/venv"], "x/y/z/w/script.py"),
+    (["one/two/venv"], "three/four/script.py"),
+])
+def test_matches_legacy_closest_venv(tmp_path: Path, layout: List[str], script: str):
+    for venv in layout:
+        (tmp_path / venv).mkdir(parents=True)
+        (tmp_path / venv / "pyvenv.cfg").touch()
+    script_path = tmp_path / script
+    script_path.parent.mkdir(parents=True, exist_ok=True)
+    script_path.touch()
+
+    assert get_venv(script_path) == legacy_get_venv(script_path)
+
+def test_skips_ignored_directories(tmp_path: Path, get_script: ScriptGetter):
+    ignored = tmp_path / "node_modules" / "pkg"
+    ignored.mkdir(parents=True)
+    (ignored / "pyvenv.cfg").touch()
+    script_path = get_script()
+
+    assert get_venv(script_path, max_depth=1) is None
+
+def test_downward_scan_is_bounded(tmp_path: Path, get_script: ScriptGetter):
+    venv = tmp_path / "a" / "b" / "c" / "venv"
+    venv.mkdir(parents=True)
+    (venv / "pyvenv.cfg").touch()
+    script_path = get_script()
+
+    assert find_venv(script_path, max_depth=1, scan_depth=3) is None
+    assert find_venv(script_path, max_depth=1, scan_depth=4) == venv
+
+def test_prefers_known_venv_names(tmp_path: Path, get_script: ScriptGetter):
+    for name in ("aaa", ".venv"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "pyvenv.cfg").touch()
+    script_path = get_script()
+
+    assert get_venv(script_path) == tmp_path / ".venv"
+
+def test_detects_venv_containing_script(tmp_path: Path):
+    venv = tmp_path / "venv"
+    (venv / "bin").mkdir(parents=True)
+    (venv / "pyvenv.cfg").touch()
+    script_path = venv / "bin" / "tool"
+    script_path.touch()
+
+    assert find_venv(script_path) == venv
+
+def test_stops_at_filesystem_root(tmp_path: Path):
+    script_path = tmp_path / "script.py"
+    script_path.touch()
+
+    assert find_venv(script_path, max_depth=0, scan_depth=0) is None
+
+def test_shared_memo_gives_the_same_answers(tmp_path: Path):
+    for venv in ("a/b/venv", "c/venv", "x/y/z/venv"):
+        (tmp_path / venv).mkdir(parents=True)
+        (tmp_path / venv / "pyvenv.cfg").touch()
+    scripts = ["c/d/script.py", "a/script.py", "c/script.py", "x/y/z/w/script.py", "x/y/script.py", "e/script.py"]
+    memo = {}
+
+    for script in scripts:
+        script_path = tmp_path / script
+        script_path.parent.mkdir(parents=True, exist_ok=True)
+        assert find_venv(script_path, memo=memo) == find_venv(script_path)
+    assert tmp_path / "c" in memo
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+import pytest
+from script_runner.config import Registry
+from script_runner.exceptions import AliasNotFoundError, DependencyCycleError
+from script_runner.graph import run_graph
+
+@pytest.fixture
+def test_registry(tmp_path: Path):
+    return Registry(config_dir=tmp_path / "config")
+
+@pytest.fixture
+def add(test_registry: Registry, tmp_path: Path):
+    """Register a script that appends its alias to a shared log, then exits with `code`"""
+    log = tmp_path / "order.log"
+
+    def _add(alias: str, *depends_on: str, code: int = 0):
+        script_path = tmp_path / f"{alias}.py"
+        script_path.write_text(f"open({str(log)!r}, 'a').write('{alias}\\n')\nraise SystemExit({code})\n")
+        test_registry.add_script(script_path, alias, Path(sys.executable), list(depends_on))
+
+    _add.log = log
+    return _add
+
+def test_runs_dependencies_first(test_registry: Registry, add):
+    add("extract")
+    add("clean", "extract")
+    add("enrich", "extract")
+    add("load", "clean", "enrich")
+
+    results = run_graph("load", test_registry.store.get, output="discard")
+
+    assert all(code == 0 for code in results.values())
+    order = add.log.read_text().split()
+    assert order[0] == "extract"
+    assert order[-1] == "load"
+    assert sorted(order[1:3]) == ["clean", "enrich"]
+
+def test_failure_skips_downstream_only(test_registry: Registry, add):
+    add("extract")
+    add("broken", "extract", code=2)
+    add("side", "extract")
+    add("load", "broken", "side")
+
+    results = run_graph("load", test_registry.store.get, output="discard")
+
+    assert results == {"extract": 0, "broken": 2, "side": 0, "load": None}
+    assert "load" not in add.log.read_text().split()
+
+def test_add_rejects_dependency_cycle(test_registry: Registry, add):
+    add("a", "c")
+    add("b", "a")
+
+    with pytest.raises(DependencyCycleError, match="c -> b -> a -> c"):
+        add("c", "b")
+    with pytest.raises(DependencyCycleError):
+        add("self", "self")
+
+def test_missing_dependency_is_reported(test_registry: Registry, add):
+    add("load", "extract")
+
+    with pytest.raises(AliasNotFoundError, match="extract"):
+        run_graph("load", test_registry.store.get)
+
+def test_cli_exit_status_is_the_failure(add_script):
+    from click.testing import CliRunner
+    from script_runner.cli import cli
+
+    add_script("extract")
+    add_script("broken", "raise SystemExit(2)\n", depends_on=["extract"])
+    add_script("load", depends_on=["broken"])
+
+    result = CliRunner().invoke(cli, ["run-graph", "load", "--quiet"])
+
+    assert result.exit_code == 2
+    assert "broken: failed (2)" in result.output
+    assert "load: skipped" in result.output
@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+from pathlib import Path
+import pytest
+from script_runner import health
+from script_runner.config import Registry
+
+def entry(alias: str, path: Path, interpreter: str = sys.executable):
+    return {"alias": alias, "path": str(path), "interpreter": interpreter, "type": "python"}
+
+def test_reports_missing_script_interpreter_and_venv(tmp_path: Path):
+    present = tmp_path / "present.py"
+    present.touch()
+    venv = tmp_path / ".venv"
+    (venv / "bin").mkdir(parents=True)
+    (venv / "bin" / "python").touch()
+
+    results = health.check([
+        entry("ok", present),
+        entry("gone", tmp_path / "gone.py"),
+        entry("no-interpreter", present, str(tmp_path / "nowhere" / "python")),
+        entry("no-cfg", present, str(venv / "bin" / "python")),
+    ])
+
+    by_alias = {result["alias"]: result for result in results}
+    assert by_alias["ok"] == {"alias": "ok", "missing": False, "problems": [], "unknown": []}
+    assert by_alias["gone"]["missing"]
+    assert by_alias["no-interpreter"]["problems"] == [f"interpreter not found: {tmp_path / 'nowhere' / 'python'}"]
+    assert by_alias["no-cfg"]["problems"] == [f"virtual environment has no pyvenv.cfg: {venv}"]
+
+def test_lists_each_directory_once(tmp_path: Path, monkeypatch):
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.py").touch()
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(health.os, "listdir", lambda path: listed.append(path) or listdir(path))
+
+    health.check([entry(name, tmp_path / f"{name}.py") for name in ("a", "b", "c")])
+
+    assert listed == [str(tmp_path)]
+
+def test_slow_paths_time_out_without_blocking_the_rest():
+    release = threading.Event()
+    calls = {"hung": release.wait, **{n: (lambda n=n: n) for n in range(20)}}
+
+    try:
+        results = health.gather(calls, max_workers=1, timeout=0.2)
+    finally:
+        release.set()
+
+    assert results["hung"] is health.UNKNOWN
+    assert [results[n] for n in range(20)] == list(range(20))
+
+def test_prune_keeps_entries_that_could_not_be_checked(tmp_path: Path, monkeypatch):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    registry = Registry(config_dir=tmp_path / "config")
+    for name in ("kept", "gone"):
+        (scripts / f"{name}.sh").touch()
+        registry.add_script(scripts / f"{name}.sh", alias=name)
+    (scripts / "gone.sh").unlink()
+
+    def unreachable(path):
+        raise TimeoutError(path)
+    monkeypatch.setattr(health.os, "listdir", unreachable)
+    assert list(registry.prune()) == []
+
+    monkeypatch.undo()
+    assert list(registry.prune()) == ["gone"]
+    assert [s["alias"] for s in Registry(config_dir=tmp_path / "config").scripts] == ["kept"]
@@ -0,0 +1,84 @@
+import os
+import sys
+from pathlib import Path
+from click.testing import CliRunner
+from script_runner import interpreters
+from script_runner.cli import cli
+from script_runner.config import Registry
+from script_runner.interpreters import InterpreterIndex
+
+def fake_python(venv: Path, version: str, fails: bool = False) -> Path:
+    """A venv whose python reports the given version, or fails to start"""
+    (venv / "bin").mkdir(parents=True, exist_ok=True)
+    (venv / "pyvenv.cfg").write_text(f"version = {version}\n")
+    python = venv / "bin" / "python"
+    if fails:
+        python.write_text("#!/bin/sh\necho 'error while loading shared libraries: libpython.so' >&2\nexit 127\n")
+    else:
+        python.write_text(f"#!/bin/sh\necho '[\"{version}\", \"cpython\"]'\n")
+    python.chmod(0o755)
+    # Make the rebuild visible to mtime comparisons on coarse clocks
+    stamp = os.stat(python).st_mtime_ns + 10 ** 9 * (1 + len(list(venv.iterdir())))
+    os.utime(venv / "pyvenv.cfg", ns=(stamp, stamp))
+    return python
+
+def test_each_interpreter_is_inspected_once(registry: Registry, tmp_path: Path, add_script, monkeypatch):
+    python = fake_python(tmp_path / "project" / ".venv", "3.11.7")
+    for alias in ("a", "b", "c"):
+        add_script(alias, interpreter=python)
+    add_script("d")
+
+    inspected = []
+    inspect = interpreters.inspect
+    monkeypatch.setattr(interpreters, "inspect", lambda i, python: inspected.append(i) or inspect(i, python))
+
+    records = registry.interpreters()
+    assert sorted(inspected) == sorted({str(python), str(Path(sys.executable).resolve())})
+    assert records[str(python)]["version"] == "3.11.7"
+    assert records[str(python)]["venv"] == str(tmp_path / "project" / ".venv")
+
+    inspected.clear()
+    assert Registry(config_dir=registry.config_dir).interpreters() == records
+    assert inspected == []
+
+def test_check_reports_rebuilt_and_broken_venvs(registry: Registry, tmp_path: Path, add_script):
+    rebuilt = fake_python(tmp_path / "one" / ".venv", "3.11.7")
+    broken = fake_python(tmp_path / "two" / ".venv", "3.11.7")
+    add_script("rebuilt", interpreter=rebuilt)
+    add_script("broken", interpreter=broken)
+    assert all(not result["problems"] and not result["notes"] for result in registry.check())
+
+    fake_python(tmp_path / "one" / ".venv", "3.12.1")
+    fake_python(tmp_path / "two" / ".venv", "3.11.7", fails=True)
+    results = {result["alias"]: result for result in registry.check()}
+
+    assert results["rebuilt"]["notes"] == [f"interpreter changed from cpython 3.11.7 to cpython 3.12.1: {rebuilt}"]
+    assert results["broken"]["problems"] == [
+        "interpreter does not run: error while loading shared libraries: libpython.so"
+    ]
+    # Changes are noted by the check that finds them
+    assert registry.check()[0]["notes"] == []
+
+def test_list_by_interpreter(registry: Registry, tmp_path: Path, add_script):
+    python = fake_python(tmp_path / "project" / ".venv", "3.11.7")
+    add_script("a", interpreter=python)
+    add_script("b", interpreter=python)
+
+    result = CliRunner().invoke(cli, ["list", "--by-interpreter"])
+
+    assert result.output == (
+        f"{python} (cpython 3.11.7, venv {tmp_path / 'project' / '.venv'})\n"
+        f"  a (python): {tmp_path / 'a.py'}\n"
+        f"  b (python): {tmp_path / 'b.py'}\n"
+    )
+    assert (registry.config_dir / interpreters.INTERPRETERS_FILE).exists()
+
+def test_unused_interpreters_are_dropped(registry: Registry, tmp_path: Path, add_script):
+    python = fake_python(tmp_path / ".venv", "3.11.7")
+    add_script("a", interpreter=python)
+    registry.interpreters()
+
+    registry.remove_alias("a")
+    registry.interpreters()
+
+    assert InterpreterIndex(registry.config_dir).records == {}
@@ -0,0 +1,119 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+import pytest
+from click.testing import CliRunner
+from script_runner import jobs
+from script_runner.cli import cli
+from script_runner.config import Registry
+from script_runner.exceptions import JobServerError
+from script_runner.jobs import JobServer, JobStore
+
+SR = "from script_runner.fastrun import main; main()"
+
+@pytest.fixture
+def start_server(registry: Registry):
+    servers = []
+
+    def _start_server(**kwargs) -> JobServer:
+        server = JobServer(registry, log=lambda message: None, **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        assert server.ready.wait(10)
+        servers.append((server, thread))
+        return server
+
+    yield _start_server
+    for server, thread in servers:
+        server.stop()
+        thread.join(10)
+
+def test_submit_wait_and_logs(registry: Registry, start_server, add_script):
+    add_script("echo", "import sys\nprint(' '.join(sys.argv[1:]))\nprint('oops', file=sys.stderr)\n")
+    add_script("fail", "import sys\nsys.exit(3)\n")
+    start_server()
+    runner = CliRunner()
+
+    job_id = jobs.submit(registry.config_dir, "echo", ["hello", "--world"])
+    assert jobs.wait(registry.config_dir, job_id, timeout=10)["state"] == "succeeded"
+    assert runner.invoke(cli, ["logs", str(job_id)]).output == "hello --world\n"
+    assert runner.invoke(cli, ["logs", str(job_id), "--stderr"]).output == "oops\n"
+
+    failed = runner.invoke(cli, ["submit", "fail"])
+    result = runner.invoke(cli, ["wait", failed.output.strip(), "--timeout", "10"])
+    assert result.exit_code == 3
+    assert "failed" in result.output
+
+    lines = runner.invoke(cli, ["status"]).output.splitlines()
+    assert [line.split()[:3] for line in lines] == [[str(job_id), "succeeded", "0"], [failed.output.strip(), "failed", "3"]]
+
+    with pytest.raises(JobServerError, match="Alias not found in registry: missing"):
+        jobs.submit(registry.config_dir, "missing", [])
+
+def test_wait_exit_status_of_a_killed_job(registry: Registry, start_server, add_script):
+    add_script("killed", "import os, signal\nos.kill(os.getpid(), signal.SIGTERM)\n")
+    start_server()
+
+    job_id = jobs.submit(registry.config_dir, "killed", [])
+    result = CliRunner().invoke(cli, ["wait", str(job_id), "--timeout", "10"])
+
+    assert result.exit_code == 128 + signal.SIGTERM
+
+def test_jobs_run_detached_from_the_server(registry: Registry, start_server, add_script):
+    add_script("probe", "import os\nprint(os.getsid(0) == os.getpid(), os.fstat(0).st_rdev == os.stat(os.devnull).st_rdev)\n")
+    start_server()
+
+    job_id = jobs.submit(registry.config_dir, "probe", [])
+    jobs.wait(registry.config_dir, job_id, timeout=10)
+
+    assert CliRunner().invoke(cli, ["logs", str(job_id)]).output == "True True\n"
+
+def test_queue_is_bounded(registry: Registry, tmp_path: Path, start_server, add_script):
+    gate = tmp_path / "gate"
+    add_script("slow", f"import os, time\nwhile not os.path.exists({str(gate)!r}):\n    time.sleep(0.01)\n")
+    server = start_server(max_workers=1, max_queued=1)
+
+    first = jobs.submit(registry.config_dir, "slow", [])
+    while server.store.get(first)["state"] != "running":
+        pass
+    second = jobs.submit(registry.config_dir, "slow", [])
+    with pytest.raises(JobServerError, match="queue is full"):
+        jobs.submit(registry.config_dir, "slow", [])
+    assert server.store.get(second)["state"] == "queued"
+
+    gate.touch()
+    assert jobs.wait(registry.config_dir, second, timeout=10)["state"] == "succeeded"
+
+def test_jobs_survive_restarts(registry: Registry, start_server, add_script):
+    add_script("ok", "print('ran')\n")
+    entry = registry.get_script("ok")
+    store = JobStore(registry.config_dir)
+    # As a server that died while running the first job would leave them
+    lost = store.add("ok", [], entry)
+    store.update(lost, state="running")
+    queued = store.add("ok", [], entry)
+
+    start_server()
+
+    assert jobs.wait(registry.config_dir, queued, timeout=10)["state"] == "succeeded"
+    interrupted = store.get(lost)
+    assert interrupted["state"] == "interrupted"
+    assert interrupted["error"] == "the job server stopped while it ran"
+
+def test_fast_path_submit(registry: Registry, tmp_path: Path, start_server, add_script):
+    add_script("echo", "import sys\nprint(sys.argv[1:])\n")
+    env = {**os.environ, "HOME": str(tmp_path)}
+    submit = [sys.executable, "-c", SR, "submit", "echo", "-x"]
+
+    result = subprocess.run(submit, env=env, capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Job server is not running" in result.stderr
+
+    start_server()
+    result = subprocess.run(submit, env=env, capture_output=True, text=True)
+    job_id = int(result.stdout)
+    assert jobs.wait(registry.config_dir, job_id, timeout=10)["state"] == "succeeded"
+    assert (JobStore(registry.config_dir).output_dir(job_id) / "stdout").read_text() == "['-x']\n"
@@ -0,0 +1,65 @@
+import json
+import os
+import signal
+import pytest
+from click.testing import CliRunner
+from script_runner.cli import cli
+from script_runner.config import Registry
+from script_runner.limits import format_size, parse_size
+from script_runner.runner import execute
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="resource limits need setrlimit")
+
+def test_parse_and_format_sizes():
+    assert parse_size("512M") == 512 * 1024 ** 2
+    assert parse_size("1.5g") == 3 * 1024 ** 3 // 2
+    assert parse_size("2GiB") == 2 * 1024 ** 3
+    assert parse_size("4096") == 4096
+    assert format_size(parse_size("2G")) == "2G"
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+def test_cpu_limit_kills_and_is_reported(make_script, capfd):
+    script = make_script("while True:\n    pass\n", limits={"max_cpu_seconds": 1})
+
+    returncode = execute(script, (), output="jsonl")
+    exit_event = json.loads(capfd.readouterr().out.splitlines()[-1])
+
+    assert returncode in (-signal.SIGXCPU, -signal.SIGKILL)
+    assert exit_event["limit"] == "CPU time limit of 1s"
+
+def test_cpu_limit_reported_on_stderr(make_script, capfd):
+    script = make_script("while True:\n    pass\n", limits={"max_cpu_seconds": 1})
+
+    execute(script, (), output="discard")
+
+    assert "exceeded its CPU time limit of 1s" in capfd.readouterr().err
+
+def test_memory_open_files_and_nice_apply_to_the_child(make_script, capfd):
+    script = make_script(
+        "import os, resource\n"
+        "print(resource.getrlimit(resource.RLIMIT_AS)[0], resource.getrlimit(resource.RLIMIT_NOFILE)[0], os.nice(0))\n"
+        "bytearray(512 * 1024 * 1024)\n",
+        limits={"max_memory": 256 * 1024 ** 2, "max_open_files": 64, "nice": 5},
+    )
+
+    assert execute(script, (), output="inherit") == 1
+    out, err = capfd.readouterr()
+    memory, files, niceness = map(int, out.split())
+
+    assert (memory, files) == (256 * 1024 ** 2, 64)
+    assert niceness >= 5
+    assert "MemoryError" in err
+
+def test_limits_command_merges_and_clears(add_script):
+    add_script("job")
+    runner = CliRunner()
+
+    runner.invoke(cli, ["limits", "job", "--max-memory", "1G"])
+    result = runner.invoke(cli, ["limits", "job", "--max-cpu", "30"])
+    assert result.output == "job: memory 1G, cpu 30s\n"
+    assert Registry().get_script("job")["limits"] == {"max_memory": 1024 ** 3, "max_cpu_seconds": 30}
+
+    assert runner.invoke(cli, ["limits", "job", "--clear"]).output == "job: no limits\n"
+    assert runner.invoke(cli, ["limits", "job", "--max-memory", "lots"]).exit_code == 2
+    assert runner.invoke(cli, ["limits", "missing", "--nice", "5"]).exit_code == 1
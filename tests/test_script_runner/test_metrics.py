@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+import pytest
+from script_runner import metrics
+from script_runner.runner import execute
+
+@pytest.fixture
+def script(tmp_path: Path):
+    script_path = tmp_path / "job.py"
+    script_path.write_text("import sys\nblock = bytearray(32 * 1024 * 1024)\nsys.exit(len(sys.argv) - 1)\n")
+    return {
+        "path": str(script_path),
+        "alias": "job",
+        "interpreter": sys.executable,
+        "type": "python",
+    }
+
+def test_execute_records_each_run(script, tmp_path: Path):
+    execute(script, (), config_dir=tmp_path)
+    execute(script, ("fail",), output="prefix", config_dir=tmp_path)
+
+    records = list(metrics.load(tmp_path, "job"))
+    assert [record["returncode"] for record in records] == [0, 1]
+    for record in records:
+        assert record["wall"] > 0
+        assert record["user"] + record["sys"] > 0
+        assert record["max_rss"] >= 32 * 1024 * 1024
+        assert record["interpreter"] == sys.executable
+
+def test_metrics_can_be_disabled(script, tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("SCRIPT_RUNNER_METRICS", "0")
+    execute(script, (), config_dir=tmp_path)
+
+    assert list(metrics.load(tmp_path)) == []
+
+def test_summarize_percentiles_and_trend(tmp_path: Path):
+    for i in range(20):
+        metrics.record(tmp_path, {"alias": "job", "started": i, "wall": 1.0 if i < 10 else 2.0, "returncode": int(i % 5 == 0)})
+    metrics.record(tmp_path, {"alias": "other", "started": 0, "wall": 0.5, "returncode": 0})
+
+    summary = metrics.summarize(metrics.load(tmp_path))
+    assert list(summary) == ["job", "other"]
+    assert summary["job"]["runs"] == 20
+    assert summary["job"]["failures"] == 4
+    assert summary["job"]["p50"] == 1.0
+    assert summary["job"]["p95"] == 2.0
+    assert summary["job"]["trend"] == 100
+    assert summary["other"]["trend"] is None
+
+def test_percentile():
+    assert metrics.percentile([5, 1, 3, 2, 4], 50) == 3
+    assert metrics.percentile([5, 1, 3, 2, 4], 95) == 5
+    assert metrics.percentile([7], 95) == 7
@@ -0,0 +1,99 @@
+from pathlib import Path
+import pytest
+from script_runner import resolve_cache
+from script_runner.resolve_cache import ResolveCache
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    return ResolveCache(config_dir)
+
+@pytest.fixture
+def script_path(tmp_path: Path):
+    # Deep enough that the venv search never leaves tmp_path
+    script_dir = tmp_path / "home" / "user" / "work" / "project" / "scripts"
+    script_dir.mkdir(parents=True)
+    script_path = script_dir / "script.py"
+    script_path.touch()
+
+    return script_path
+
+def make_venv(path: Path) -> Path:
+    (path / "bin").mkdir(parents=True)
+    (path / "pyvenv.cfg").touch()
+    (path / "bin" / "python").touch()
+
+    return path
+
+def test_repeated_resolution_skips_discovery(cache: ResolveCache, script_path: Path, monkeypatch):
+    venv = make_venv(script_path.parent.parent / ".venv")
+    first = cache.resolve(script_path)
+    assert first["venv"] == str(venv)
+    assert first["interpreter"] == str(venv / "bin" / "python")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("discovery should not run on a cache hit")
+
+    monkeypatch.setattr(resolve_cache, "probe_script", fail)
+    monkeypatch.setattr(resolve_cache, "get_interpreter_path", fail)
+    assert ResolveCache(cache.cache_file.parent).resolve(script_path) == first
+
+def test_new_venv_invalidates_entry(cache: ResolveCache, script_path: Path):
+    first = cache.resolve(script_path)
+    assert first["venv"] is None
+
+    venv = make_venv(script_path.parent / "venv")
+    assert cache.resolve(script_path)["venv"] == str(venv)
+
+def test_modified_script_invalidates_entry(cache: ResolveCache, script_path: Path):
+    script_path = script_path.parent / "tool"
+    script_path.write_text("#!/bin/sh\necho hi\n")
+    assert cache.resolve(script_path)["type"] == "shell"
+
+    script_path.write_text("#!/usr/bin/env python3\nprint('hi')\n")
+    assert cache.resolve(script_path)["type"] == "python"
+
+def test_evicts_least_recently_used(tmp_path: Path, script_path: Path):
+    cache = ResolveCache(tmp_path / "config", max_entries=2)
+    scripts = []
+    for name in ("a", "b", "c"):
+        script_path = script_path.parent / f"{name}.sh"
+        script_path.touch()
+        scripts.append(script_path)
+
+    cache.resolve(scripts[0])
+    cache.resolve(scripts[1])
+    cache.resolve(scripts[0])
+    cache.resolve(scripts[2])
+
+    assert list(cache.entries) == [str(scripts[0]), str(scripts[2])]
+
+def test_clear_and_stats(cache: ResolveCache, script_path: Path):
+    cache.resolve(script_path)
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["valid"] == 1
+
+    assert cache.clear() == 1
+    assert cache.stats()["entries"] == 0
+    assert not cache.cache_file.exists()
+
+def test_entries_from_an_older_format_are_resolved_again(cache: ResolveCache, script_path: Path, monkeypatch):
+    cache.resolve(script_path)
+    monkeypatch.setattr(resolve_cache, "FORMAT_VERSION", resolve_cache.FORMAT_VERSION + 1)
+
+    def probe(*args, **kwargs):
+        raise LookupError("resolved again")
+
+    monkeypatch.setattr(resolve_cache, "probe_script", probe)
+    with pytest.raises(LookupError):
+        ResolveCache(cache.cache_file.parent).resolve(script_path)
+
+def test_saves_through_an_atomic_rename(cache: ResolveCache, script_path: Path, monkeypatch):
+    written = []
+    monkeypatch.setattr(resolve_cache, "write_atomic", lambda path, data: written.append(path))
+
+    cache.resolve(script_path)
+
+    assert written == [cache.cache_file]
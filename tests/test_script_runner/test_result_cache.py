@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+import pytest
+from script_runner.result_cache import ResultCache
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    return ResultCache(tmp_path / "config")
+
+@pytest.fixture
+def script(tmp_path: Path):
+    """A script that counts its runs in a side file and echoes its input"""
+    data = tmp_path / "input.txt"
+    data.write_text("v1")
+    script_path = tmp_path / "job.py"
+    script_path.write_text(
+        "import sys\n"
+        f"open({str(tmp_path / 'runs')!r}, 'a').write('x')\n"
+        f"print(open({str(data)!r}).read(), *sys.argv[1:])\n"
+    )
+    return {
+        "path": str(script_path),
+        "alias": "job",
+        "interpreter": sys.executable,
+        "type": "python",
+        "inputs": [str(data)],
+    }
+
+def runs(tmp_path: Path) -> int:
+    return len((tmp_path / "runs").read_text())
+
+def test_replays_unchanged_run(cache: ResultCache, script, tmp_path: Path, capfd):
+    assert cache.run(script, ("a",), output="inherit") == (0, False)
+    assert cache.run(script, ("a",), output="inherit") == (0, True)
+
+    assert runs(tmp_path) == 1
+    assert capfd.readouterr().out == "v1 a\nv1 a\n"
+
+def test_args_inputs_and_script_change_the_key(cache: ResultCache, script, tmp_path: Path):
+    cache.run(script, ("a",))
+    assert cache.run(script, ("b",)) == (0, False)
+
+    (tmp_path / "input.txt").write_text("v2")
+    assert cache.run(script, ("a",)) == (0, False)
+
+    Path(script["path"]).write_text(Path(script["path"]).read_text() + "\n")
+    assert cache.run(script, ("a",)) == (0, False)
+    assert runs(tmp_path) == 4
+
+def test_failed_runs_are_not_cached(cache: ResultCache, script, tmp_path: Path):
+    Path(script["path"]).write_text(f"open({str(tmp_path / 'runs')!r}, 'a').write('x')\nraise SystemExit(5)\n")
+
+    assert cache.run(script, ()) == (5, False)
+    assert cache.run(script, ()) == (5, False)
+    assert cache.entries() == []
+
+def test_evicts_least_recently_used(tmp_path: Path, script):
+    cache = ResultCache(tmp_path / "config", max_bytes=20)
+    cache.run(script, ("first",))
+    cache.run(script, ("second",))
+    cache.run(script, ("first",))
+    cache.run(script, ("third",))
+
+    assert [entry["args"] for entry in cache.entries()] == [["third"], ["first"]]
+    assert cache.stats()["size"] <= 20
+
+def test_clear(cache: ResultCache, script):
+    cache.run(script, ())
+    assert cache.clear() == 1
+    assert cache.stats()["entries"] == 0
+
+def test_retries_a_failed_attempt_and_caches_the_success(cache: ResultCache, script, tmp_path: Path, capfd):
+    Path(script["path"]).write_text(
+        f"import os\nruns = {str(tmp_path / 'runs')!r}\n"
+        "first = not os.path.exists(runs)\n"
+        "open(runs, 'a').write('x')\n"
+        "print('attempt')\n"
+        "raise SystemExit(3 if first else 0)\n"
+    )
+
+    assert cache.run(script, (), output="inherit", retries=1, backoff=0) == (0, False)
+    assert cache.run(script, (), output="inherit") == (0, True)
+
+    assert runs(tmp_path) == 2
+    assert capfd.readouterr().out == "attempt\nattempt\nattempt\n"
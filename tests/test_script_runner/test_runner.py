@@ -0,0 +1,200 @@
+import base64
+import json
+import os
+import sys
+from pathlib import Path
+import pytest
+import signal
+import subprocess
+import time
+from script_runner import runner
+from script_runner.runner import TIMEOUT_EXIT, RotatingLog, execute, run_with_retries
+
+def test_discard_returns_exit_code(make_script, capfd):
+    script = make_script("print('hidden')\nraise SystemExit(4)\n")
+
+    assert execute(script, (), output="discard") == 4
+    assert capfd.readouterr().out == ""
+
+def test_inherit_passes_output_through(make_script, capfd):
+    script = make_script("import sys\nprint(sys.argv[1:])\n")
+
+    assert execute(script, ("a", "b"), output="inherit") == 0
+    assert capfd.readouterr().out.strip() == "['a', 'b']"
+
+def test_log_writes_both_streams(make_script, tmp_path: Path):
+    script = make_script("import sys\nprint('out')\nsys.stdout.flush()\nprint('err', file=sys.stderr)\n")
+
+    assert execute(script, (), output="log", config_dir=tmp_path) == 0
+    assert (tmp_path / "logs" / "job.log").read_text() == "out\nerr\n"
+
+def test_tail_reports_end_of_stderr_on_failure(make_script, capfd, monkeypatch):
+    monkeypatch.setattr("script_runner.runner.TAIL_BYTES", 16)
+    script = make_script("import sys\nsys.stderr.write('x' * 100000 + 'the real error')\nsys.exit(2)\n")
+
+    assert execute(script, (), output="tail") == 2
+    assert capfd.readouterr().err == "xxthe real error"
+
+def test_tee_streams_output_and_repeats_end_of_stderr_on_failure(make_script, capfd, monkeypatch):
+    monkeypatch.setattr("script_runner.runner.TAIL_BYTES", 16)
+    script = make_script("import sys\nprint('out')\nsys.stderr.write('x' * 100000 + 'the real error')\nsys.exit(2)\n")
+
+    assert execute(script, (), output="tee") == 2
+    out, err = capfd.readouterr()
+
+    assert out == "out\n"
+    assert err == "x" * 100000 + "the real error[job] exited with 2, end of its stderr:\nxxthe real error"
+
+def test_jsonl_streams_events_while_the_script_runs(make_script, capfd):
+    script = make_script(
+        "import sys, time\n"
+        "print('first', flush=True)\n"
+        "time.sleep(0.5)\n"
+        "sys.stderr.buffer.write(b'\\xe2\\x82')\n"
+        "sys.stderr.flush()\n"
+        "time.sleep(0.1)\n"
+        "sys.stderr.buffer.write(b'\\xac\\xff')\n"
+        "sys.exit(3)\n"
+    )
+
+    assert execute(script, (), output="jsonl") == 3
+    events = [json.loads(line) for line in capfd.readouterr().out.splitlines()]
+
+    assert [event["event"] for event in events][0] == "start"
+    assert [event["event"] for event in events][-3:] == ["stderr", "usage", "exit"]
+    assert all(event["alias"] == "job" for event in events)
+    start, *stdout, stderr, usage, exit = events
+    assert start["command"][1] == script["path"]
+    assert "".join(event["data"] for event in stdout) == "first\n"
+    # Read as soon as it was printed, not when the script finished
+    assert exit["time"] - stdout[0]["time"] >= 0.4
+    # The euro sign split across writes is held back, then sent with the invalid byte
+    assert base64.b64decode(stderr["data_b64"]) == b"\xe2\x82\xac\xff"
+    assert usage["max_rss"] > 0
+    assert exit["returncode"] == 3 and exit["timed_out"] is False
+
+def test_rotating_log_rolls_over(tmp_path: Path):
+    log = RotatingLog(tmp_path / "job.log", max_bytes=10, backups=2)
+    for chunk in (b"aaaaaaaa", b"bbbbbbbb", b"cccccccc", b"dddddddd"):
+        log.write(chunk)
+    log.close()
+
+    assert (tmp_path / "job.log").read_bytes() == b"dddddddd"
+    assert (tmp_path / "job.log.1").read_bytes() == b"cccccccc"
+    assert (tmp_path / "job.log.2").read_bytes() == b"bbbbbbbb"
+    assert not (tmp_path / "job.log.3").exists()
+
+def test_timeout_stops_the_whole_process_group(make_script, tmp_path: Path, capfd):
+    # The grandchild keeps the log pipe open, so the run only ends if it is killed too
+    script = make_script(
+        "import subprocess, sys, time\n"
+        "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        "time.sleep(60)\n"
+    )
+    started = time.monotonic()
+
+    assert execute(script, (), output="log", config_dir=tmp_path, timeout=0.5) == TIMEOUT_EXIT
+    assert time.monotonic() - started < 10
+    assert capfd.readouterr().err == "[job] timed out after 0.5s\n"
+
+def test_timeout_escalates_to_sigkill(make_script, monkeypatch):
+    monkeypatch.setattr(runner, "GRACE_PERIOD", 0.2)
+    script = make_script(
+        "import signal, time\nsignal.signal(signal.SIGTERM, signal.SIG_IGN)\nprint('ready', flush=True)\ntime.sleep(60)\n"
+    )
+    script["timeout"] = 0.5
+
+    assert execute(script, ()) == TIMEOUT_EXIT
+
+def test_retries_failed_attempts(make_script, tmp_path: Path, capfd):
+    counter = tmp_path / "attempts"
+    script = make_script(
+        f"from pathlib import Path\np = Path({str(counter)!r})\n"
+        "p.write_text(p.read_text() + 'x' if p.exists() else 'x')\n"
+        "raise SystemExit(0 if len(p.read_text()) == 3 else 1)\n"
+    )
+    script.update(retries=2, backoff=0)
+
+    assert run_with_retries(script, ()) == 0
+    assert counter.read_text() == "xxx"
+    assert "retry 2/2" in capfd.readouterr().err
+
+    counter.unlink()
+    assert run_with_retries(script, (), retries=1) == 1
+    assert counter.read_text() == "xx"
+
+def test_does_not_retry_runs_stopped_by_a_signal(make_script, tmp_path: Path):
+    counter = tmp_path / "attempts"
+    script = make_script(f"import os, signal\nopen({str(counter)!r}, 'a').write('x')\nos.kill(os.getpid(), signal.SIGTERM)\n")
+
+    assert run_with_retries(script, (), retries=3, backoff=0) == -signal.SIGTERM
+    assert counter.read_text() == "x"
+
+def test_run_script_exits_with_128_plus_the_signal(make_script):
+    script = make_script("import os, signal\nos.kill(os.getpid(), signal.SIGTERM)\n")
+
+    with pytest.raises(SystemExit) as exit_info:
+        runner.run_script(script, ())
+
+    assert exit_info.value.code == 128 + signal.SIGTERM
+
+def test_ctrl_c_is_forwarded_to_the_script(make_script, tmp_path: Path):
+    ready = tmp_path / "ready"
+    script = make_script(
+        "import time\n"
+        f"open({str(ready)!r}, 'w').close()\n"
+        "try:\n    time.sleep(60)\nexcept KeyboardInterrupt:\n    print('interrupted')\n    raise SystemExit(3)\n"
+    )
+    caller = subprocess.Popen(
+        [sys.executable, "-c",
+         f"import json; from script_runner.runner import run_script; run_script(json.loads({json.dumps(json.dumps(script))}), (), True)"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, text=True,
+    )
+    deadline = time.monotonic() + 10
+    while not ready.exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    caller.send_signal(signal.SIGINT)
+    stdout, _ = caller.communicate(timeout=10)
+    assert stdout == "interrupted\n"
+    assert caller.returncode == 3
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a pseudo-terminal")
+def test_terminal_runs_hold_the_foreground_and_time_out_as_a_group(make_script, tmp_path: Path):
+    import fcntl, pty, termios
+
+    report = tmp_path / "report"
+    script = make_script(
+        "import os, subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(report)!r}, 'w').write(f'{{os.tcgetpgrp(0) == os.getpgrp()}} {{child.pid}}')\n"
+        "time.sleep(60)\n",
+        timeout=1,
+    )
+    # Checked before the caller exits, as the terminal hangs up its foreground group then
+    caller_code = (
+        "import json, os, time\n"
+        "from script_runner.runner import run_script\n"
+        f"try:\n    run_script(json.loads({json.dumps(json.dumps(script))}), (), True)\n"
+        "except SystemExit as e:\n    code = e.code\n"
+        f"child = int(open({str(report)!r}).read().split()[1])\n"
+        "for _ in range(100):\n"
+        "    try:\n        os.kill(child, 0)\n    except ProcessLookupError:\n        break\n"
+        "    time.sleep(0.05)\n"
+        "else:\n    os.kill(child, 9)\n    code = 'leaked'\n"
+        "print(os.tcgetpgrp(0) == os.getpgrp(), code)\n"
+    )
+    master, terminal = pty.openpty()
+    try:
+        caller = subprocess.run(
+            [sys.executable, "-c", caller_code],
+            stdin=terminal, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=30,
+            start_new_session=True, preexec_fn=lambda: fcntl.ioctl(0, termios.TIOCSCTTY, 0),
+        )
+    finally:
+        os.close(terminal)
+        os.close(master)
+
+    assert report.read_text().split()[0] == "True"
+    assert caller.stdout == f"True {TIMEOUT_EXIT}\n"
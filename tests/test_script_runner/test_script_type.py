@@ -0,0 +1,94 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+from script_runner.config import Registry
+from script_runner.runner import build_command
+from script_runner.utils import PROBE_BYTES, get_script_type, parse_shebang, probe_script
+
+@pytest.mark.parametrize("line, expected", [
+    (b"#!/bin/bash\n", ["/bin/bash"]),
+    (b"#!/usr/bin/python3 -u -X utf8\n", ["/usr/bin/python3", "-u", "-X", "utf8"]),
+    (b"#!/usr/bin/env python3\r\n", ["python3"]),
+    (b"#!/usr/bin/env python3 -u\n", ["python3", "-u"]),
+    (b"#!/usr/bin/env -S deno run --allow-read\n", ["deno", "run", "--allow-read"]),
+    (b"#!/usr/bin/env -S ruby -e 'puts 1'\n", ["ruby", "-e", "puts 1"]),
+    (b"#!/usr/bin/env -S PYTHONUNBUFFERED=1 python3\n", ["python3"]),
+    (b"#! /usr/bin/env -i node\n", ["node"]),
+    (b"print('no shebang')\n", []),
+    (b"#!\n", []),
+])
+def test_parse_shebang(line: bytes, expected):
+    assert parse_shebang(line) == expected
+
+@pytest.mark.parametrize("name, content, expected", [
+    ("a.py", "", "python"),
+    ("a.bash", "", "shell"),
+    ("a.js", "", "node"),
+    ("a.rb", "", "ruby"),
+    ("a.pl", "", "perl"),
+    ("a.R", "", "r"),
+    ("a.ts", "", "deno"),
+    ("tool", "#!/usr/bin/env python3.12\n", "python"),
+    ("tool", "#!/bin/dash\n", "shell"),
+    ("tool", "#!/usr/bin/env node\n", "node"),
+    ("tool", "#!/usr/bin/env Rscript\n", "r"),
+    ("tool", "#!/usr/bin/env -S deno run\n", "deno"),
+    ("tool", "#!/usr/bin/perl -w\n", "perl"),
+])
+def test_detects_type(tmp_path: Path, name: str, content: str, expected: str):
+    script_path = tmp_path / name
+    script_path.write_text(content)
+
+    assert get_script_type(script_path) == expected
+
+def test_binary_and_unterminated_files_read_only_the_probe(tmp_path: Path, monkeypatch):
+    binary = tmp_path / "blob"
+    binary.write_bytes(b"\x7fELF\x00\xff\xfe" * 100)
+    long_line = tmp_path / "long"
+    long_line.write_bytes(b"#!/usr/bin/env python3 " + b"x" * (10 * PROBE_BYTES))
+
+    sizes = []
+    real_open = open
+    def recording_open(path, mode="r", *args, **kwargs):
+        handle = real_open(path, mode, *args, **kwargs)
+        read = handle.read
+        handle.read = lambda size=-1: sizes.append(size) or read(size)
+        return handle
+    monkeypatch.setattr("builtins.open", recording_open)
+
+    assert get_script_type(binary) == "python"
+    probe = probe_script(long_line)
+
+    assert sizes == [PROBE_BYTES, PROBE_BYTES]
+    assert probe.type == "python"
+    assert len(" ".join(probe.shebang)) < PROBE_BYTES
+
+def test_shebang_arguments_reach_the_command(tmp_path: Path):
+    script_path = tmp_path / "unbuffered"
+    script_path.write_text(f"#!{sys.executable} -u -X utf8\nprint('hi')\n")
+    registry = Registry(config_dir=tmp_path / "config")
+
+    registry.add_script(script_path)
+    entry = registry.get_script("unbuffered")
+    cmd, _ = build_command(entry, ("arg",))
+
+    assert entry["type"] == "python"
+    assert entry["interpreter_args"] == ["-u", "-X", "utf8"]
+    assert cmd[1:] == ["-u", "-X", "utf8", str(script_path), "arg"]
+
+def test_interpreter_comes_from_path_for_new_types(tmp_path: Path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    deno = bin_dir / "deno"
+    deno.write_text("#!/bin/sh\n")
+    deno.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+    script_path = tmp_path / "serve.ts"
+    script_path.write_text("console.log('hi')\n")
+    registry = Registry(config_dir=tmp_path / "config")
+
+    registry.add_script(script_path)
+    cmd, _ = build_command(registry.get_script("serve"), ())
+
+    assert cmd == [str(deno), "run", str(script_path)]
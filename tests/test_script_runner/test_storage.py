@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+import pytest
+from script_runner import config
+from script_runner.config import Registry
+from script_runner.storage import SCHEMA_VERSION, JsonStore, write_atomic
+from script_runner.exceptions import AliasNotFoundError, DuplicateAliasError
+
+@pytest.fixture(params=["json", "sqlite"])
+def test_registry(request, tmp_path: Path):
+    return Registry(config_dir=tmp_path / "config", backend=request.param)
+
+@pytest.fixture
+def script_path(tmp_path: Path):
+    script_path = tmp_path / "script.sh"
+    script_path.write_text("#!/bin/sh\necho hi\n")
+
+    return script_path
+
+def test_can_add_get_and_remove(test_registry: Registry, script_path: Path):
+    test_registry.add_script(script_path, alias="first")
+    test_registry.add_script(script_path, alias="second")
+
+    assert [s["alias"] for s in test_registry.scripts] == ["first", "second"]
+    assert test_registry.get_script("second")["path"] == str(script_path)
+
+    with pytest.raises(DuplicateAliasError):
+        test_registry.add_script(script_path, alias="first")
+
+    test_registry.remove_alias("first")
+    with pytest.raises(AliasNotFoundError):
+        test_registry.get_script("first")
+    with pytest.raises(AliasNotFoundError):
+        test_registry.remove_alias("first")
+
+def test_changes_persist(test_registry: Registry, script_path: Path):
+    test_registry.add_script(script_path, alias="kept")
+
+    reloaded = Registry(config_dir=test_registry.config_dir, backend=test_registry.backend)
+    assert reloaded.get_script("kept")["type"] == "shell"
+
+def test_prune_removes_missing_scripts(test_registry: Registry, script_path: Path, tmp_path: Path):
+    doomed = tmp_path / "doomed.sh"
+    doomed.touch()
+    test_registry.add_script(script_path, alias="kept")
+    test_registry.add_script(doomed, alias="doomed")
+    doomed.unlink()
+
+    assert list(test_registry.prune()) == ["doomed"]
+    assert [s["alias"] for s in test_registry.scripts] == ["kept"]
+
+def test_sqlite_backend_imports_json_registry(tmp_path: Path, script_path: Path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "scripts.json").write_text(json.dumps([
+        {"alias": "old", "path": str(script_path), "python": "/usr/bin/python3"},
+    ]))
+
+    registry = Registry(config_dir=config_dir, backend="sqlite")
+    assert (config_dir / "scripts.db").exists()
+    assert registry.get_script("old") == {
+        "alias": "old",
+        "path": str(script_path),
+        "interpreter": "/usr/bin/python3",
+        "type": "python",
+    }
+
+def test_new_registries_record_the_schema_version(test_registry: Registry, script_path: Path, monkeypatch):
+    from script_runner import fastrun
+
+    test_registry.add_script(script_path, "job")
+
+    assert Registry(config_dir=test_registry.config_dir, backend=test_registry.backend).store.version == SCHEMA_VERSION
+    # So the fast path can serve it
+    monkeypatch.setenv("SCRIPT_RUNNER_BACKEND", test_registry.backend)
+    assert fastrun._find_entry(str(test_registry.config_dir), "job")["path"] == str(script_path)
+
+def test_rejects_unknown_backend(tmp_path: Path):
+    with pytest.raises(ValueError):
+        Registry(config_dir=tmp_path, backend="yaml")
+
+def test_legacy_registry_is_migrated_once(tmp_path: Path, script_path: Path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    scripts_file = config_dir / "scripts.json"
+    scripts_file.write_text(json.dumps([
+        {"alias": "old", "path": str(script_path), "python": "/usr/bin/python3"},
+        {"alias": "untyped", "path": str(script_path), "interpreter": "/bin/sh"},
+    ], indent=2))
+
+    registry = Registry(config_dir=config_dir)
+    assert registry.get_script("untyped")["type"] == "shell"
+    assert json.loads(scripts_file.read_text())["version"] == SCHEMA_VERSION
+
+    def fail(*args, **kwargs):
+        raise AssertionError("migrated registries need no per-entry work")
+
+    monkeypatch.setattr(config, "get_script_type", fail)
+    registry = Registry(config_dir=config_dir)
+    assert registry.get_script("old")["interpreter"] == "/usr/bin/python3"
+    assert registry.get_script("untyped")["type"] == "shell"
+
+def test_write_atomic_replaces_the_file_without_leftovers(tmp_path: Path):
+    target = tmp_path / "data.json"
+    target.write_text("old")
+
+    write_atomic(target, b"new")
+
+    assert target.read_bytes() == b"new"
+    assert [path.name for path in tmp_path.iterdir()] == ["data.json"]
+
+def test_lookup_decodes_only_the_requested_entry(tmp_path: Path, script_path: Path, monkeypatch):
+    test_registry = Registry(config_dir=tmp_path / "config")
+    for alias in ("a", "b", 'c "quoted"'):
+        test_registry.add_script(script_path, alias=alias)
+
+    def fail(self):
+        raise AssertionError("lookup should not parse the whole registry")
+
+    monkeypatch.setattr(JsonStore, "_load", fail)
+    registry = Registry(config_dir=tmp_path / "config")
+    assert registry.get_script('c "quoted"')["alias"] == 'c "quoted"'
+    assert registry.get_script("a")["path"] == str(script_path)
+    assert [s["alias"] for s in registry.scripts] == ["a", "b", 'c "quoted"']
+
+WRITER = """
+import sys
+from pathlib import Path
+from script_runner.config import Registry
+
+config_dir, backend, script, worker, count = sys.argv[1:]
+for i in range(int(count)):
+    registry = Registry(config_dir=Path(config_dir), backend=backend)
+    registry.add_script(Path(script), alias=f"w{worker}-{i}", interpreter_path=Path(sys.executable))
+    if i % 2:
+        registry.remove_alias(f"w{worker}-{i - 1}")
+"""
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_concurrent_writers_lose_no_updates(tmp_path: Path, script_path: Path, backend: str):
+    import subprocess
+    import sys
+
+    config_dir = tmp_path / "config"
+    Registry(config_dir=config_dir, backend=backend).add_script(script_path, alias="seed")
+    workers, count = 8, 10
+
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WRITER, str(config_dir), backend, str(script_path), str(w), str(count)])
+        for w in range(workers)
+    ]
+    assert [process.wait() for process in processes] == [0] * workers
+
+    aliases = {s["alias"] for s in Registry(config_dir=config_dir, backend=backend).scripts}
+    assert aliases == {"seed"} | {f"w{w}-{i}" for w in range(workers) for i in range(1, count, 2)}
+    assert not list(config_dir.glob(".*.tmp"))
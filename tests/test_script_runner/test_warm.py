@@ -0,0 +1,86 @@
+import functools
+import json
+import os
+import sys
+from pathlib import Path
+import pytest
+from script_runner import warm
+from script_runner.runner import execute
+
+pytestmark = pytest.mark.skipif(not warm.supported(), reason="warm servers need fork and Unix sockets")
+
+@pytest.fixture
+def config_dir(tmp_path: Path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    yield config_dir
+    warm.stop_all(config_dir)
+
+@pytest.fixture
+def make_script(make_script):
+    """Entries flagged to run through a warm server"""
+    return functools.partial(make_script, warm=True)
+
+def test_runs_script_with_args_env_and_cwd(make_script, config_dir: Path, tmp_path: Path, monkeypatch):
+    result = tmp_path / "result.json"
+    script = make_script(
+        "import json, os, sys\n"
+        f"json.dump({{'argv': sys.argv[1:], 'cwd': os.getcwd(), 'name': __name__,"
+        f" 'flag': os.environ.get('WARM_FLAG')}}, open({str(result)!r}, 'w'))\n"
+        "sys.exit(3)\n"
+    )
+    monkeypatch.setenv("WARM_FLAG", "on")
+    monkeypatch.chdir(tmp_path)
+
+    assert execute(script, ("a", "b c"), output="discard", config_dir=config_dir) == 3
+    assert json.loads(result.read_text()) == {
+        "argv": ["a", "b c"], "cwd": str(tmp_path), "name": "__main__", "flag": "on",
+    }
+
+def test_output_reaches_sinks(make_script, config_dir: Path):
+    script = make_script("import sys\nprint('out')\nsys.stdout.flush()\nprint('err', file=sys.stderr)\n")
+
+    assert execute(script, (), output="log", config_dir=config_dir) == 0
+    assert (config_dir / "logs" / "job.log").read_text() == "out\nerr\n"
+
+def test_server_is_reused_across_runs(make_script, config_dir: Path, tmp_path: Path):
+    pids = tmp_path / "pids"
+    script = make_script(f"import os\nopen({str(pids)!r}, 'a').write(f'{{os.getppid()}}\\n')\n")
+
+    for _ in range(3):
+        assert execute(script, (), config_dir=config_dir) == 0
+
+    parents = set(pids.read_text().split())
+    assert len(parents) == 1
+    assert int(parents.pop()) != os.getpid()
+    assert warm.socket_path(config_dir, sys.executable).exists()
+
+def test_scripts_preloading_other_modules_get_their_own_server(make_script, config_dir: Path, tmp_path: Path):
+    result = tmp_path / "result"
+    source = f"import sys\nopen({str(result)!r}, 'w').write(str('{{module}}' in sys.modules))\n"
+
+    assert execute(make_script(source.format(module="json")), (), config_dir=config_dir) == 0
+    preloading = make_script(source.format(module="decimal"), "other", preload=["decimal"])
+    assert execute(preloading, (), config_dir=config_dir) == 0
+
+    assert result.read_text() == "True"
+    assert warm.socket_path(config_dir, sys.executable, ["decimal"]) != warm.socket_path(config_dir, sys.executable)
+
+def test_uncaught_exception_fails_the_run(make_script, config_dir: Path):
+    script = make_script("raise ValueError('boom')\n")
+
+    assert execute(script, (), output="discard", config_dir=config_dir) == 1
+
+def test_stop_all_shuts_servers_down(make_script, config_dir: Path):
+    script = make_script("pass\n")
+    assert execute(script, (), config_dir=config_dir) == 0
+
+    assert warm.stop_all(config_dir) == 1
+    assert not warm.socket_path(config_dir, sys.executable).exists()
+    assert warm.stop_all(config_dir) == 0
+
+def test_without_config_dir_runs_cold(make_script, capfd):
+    script = make_script("import sys\nprint(sys.argv[1:])\n")
+
+    assert execute(script, ("x",), output="inherit") == 0
+    assert capfd.readouterr().out.strip() == "['x']"